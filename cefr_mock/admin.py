@@ -61,10 +61,13 @@ class CEFRAnswerInline(admin.TabularInline):
 
 @admin.register(CEFRSession)
 class CEFRSessionAdmin(admin.ModelAdmin):
-    list_display  = ['user', 'score_display', 'level', 'is_completed', 'started_at']
-    list_filter   = ['is_completed', 'level']
+    list_display  = ['user', 'score_display', 'level', 'is_completed', 'grading_status', 'started_at']
+    list_filter   = ['is_completed', 'grading_status', 'level']
     search_fields = ['user__username', 'user__first_name']
-    readonly_fields = ['started_at', 'ended_at', 'feedback', 'score', 'level', 'user', 'is_completed']
+    readonly_fields = [
+        'started_at', 'ended_at', 'feedback', 'score', 'level', 'user', 'is_completed',
+        'grading_status', 'grading_error', 'grading_started_at',
+    ]
     inlines = [CEFRAnswerInline]
 
     def score_display(self, obj):
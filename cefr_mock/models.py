@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from config import grading
 
 
 class CEFRMock(models.Model):
@@ -144,6 +145,10 @@ class CEFRSession(models.Model):
     level = models.CharField(max_length=2, choices=LEVEL_CHOICES, null=True, blank=True)
     feedback = models.JSONField(null=True, blank=True)
     is_completed = models.BooleanField(default=False)
+    # Asinxron baholash holati (config.grading)
+    grading_status = models.CharField(max_length=10, choices=grading.STATUS_CHOICES, default='', blank=True)
+    grading_error = models.TextField(blank=True)
+    grading_started_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-started_at']
@@ -31,5 +31,5 @@ class CEFRSessionSerializer(serializers.ModelSerializer):
         model = CEFRSession
         fields = [
             "id", "started_at", "ended_at", "score", "level",
-            "feedback", "is_completed", "answers",
+            "feedback", "is_completed", "grading_status", "answers",
         ]
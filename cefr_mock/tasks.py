@@ -0,0 +1,107 @@
+"""
+cefr_mock/tasks.py — CEFR Speaking imtihonini baholash ('grading' navbati)
+"""
+import json
+import logging
+
+from celery import shared_task
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config import grading
+
+logger = logging.getLogger(__name__)
+
+
+def _evaluate(session):
+    """gpt-4o baholashi → dict"""
+    from config.ai_clients import openai_client
+
+    answers = list(session.answers.select_related('question').all())
+    qa_parts = []
+    for ans in answers:
+        qa_parts.append(
+            '[Part ' + str(ans.question.part) + '] Q: ' + ans.question.question +
+            '\nA: ' + (ans.transcript or '(no answer)') +
+            '\nDuration: ' + str(ans.duration_seconds) + 's'
+        )
+    qa_text = '\n\n'.join(qa_parts)
+
+    resp = openai_client().chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": "You are a CEFR language examiner. Score from 1-75."},
+            {"role": "user", "content": f"Evaluate this CEFR Speaking test:\n\n{qa_text}\n\nReturn JSON: {{\"score\":58,\"level\":\"B2\",\"summary\":\"...\",\"strengths\":[],\"improvements\":[],\"errors\":[]}}"},
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=1000
+    )
+    return json.loads(resp.choices[0].message.content)
+
+
+def _score(result):
+    """Model javobidagi ball → 1..75 int ("58" / 58.0 ham); yaroqsiz bo'lsa ValueError / TypeError"""
+    if not isinstance(result, dict):
+        raise ValueError('CEFR result is not a JSON object')
+    score = int(round(float(result.get('score', 50))))
+    return min(max(score, 1), 75)
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=15, acks_late=True)
+def grade_cefr_session(self, session_id: int):
+    """FinishCEFRSessionView navbatga qo'yadi; natija DB ga va WebSocket ga"""
+    from leaderboard import engine as leaderboard_engine
+    from users import quotas, scores
+    from users.models import User
+    from webapp.activity import record_activity
+    from .models import CEFRSession
+    from .serializers import CEFRSessionSerializer
+
+    pending = CEFRSession.objects.filter(id=session_id, is_completed=False)
+    session = pending.first()
+    if session is None:
+        return {'status': 'skipped'}
+    pending.update(grading_status=grading.GRADING)
+
+    try:
+        result = _evaluate(session)
+        score = _score(result)
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        return grading.fail('cefr', pending, session, e)
+
+    try:
+        with transaction.atomic():
+            updated = pending.update(
+                score=score,
+                level=CEFRSession.score_to_level(score),
+                feedback=result,
+                ended_at=timezone.now(),
+                is_completed=True,
+                grading_status=grading.DONE,
+                grading_error='',
+            )
+            if not updated:
+                # Parallel ish (qayta yuborilgan) allaqachon yakunlagan
+                return {'status': 'skipped'}
+            User.objects.filter(id=session.user_id).update(cefr_count=F('cefr_count') + 1)
+    except Exception as e:
+        return grading.fail('cefr', pending, session, e)
+
+    # Natija saqlangan (DONE) — qolgan qadamlardagi xato push ni to'xtatmasin
+    data = None
+    try:
+        record_activity(session.user_id)
+        leaderboard_engine.incr('cefr_count', session.user_id)
+        quotas.incr('cefr', session.user_id)
+
+        session = CEFRSession.objects.select_related('user').prefetch_related('answers__question').get(id=session_id)
+        scores.record_cefr(session)
+        data = CEFRSessionSerializer(session).data
+    except Exception as e:
+        logger.error(f"[grading] CEFR #{session_id} post-processing error: {e}")
+        session.refresh_from_db()
+    grading.push(session.user_id, grading.status_payload('cefr', session, data))
+    return {'status': 'done', 'score': session.score}
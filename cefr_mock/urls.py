@@ -5,6 +5,7 @@ urlpatterns = [
     path("start/", views.StartCEFRSessionView.as_view()),
     path("<int:session_id>/answer/<int:question_id>/", views.SubmitCEFRAnswerView.as_view()),
     path("<int:session_id>/finish/", views.FinishCEFRSessionView.as_view()),
+    path("<int:session_id>/status/", views.CEFRSessionStatusView.as_view()),
     path("my-sessions/", views.MyCEFRSessionsView.as_view()),
     path("bot/mock/", views.BotCEFRMockView.as_view()),
 ]
@@ -1,17 +1,15 @@
-import json
 import random
 from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.utils import timezone
+from django.db import transaction
 from django.conf import settings
-from openai import OpenAI
+from config import grading
 from .models import CEFRMock, CEFRQuestion, CEFRSession, CEFRAnswer
+from .tasks import grade_cefr_session
 from .serializers import CEFRSessionSerializer, CEFRQuestionSerializer
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
 
 # ─── Bot: random CEFR mock ─────────────────────────────────────────────────────
 
@@ -113,45 +111,33 @@ class SubmitCEFRAnswerView(APIView):
 
 
 class FinishCEFRSessionView(APIView):
+    """Baholash Celery da ('grading' navbati) — darhol 202, natija ws/grading/ yoki status/ orqali"""
     permission_classes = [IsAuthenticated]
 
     def post(self, request, session_id):
-        try:
-            session = CEFRSession.objects.get(id=session_id, user=request.user, is_completed=False)
-        except CEFRSession.DoesNotExist:
+        session, dispatch = grading.claim(CEFRSession.objects, session_id, request.user)
+        if session is None:
             return Response({"error": "Session not found"}, status=404)
+        if dispatch:
+            transaction.on_commit(lambda: grade_cefr_session.delay(session.id))
+        return Response(grading.status_payload('cefr', session), status=202)
 
-        answers = list(session.answers.select_related('question').all())
-        qa_parts = []
-        for ans in answers:
-            qa_parts.append(
-                '[Part ' + str(ans.question.part) + '] Q: ' + ans.question.question +
-                '\nA: ' + (ans.transcript or '(no answer)') +
-                '\nDuration: ' + str(ans.duration_seconds) + 's'
-            )
-        qa_text = '\n\n'.join(qa_parts)
-
-        resp = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a CEFR language examiner. Score from 1-75."},
-                {"role": "user", "content": f"Evaluate this CEFR Speaking test:\n\n{qa_text}\n\nReturn JSON: {{\"score\":58,\"level\":\"B2\",\"summary\":\"...\",\"strengths\":[],\"improvements\":[],\"errors\":[]}}"},
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=1000
-        )
-        result = json.loads(resp.choices[0].message.content)
-        session.score      = result.get("score", 50)
-        session.level      = CEFRSession.score_to_level(session.score)
-        session.feedback   = result
-        session.ended_at   = timezone.now()
-        session.is_completed = True
-        session.save()
 
-        request.user.cefr_count += 1
-        request.user.save(update_fields=["cefr_count"])
+class CEFRSessionStatusView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        return Response(CEFRSessionSerializer(session).data)
+    def get(self, request, session_id):
+        session = CEFRSession.objects.filter(id=session_id, user=request.user).first()
+        if session is None:
+            return Response({"error": "Session not found"}, status=404)
+        if session.is_completed:
+            session = CEFRSession.objects.prefetch_related('answers__question').get(id=session.id)
+            data = CEFRSessionSerializer(session, context={"request": request}).data
+            return Response(grading.status_payload('cefr', session, data))
+        payload = grading.status_payload('cefr', session)
+        if session.grading_status in grading.IN_PROGRESS:
+            payload['retry_after'] = grading.POLL_INTERVAL
+        return Response(payload)
 
 
 class MyCEFRSessionsView(generics.ListAPIView):
@@ -159,4 +145,7 @@ class MyCEFRSessionsView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return CEFRSession.objects.filter(user=self.request.user, is_completed=True)
+        return (
+            CEFRSession.objects.filter(user=self.request.user, is_completed=True)
+            .prefetch_related('answers__question')
+        )
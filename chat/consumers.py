@@ -108,4 +108,6 @@ class MatchmakingConsumer(AsyncWebsocketConsumer):
             chat_count=__import__('django.db.models', fromlist=['F']).F('chat_count') + 1,
             free_searches_used=__import__('django.db.models', fromlist=['F']).F('free_searches_used') + 1,
         )
+        from leaderboard.engine import incr
+        incr('chat_count', self.user.id, partner.id)
         return ChatRoom.objects.create(user1=self.user, user2=partner)
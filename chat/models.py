@@ -54,6 +54,8 @@ class AIChat(models.Model):
     message_count = models.PositiveIntegerField(default=0)
     analysis      = models.TextField(blank=True, help_text='Sessiya oxirida AI tahlil matni')
     tense_stats   = models.JSONField(null=True, blank=True, help_text='Zamonlar statistikasi')
+    context_summary  = models.TextField(blank=True, help_text='Eski xabarlar xulosasi (prompt uchun)')
+    summarized_count = models.PositiveIntegerField(default=0, help_text='Xulosaga kirgan xabarlar soni')
     created_at    = models.DateTimeField(auto_now_add=True)
     ended_at      = models.DateTimeField(null=True, blank=True)
 
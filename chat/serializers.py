@@ -22,8 +22,9 @@ class ChatRoomSerializer(serializers.ModelSerializer):
                   'status', 'started_at', 'ended_at', 'messages', 'last_message']
 
     def get_last_message(self, obj):
-        last = obj.messages.last()
-        return MessageSerializer(last).data if last else None
+        # prefetch qilingan ro'yxatdan (Meta.ordering = created_at) — qo'shimcha so'rovsiz
+        messages = list(obj.messages.all())
+        return MessageSerializer(messages[-1]).data if messages else None
 
 
 class ChatRatingSerializer(serializers.ModelSerializer):
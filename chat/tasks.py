@@ -0,0 +1,26 @@
+"""
+chat/tasks.py — uzun AI suhbatlar uchun xulosa (config.chat_context)
+"""
+import logging
+
+from celery import shared_task
+
+from config import chat_context
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(ignore_result=True)
+def compact_conversation(kind: str, obj_id: int):
+    """Oynadan chiqqan xabarlarni context_summary ga qo'shish (AIChat / PracticeSession)"""
+    try:
+        added, more = chat_context.compact(kind, obj_id)
+    except Exception as e:
+        logger.warning(f"[compact] {kind} #{obj_id} error: {e}")
+        return
+    finally:
+        chat_context.release_compact_lock(kind, obj_id)
+    if added:
+        logger.info(f"[compact] {kind} #{obj_id}: +{added} xabar xulosaga")
+    if more:
+        compact_conversation.delay(kind, obj_id)
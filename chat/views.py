@@ -2,9 +2,13 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
+from django.db.models import Q
+from django.http import JsonResponse
 from django.utils import timezone
-from django.conf import settings
-from openai import OpenAI
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from config import async_api, chat_context
 from .models import ChatRoom, Message, ChatRating, AIChat, AIChatMessage
 from .serializers import ChatRoomSerializer, ChatRatingSerializer, AIChatSerializer, AIChatMessageSerializer
 
@@ -15,9 +19,13 @@ class MyChatRoomsView(generics.ListAPIView):
 
     def get_queryset(self):
         user = self.request.user
-        return ChatRoom.objects.filter(
-            user1=user
-        ).union(ChatRoom.objects.filter(user2=user)).order_by('-started_at')
+        # union() + default ordering SQLite da xato beradi; xabarlar bitta prefetch bilan
+        return (
+            ChatRoom.objects.filter(Q(user1=user) | Q(user2=user))
+            .select_related('user1', 'user2')
+            .prefetch_related('messages__sender')
+            .order_by('-started_at')
+        )
 
 
 class ChatRoomDetailView(generics.RetrieveAPIView):
@@ -74,42 +82,59 @@ class StartAIChatView(APIView):
         return Response(AIChatSerializer(chat).data)
 
 
-class SendAIMessageView(APIView):
-    permission_classes = [IsAuthenticated]
-
-    def post(self, request, chat_id):
-        try:
-            chat = AIChat.objects.get(id=chat_id, user=request.user)
-        except AIChat.DoesNotExist:
-            return Response({'error': 'Chat not found'}, status=404)
-
-        user_message = request.data.get('content', '')
-        if not user_message:
-            return Response({'error': 'Content required'}, status=400)
-
-        AIChatMessage.objects.create(chat=chat, role='user', content=user_message)
-
-        messages = chat.messages.all()
-        history = [
-            {'role': 'system', 'content': """You are Alex, a friendly English speaking coach.
+AI_COACH_PROMPT = """You are Alex, a friendly English speaking coach.
 - Help users practice conversational English
 - Gently correct mistakes inline in your response
 - Encourage use of new vocabulary
 - Keep responses concise (2-4 sentences)
-- If user writes in another language, respond in English and ask them to try in English"""}
-        ] + [{'role': m.role if m.role == 'user' else 'assistant', 'content': m.content} for m in messages]
+- If user writes in another language, respond in English and ask them to try in English"""
 
-        try:
-            client = OpenAI(api_key=settings.OPENAI_API_KEY)
-            resp = client.chat.completions.create(
-                model='gpt-4o-mini', messages=history, max_tokens=300
-            )
-            ai_reply = resp.choices[0].message.content
-        except Exception as e:
-            ai_reply = "Sorry, I had a small issue. Could you repeat that?"
+AI_FALLBACK_REPLY = "Sorry, I had a small issue. Could you repeat that?"
+
+
+async def _recent_ai_messages(chat_id, limit):
+    qs = AIChatMessage.objects.filter(chat_id=chat_id).order_by('-created_at', '-id')[:limit]
+    return [chat_context.turn(m.role, m.content) async for m in qs][::-1]
 
-        msg = AIChatMessage.objects.create(chat=chat, role='assistant', content=ai_reply)
-        return Response(AIChatMessageSerializer(msg).data)
+
+@method_decorator(csrf_exempt, name='dispatch')
+class SendAIMessageView(View):
+    """
+    Async (ASGI): model javobini kutish thread ni band qilmaydi.
+    Kontekst — xulosa + xulosalanmagan xabarlar (chat_context.pending, token budjet bilan).
+    ?stream=1 → SSE.
+    """
+
+    async def post(self, request, chat_id):
+        user, data = await async_api.authenticate(request)
+        if user is None:
+            return async_api.unauthorized()
+
+        chat = await AIChat.objects.filter(id=chat_id, user=user).afirst()
+        if chat is None:
+            return JsonResponse({'error': 'Chat not found'}, status=404)
+
+        user_message = data.get('content', '')
+        if not user_message:
+            return JsonResponse({'error': 'Content required'}, status=400)
+
+        await AIChatMessage.objects.acreate(chat=chat, role='user', content=user_message)
+        await chat_context.append('ai', chat.id, chat_context.turn('user', user_message))
+        total = await AIChatMessage.objects.filter(chat_id=chat.id).acount()
+        history = await chat_context.pending(
+            'ai', chat.id, lambda n: _recent_ai_messages(chat.id, n), chat.summarized_count, total,
+        )
+        messages = chat_context.build_prompt(AI_COACH_PROMPT, chat.context_summary, history)
+
+        async def on_done(reply):
+            msg = await AIChatMessage.objects.acreate(chat=chat, role='assistant', content=reply)
+            await chat_context.append('ai', chat.id, chat_context.turn('assistant', reply))
+            await chat_context.maybe_compact('ai', chat.id, chat.summarized_count, total + 1)
+            return AIChatMessageSerializer(msg).data
+
+        return await async_api.reply_response(
+            request, chat_context.stream_reply(messages), on_done, fallback=AI_FALLBACK_REPLY,
+        )
 
 
 class MyAIChatsView(generics.ListAPIView):
@@ -117,4 +142,4 @@ class MyAIChatsView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return AIChat.objects.filter(user=self.request.user)
+        return AIChat.objects.filter(user=self.request.user).prefetch_related('messages')
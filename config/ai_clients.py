@@ -0,0 +1,157 @@
+"""
+AI provayder klientlari — bitta joyda, uzoq yashaydigan (long-lived).
+
+- openai_client()        — sync OpenAI (view, Celery task lar uchun), umumiy httpx pool
+- async_openai_client()  — AsyncOpenAI, har bir event loop uchun bitta (consumer lar)
+- gemini_model(...)      — google.generativeai GenerativeModel, konfiguratsiya bo'yicha cache
+- genai_client()         — google.genai Client (Gemini Live)
+- limit(provider)        — async concurrency limit (asyncio.Semaphore, har loop uchun)
+
+Har chaqiruvda klient yaratish = yangi TLS handshake + yangi connection pool.
+Bu yerda keep-alive pool qayta ishlatiladi, h2 o'rnatilgan bo'lsa HTTP/2.
+"""
+import asyncio
+import importlib.util
+import logging
+import threading
+import weakref
+from contextlib import asynccontextmanager
+from functools import lru_cache
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+HTTP2 = importlib.util.find_spec('h2') is not None
+
+_lock = threading.Lock()
+_openai = None
+_genai_client = None
+_genai_configured = False
+_async_openai = weakref.WeakKeyDictionary()
+_semaphores = weakref.WeakKeyDictionary()
+
+
+def _pool_size():
+    return getattr(settings, 'AI_HTTP_POOL_SIZE', 32)
+
+
+def _timeout(provider):
+    return getattr(settings, 'AI_TIMEOUTS', {}).get(provider, 30)
+
+
+def _limits():
+    import httpx
+    size = _pool_size()
+    return httpx.Limits(
+        max_connections=size,
+        max_keepalive_connections=size,
+        keepalive_expiry=60,
+    )
+
+
+def _httpx_timeout(provider):
+    import httpx
+    return httpx.Timeout(_timeout(provider), connect=5.0)
+
+
+# ─── OpenAI ───────────────────────────────────────────────────────────────────
+
+def openai_client():
+    """Sync OpenAI — process bo'yicha bitta (thread-safe)"""
+    global _openai
+    if _openai is None:
+        with _lock:
+            if _openai is None:
+                import openai
+                _openai = openai.OpenAI(
+                    api_key=settings.OPENAI_API_KEY,
+                    timeout=_httpx_timeout('openai'),
+                    max_retries=2,
+                    http_client=openai.DefaultHttpxClient(http2=HTTP2, limits=_limits()),
+                )
+    return _openai
+
+
+def async_openai_client():
+    """AsyncOpenAI — httpx.AsyncClient loop ga bog'langan, shuning uchun har loop uchun bitta"""
+    loop = asyncio.get_running_loop()
+    client = _async_openai.get(loop)
+    if client is None:
+        import openai
+        client = openai.AsyncOpenAI(
+            api_key=settings.OPENAI_API_KEY,
+            timeout=_httpx_timeout('openai'),
+            max_retries=1,
+            http_client=openai.DefaultAsyncHttpxClient(http2=HTTP2, limits=_limits()),
+        )
+        _async_openai[loop] = client
+    return client
+
+
+# ─── Gemini ───────────────────────────────────────────────────────────────────
+
+def _configure_genai():
+    global _genai_configured
+    import google.generativeai as genai
+    if not _genai_configured:
+        with _lock:
+            if not _genai_configured:
+                genai.configure(api_key=settings.GEMINI_API_KEY)
+                _genai_configured = True
+    return genai
+
+
+@lru_cache(maxsize=256)
+def _cached_model(name, system_instruction, generation_items):
+    genai = _configure_genai()
+    return genai.GenerativeModel(
+        name,
+        system_instruction=system_instruction or None,
+        generation_config=genai.GenerationConfig(**dict(generation_items)),
+    )
+
+
+def gemini_model(name='gemini-2.0-flash', system_instruction=None, **generation_config):
+    """Bir xil (model, system prompt, config) uchun bitta GenerativeModel"""
+    return _cached_model(name, system_instruction, tuple(sorted(generation_config.items())))
+
+
+def gemini_request_options():
+    """generate_content_async / send_message_async uchun timeout"""
+    return {'timeout': _timeout('gemini')}
+
+
+def genai_client():
+    """google.genai Client (Live API) — process bo'yicha bitta"""
+    global _genai_client
+    if _genai_client is None:
+        with _lock:
+            if _genai_client is None:
+                import google.genai as google_genai
+                _genai_client = google_genai.Client(api_key=settings.GEMINI_API_KEY)
+    return _genai_client
+
+
+# ─── Concurrency limit ────────────────────────────────────────────────────────
+
+def _semaphore(provider):
+    loop = asyncio.get_running_loop()
+    per_loop = _semaphores.get(loop)
+    if per_loop is None:
+        per_loop = _semaphores[loop] = {}
+    sem = per_loop.get(provider)
+    if sem is None:
+        size = getattr(settings, 'AI_MAX_CONCURRENCY', {}).get(provider, _pool_size())
+        sem = per_loop[provider] = asyncio.Semaphore(size)
+    return sem
+
+
+@asynccontextmanager
+async def limit(provider):
+    """
+    async with limit('openai'):
+        await async_openai_client().audio.speech.create(...)
+    """
+    async with _semaphore(provider):
+        yield
@@ -0,0 +1,108 @@
+"""
+ASGI (daphne) da ishlaydigan async API view lar uchun yordamchilar.
+
+DRF APIView sync — model javobini kutish paytida thread band bo'lib turadi.
+Async view lar DRF autentifikatsiyasini (JWT / session) shu yerda ishlatadi,
+model javobini esa JSON yoki Server-Sent Events (SSE) ko'rinishida qaytaradi:
+
+    POST ...            → {"role": "assistant", "content": ...}
+    POST ...?stream=1   → text/event-stream:
+                          event: delta  data: {"content": "..."}
+                          event: done   data: {...saqlangan xabar...}
+                          event: error  data: {"error": "..."}
+"""
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse, StreamingHttpResponse
+
+logger = logging.getLogger(__name__)
+
+
+def _authenticate(request):
+    from rest_framework import exceptions
+    from rest_framework.request import Request
+    from rest_framework.settings import api_settings
+
+    drf_request = Request(
+        request,
+        parsers=[p() for p in api_settings.DEFAULT_PARSER_CLASSES],
+        authenticators=[a() for a in api_settings.DEFAULT_AUTHENTICATION_CLASSES],
+    )
+    try:
+        user = drf_request.user
+        if not user or not user.is_authenticated:
+            return None, {}
+        return user, drf_request.data
+    except exceptions.APIException:
+        return None, {}
+
+
+async def authenticate(request):
+    """DRF DEFAULT_AUTHENTICATION_CLASSES bo'yicha → (user | None, data)"""
+    return await sync_to_async(_authenticate)(request)
+
+
+def unauthorized():
+    return JsonResponse({'detail': 'Authentication credentials were not provided.'}, status=401)
+
+
+def wants_stream(request):
+    return (
+        request.GET.get('stream') in ('1', 'true')
+        or 'text/event-stream' in request.headers.get('Accept', '')
+    )
+
+
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+
+async def _collect(deltas, fallback):
+    parts = []
+    try:
+        async for delta in deltas:
+            parts.append(delta)
+    except Exception as e:
+        logger.warning(f"[async_api] reply error: {e}")
+        if not parts:
+            if fallback is None:
+                raise
+            return fallback
+    return ''.join(parts)
+
+
+async def reply_response(request, deltas, on_done, fallback=None):
+    """
+    deltas   — javob bo'laklari (async generator)
+    on_done  — async (reply) → dict; javobni saqlaydi, oxirgi payload
+    fallback — javob umuman olinmaganda saqlanadigan matn (None — xato qaytariladi)
+    """
+    if not wants_stream(request):
+        try:
+            reply = await _collect(deltas, fallback)
+        except Exception:
+            return JsonResponse({'error': 'AI service unavailable'}, status=502)
+        return JsonResponse(await on_done(reply))
+
+    async def events():
+        parts = []
+        try:
+            async for delta in deltas:
+                parts.append(delta)
+                yield _event('delta', {'content': delta})
+        except Exception as e:
+            logger.warning(f"[async_api] stream error: {e}")
+            if not parts:
+                if fallback is None:
+                    yield _event('error', {'error': 'AI service unavailable'})
+                    return
+                parts = [fallback]
+                yield _event('delta', {'content': fallback})
+        yield _event('done', await on_done(''.join(parts)))
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'   # nginx buffer qilmasin
+    return response
@@ -0,0 +1,276 @@
+"""
+AI suhbatlar uchun prompt konteksti — Redis dagi cheklangan (rolling) oyna + xulosa.
+
+    chatctx:<kind>:<id>   → oxirgi WINDOW ta xabar (Redis list, JSON {role, content})
+
+- append(kind, id, *turns)    — xabar DB ga yozilgandan keyin; key bo'lsagina (RPUSHX)
+- window(kind, id, load)      — oyna; key yo'q bo'lsa load(WINDOW) DB dan oxirgilarini oladi
+- pending(kind, id, load, summarized_count, total) — xulosaga kirmagan barcha xabarlar
+                                 (oyna yetsa undan, aks holda DB dan)
+- build_prompt(system, summary, turns) — system + xulosa + token budjetga sig'gan oxirgi xabarlar
+- maybe_compact(kind, id, ...) — oynadan chiqqan xabarlar COMPACT_BATCH ga yetsa
+                                 Celery (chat.tasks.compact_conversation) xulosani yangilaydi
+- stream_reply(messages)      — OpenAI javobini bo'laklab (async generator)
+
+Har navbatda butun tarixni Postgres dan o'qib, modelga yuborish o'rniga
+xulosa + oxirgi xabarlar. Xulosa AIChat / PracticeSession.context_summary da,
+summarized_count — xulosaga kirgan (eng eski) xabarlar soni. Prompt = xulosa +
+xulosalanmagan xabarlar (pending): Celery xulosani yangilaguncha oynadan chiqqan
+xabarlar ham promptda qoladi, xulosadagilari esa takrorlanmaydi.
+Token sanash lokal: tiktoken o'rnatilgan bo'lsa u, aks holda ~4 belgi = 1 token.
+"""
+import importlib.util
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+
+from config import ai_clients
+from config.redis_client import get_async_redis, mark_down
+
+logger = logging.getLogger(__name__)
+
+WINDOW = 12
+CONTEXT_TTL = 60 * 60 * 24
+
+HISTORY_TOKEN_BUDGET = 1200   # xulosadan keyingi xabarlar uchun
+COMPACT_BATCH = 6             # oynadan chiqqan shuncha xabar yig'ilsa — xulosa
+SUMMARY_TRIGGER_TOKENS = 1500  # consumer (xotiradagi tarix) uchun
+SUMMARY_MAX_TOKENS = 250
+COMPACT_MAX_MESSAGES = 60     # bitta xulosa so'rovida (eski uzun suhbatlar bo'laklab)
+COMPACT_LOCK_TTL = 120
+
+# kind → (suhbat modeli, xabar modeli, xabardagi FK maydoni)
+CONVERSATIONS = {
+    'ai': ('chat.AIChat', 'chat.AIChatMessage', 'chat_id'),
+    'practice': ('practice.PracticeSession', 'practice.PracticeMessage', 'session_id'),
+}
+
+SUMMARY_PROMPT = (
+    "You compress an English-practice conversation between a learner (user) and an AI coach "
+    "(assistant) into a running summary. Keep topics discussed, facts the learner shared about "
+    "themselves, recurring mistakes and anything the coach promised to return to. "
+    "Write at most 120 words, third person, no preamble."
+)
+
+HAS_TIKTOKEN = importlib.util.find_spec('tiktoken') is not None
+_encoding = None
+
+
+def _key(kind, obj_id):
+    return f'chatctx:{kind}:{obj_id}'
+
+
+def turn(role, content):
+    return {'role': 'user' if role == 'user' else 'assistant', 'content': content}
+
+
+async def append(kind, obj_id, *turns):
+    r = get_async_redis()
+    if r is None or not turns:
+        return
+    key = _key(kind, obj_id)
+    try:
+        async with r.pipeline(transaction=False) as pipe:
+            pipe.rpushx(key, *[json.dumps(t, ensure_ascii=False) for t in turns])
+            pipe.ltrim(key, -WINDOW, -1)
+            pipe.expire(key, CONTEXT_TTL)
+            await pipe.execute()
+    except Exception as e:
+        logger.warning(f"[chat_context] append error: {e}")
+        mark_down()
+
+
+async def window(kind, obj_id, load):
+    """
+    Oxirgi WINDOW ta xabar (eskidan yangiga).
+    load(limit) — async, DB dan oxirgi limit ta xabar [{role, content}, ...]
+    """
+    r = get_async_redis()
+    key = _key(kind, obj_id)
+    if r is not None:
+        try:
+            cached = await r.lrange(key, 0, -1)
+            if cached:
+                return [json.loads(item) for item in cached]
+        except Exception as e:
+            logger.warning(f"[chat_context] read error: {e}")
+            mark_down()
+            r = None
+
+    turns = await load(WINDOW)
+    if r is not None and turns:
+        try:
+            async with r.pipeline(transaction=True) as pipe:
+                pipe.delete(key)
+                pipe.rpush(key, *[json.dumps(t, ensure_ascii=False) for t in turns])
+                pipe.expire(key, CONTEXT_TTL)
+                await pipe.execute()
+        except Exception as e:
+            logger.warning(f"[chat_context] fill error: {e}")
+            mark_down()
+    return turns
+
+
+async def pending(kind, obj_id, load, summarized_count, total):
+    """
+    summarized_count dan keyingi barcha xabarlar (eskidan yangiga) — xulosa bilan oyna orasida
+    bo'shliq qolmaydi. Compaction kechiksa ham DB dan o'qiladigani cheklangan (fit baribir kesadi).
+    """
+    count = total - summarized_count
+    if count <= 0:
+        return []
+    if count <= WINDOW:
+        turns = await window(kind, obj_id, load)
+        return turns[-count:]
+    return await load(min(count, WINDOW + COMPACT_MAX_MESSAGES))
+
+
+async def stream_reply(messages, model='gpt-4o-mini', max_tokens=300):
+    """Javob matni bo'laklari (async generator)"""
+    async with ai_clients.limit('openai'):
+        stream = await ai_clients.async_openai_client().chat.completions.create(
+            model=model, messages=messages, max_tokens=max_tokens, stream=True,
+        )
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+
+
+# ─── Token budjet ─────────────────────────────────────────────────────────────
+
+def count_tokens(text):
+    """Lokal, tarmoqsiz token soni (tiktoken yoki taxminiy)"""
+    global _encoding
+    if not text:
+        return 0
+    if HAS_TIKTOKEN:
+        if _encoding is None:
+            import tiktoken
+            _encoding = tiktoken.get_encoding('o200k_base')
+        return len(_encoding.encode(text))
+    return (len(text) + 3) // 4
+
+
+def turns_tokens(turns):
+    # har bir xabar uchun ~4 token rol/ajratkich
+    return sum(count_tokens(t['content']) + 4 for t in turns)
+
+
+def fit(turns, budget=HISTORY_TOKEN_BUDGET):
+    """Budjetga sig'gan oxirgi xabarlar (oxirgisi doim qoladi)"""
+    kept = []
+    used = 0
+    for t in reversed(turns):
+        cost = count_tokens(t['content']) + 4
+        if kept and used + cost > budget:
+            break
+        kept.append(t)
+        used += cost
+    return kept[::-1]
+
+
+def build_prompt(system, summary, turns, budget=HISTORY_TOKEN_BUDGET):
+    """Bitta system xabar (Gemini faqat bittasini oladi) + xabarlar"""
+    if summary:
+        system = f"{system}\n\nSummary of the earlier conversation:\n{summary}"
+    return [{'role': 'system', 'content': system}] + fit(turns, budget)
+
+
+# ─── Xulosa (compaction) ──────────────────────────────────────────────────────
+
+def _summary_messages(summary, turns):
+    transcript = '\n'.join(f"{t['role']}: {t['content']}" for t in turns)
+    content = f"Current summary:\n{summary or '(none)'}\n\nNew messages:\n{transcript}"
+    return [
+        {'role': 'system', 'content': SUMMARY_PROMPT},
+        {'role': 'user', 'content': content},
+    ]
+
+
+def summarize(summary, turns):
+    """Sync (Celery): eski xulosa + yangi xabarlar → yangi xulosa"""
+    resp = ai_clients.openai_client().chat.completions.create(
+        model='gpt-4o-mini', messages=_summary_messages(summary, turns),
+        max_tokens=SUMMARY_MAX_TOKENS,
+    )
+    return (resp.choices[0].message.content or '').strip()
+
+
+async def asummarize(summary, turns):
+    """Async (consumer) variant"""
+    async with ai_clients.limit('openai'):
+        resp = await ai_clients.async_openai_client().chat.completions.create(
+            model='gpt-4o-mini', messages=_summary_messages(summary, turns),
+            max_tokens=SUMMARY_MAX_TOKENS,
+        )
+    return (resp.choices[0].message.content or '').strip()
+
+
+def _compact_lock_key(kind, obj_id):
+    return f'chatctx:compact:{kind}:{obj_id}'
+
+
+async def maybe_compact(kind, obj_id, summarized_count, total):
+    """Oynadan chiqqan, xulosalanmagan xabarlar COMPACT_BATCH dan oshsa — Celery task"""
+    if total - summarized_count - WINDOW < COMPACT_BATCH:
+        return
+    r = get_async_redis()
+    if r is not None:
+        try:
+            if not await r.set(_compact_lock_key(kind, obj_id), 1, nx=True, ex=COMPACT_LOCK_TTL):
+                return
+        except Exception as e:
+            logger.warning(f"[chat_context] lock error: {e}")
+            mark_down()
+    from chat.tasks import compact_conversation
+    try:
+        await sync_to_async(compact_conversation.delay)(kind, obj_id)
+    except Exception as e:
+        logger.warning(f"[chat_context] compact enqueue error: {e}")
+
+
+def release_compact_lock(kind, obj_id):
+    from config.redis_client import get_redis
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.delete(_compact_lock_key(kind, obj_id))
+    except Exception as e:
+        logger.warning(f"[chat_context] unlock error: {e}")
+        mark_down()
+
+
+def compact(kind, obj_id):
+    """
+    Celery dan: oynadan oldingi xulosalanmagan xabarlar → context_summary.
+    summarized_count bo'yicha shartli UPDATE — parallel ish bir-birini bosmaydi.
+    → (xulosaga qo'shilgan xabarlar, yana qolganmi)
+    """
+    from django.apps import apps
+
+    conv_label, msg_label, fk = CONVERSATIONS[kind]
+    conv_model = apps.get_model(conv_label)
+    msg_model = apps.get_model(msg_label)
+
+    conv = conv_model.objects.filter(pk=obj_id).values('context_summary', 'summarized_count').first()
+    if conv is None:
+        return 0, False
+    start = conv['summarized_count']
+    rows = list(
+        msg_model.objects.filter(**{fk: obj_id})
+        .order_by('created_at', 'id')
+        .values_list('role', 'content')[start:]
+    )
+    pending = rows[:-WINDOW]
+    older = pending[:COMPACT_MAX_MESSAGES]
+    if not older:
+        return 0, False
+    summary = summarize(conv['context_summary'], [turn(role, content) for role, content in older])
+    if not summary:
+        return 0, False
+    updated = conv_model.objects.filter(pk=obj_id, summarized_count=start).update(
+        context_summary=summary, summarized_count=start + len(older),
+    )
+    return len(older), bool(updated) and len(pending) > len(older)
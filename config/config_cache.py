@@ -0,0 +1,248 @@
+"""
+Kam o'zgaradigan sozlamalar uchun process ichidagi cache.
+
+    config_cache.get('app_settings')       # AppSettings (nusxa)
+    config_cache.get('payment_card')       # aktiv PaymentCard yoki None
+    config_cache.get('premium_plans')      # aktiv PremiumPlan lar (order bo'yicha)
+    config_cache.get('required_channels')  # barcha RequiredChannel lar
+
+Har bir yozuv versiya bilan saqlanadi (Redis: config_cache:version:<name>).
+Model o'zgarganda (post_save / post_delete → commit dan keyin) invalidate():
+versiya INCR qilinadi va CHANNEL ga "<name>:<version>" PUBLISH qilinadi.
+Har bir process (daphne, celery worker) dagi listener thread eski versiyali
+yozuvni tashlaydi — keyingi get() DB dan qayta o'qiydi.
+
+Listener ishlamasa (Redis yo'q) yozuvlar FALLBACK_TTL soniyadan keyin eskiradi.
+QuerySet.update() signal bermaydi — bunday joylarda invalidate() qo'lda chaqiriladi.
+"""
+import copy
+import logging
+import os
+import threading
+import time
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from config.redis_client import get_redis, mark_down
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'config_cache'
+FALLBACK_TTL = 10
+RECONNECT_DELAY = 2
+
+_entries = {}       # name → (version, loaded_at, value)
+_published = {}     # name → listener ko'rgan eng so'nggi versiya
+_listening = threading.Event()
+_listener_pid = None
+_listener_lock = threading.Lock()
+
+
+# ─── Loader lar ───────────────────────────────────────────────────────────────
+
+def _load_app_settings():
+    from webapp.models import AppSettings
+    obj, _ = AppSettings.objects.get_or_create(pk=1)
+    return obj
+
+
+def _load_payment_card():
+    from webapp.models import PaymentCard
+    return PaymentCard.objects.filter(is_active=True).first()
+
+
+def _load_premium_plans():
+    from premium.models import PremiumPlan
+    return list(PremiumPlan.objects.filter(is_active=True).order_by('order', 'id'))
+
+
+def _load_required_channels():
+    from webapp.models import RequiredChannel
+    return list(RequiredChannel.objects.order_by('id'))
+
+
+LOADERS = {
+    'app_settings': _load_app_settings,
+    'payment_card': _load_payment_card,
+    'premium_plans': _load_premium_plans,
+    'required_channels': _load_required_channels,
+}
+
+# model → shu model o'zgarganda eskiradigan yozuvlar
+MODELS = {
+    'webapp.AppSettings': ('app_settings',),
+    'webapp.PaymentCard': ('payment_card',),
+    'webapp.RequiredChannel': ('required_channels',),
+    'premium.PremiumPlan': ('premium_plans',),
+}
+
+
+def _version_key(name):
+    return f'config_cache:version:{name}'
+
+
+def _copy(value):
+    # Chaqiruvchi obyektni o'zgartirsa (masalan s.x = ...; s.save()) cache buzilmasin
+    if isinstance(value, list):
+        return [copy.copy(v) for v in value]
+    return copy.copy(value)
+
+
+# ─── O'qish ───────────────────────────────────────────────────────────────────
+
+def _current_version(name):
+    r = get_redis()
+    if r is None:
+        return None
+    try:
+        return int(r.get(_version_key(name)) or 0)
+    except Exception as e:
+        logger.warning(f"[config_cache] version error: {e}")
+        mark_down()
+        return None
+
+
+def get(name):
+    """Cache dagi qiymat nusxasi; yo'q yoki eskirgan bo'lsa DB dan"""
+    _ensure_listener()
+    entry = _entries.get(name)
+    if entry is not None:
+        version, loaded_at, value = entry
+        if _listening.is_set() and version is not None:
+            return _copy(value)
+        if time.monotonic() - loaded_at < FALLBACK_TTL:
+            return _copy(value)
+
+    # Versiya DB dan oldin o'qiladi: o'qish paytida kelgan invalidatsiya yo'qolmaydi
+    version = _current_version(name)
+    value = LOADERS[name]()
+    if version is None or _published.get(name, 0) <= version:
+        _entries[name] = (version, time.monotonic(), value)
+    return _copy(value)
+
+
+def app_settings():
+    return get('app_settings')
+
+
+def payment_card():
+    return get('payment_card')
+
+
+def premium_plans():
+    return get('premium_plans')
+
+
+def premium_plan(plan_id=None, duration_days=None):
+    """Aktiv plan id bo'yicha yoki davomiylik bo'yicha birinchisi"""
+    for plan in premium_plans():
+        if plan_id is not None and str(plan.id) != str(plan_id):
+            continue
+        if duration_days is not None and plan.duration_days != duration_days:
+            continue
+        return plan
+    return None
+
+
+def required_channels():
+    return get('required_channels')
+
+
+# ─── Invalidatsiya ────────────────────────────────────────────────────────────
+
+def invalidate(*names):
+    """Shu process da darhol, qolganlarida pub/sub orqali"""
+    names = [n for n in names if n in LOADERS]
+    for name in names:
+        _entries.pop(name, None)
+    r = get_redis()
+    if r is None or not names:
+        return
+    try:
+        pipe = r.pipeline(transaction=False)
+        for name in names:
+            pipe.incr(_version_key(name))
+        versions = pipe.execute()
+        pipe = r.pipeline(transaction=False)
+        for name, version in zip(names, versions):
+            pipe.publish(CHANNEL, f'{name}:{version}')
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"[config_cache] publish error: {e}")
+        mark_down()
+
+
+def _on_change(sender, **kwargs):
+    names = MODELS.get(sender._meta.label, ())
+    if names:
+        transaction.on_commit(lambda: invalidate(*names))
+
+
+def connect_signals():
+    """WebappConfig.ready() dan chaqiriladi"""
+    for label in MODELS:
+        post_save.connect(_on_change, sender=label, dispatch_uid=f'config_cache_save_{label}')
+        post_delete.connect(_on_change, sender=label, dispatch_uid=f'config_cache_delete_{label}')
+
+
+# ─── Listener ─────────────────────────────────────────────────────────────────
+
+def _handle(message):
+    name, _, version = str(message).rpartition(':')
+    try:
+        version = int(version)
+    except ValueError:
+        return
+    _published[name] = max(_published.get(name, 0), version)
+    entry = _entries.get(name)
+    if entry is not None and (entry[0] is None or entry[0] < version):
+        _entries.pop(name, None)
+
+
+def _listen():
+    while True:
+        r = get_redis()
+        if r is None:
+            time.sleep(RECONNECT_DELAY)
+            continue
+        pubsub = r.pubsub(ignore_subscribe_messages=True)
+        try:
+            pubsub.subscribe(CHANNEL)
+            # Ulanish uzilgan paytda kelgan xabarlar yo'qolgan bo'lishi mumkin; Redis qayta
+            # ishga tushgan / flush qilingan bo'lsa versiyalar yana 1 dan boshlanadi
+            _entries.clear()
+            _published.clear()
+            _listening.set()
+            while True:
+                message = pubsub.get_message(timeout=1.0)
+                if message and message.get('type') == 'message':
+                    _handle(message['data'])
+        except Exception as e:
+            logger.warning(f"[config_cache] listener error: {e}")
+            mark_down()
+        finally:
+            _listening.clear()
+            try:
+                pubsub.close()
+            except Exception:
+                pass
+        time.sleep(RECONNECT_DELAY)
+
+
+def _ensure_listener():
+    """Har bir process (fork dan keyin ham) uchun bitta daemon thread"""
+    global _listener_pid
+    pid = os.getpid()
+    if _listener_pid == pid:
+        return
+    with _listener_lock:
+        if _listener_pid == pid:
+            return
+        if _listener_pid is not None:
+            # fork: ota process ning yozuvlari va listener holati bu yerda yaroqsiz
+            _entries.clear()
+            _published.clear()
+            _listening.clear()
+        _listener_pid = pid
+        threading.Thread(target=_listen, name='config-cache-listener', daemon=True).start()
@@ -0,0 +1,92 @@
+"""
+IELTS / CEFR imtihonlarini asinxron baholash — umumiy holatlar va WebSocket push.
+
+Oqim:
+    POST .../<id>/finish/  → 202 {job_id, status: queued}; task commit dan keyin navbatga
+    Celery ('grading' navbati) → grading_status: grading → done | failed
+    Natija: ws/grading/ (GradingConsumer, guruh grading_<user_id>) yoki GET .../<id>/status/
+
+Sessiya bir vaqtda faqat bitta ishda bo'ladi: finish holatni shartli UPDATE bilan
+o'zgartiradi. STALE_AFTER dan uzoq navbatda qolgan ish qayta finish da yana yuboriladi.
+"""
+import logging
+from datetime import timedelta
+
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+QUEUED = 'queued'
+GRADING = 'grading'
+DONE = 'done'
+FAILED = 'failed'
+
+STATUS_CHOICES = [
+    ('', '—'),
+    (QUEUED, 'Navbatda'),
+    (GRADING, 'Baholanmoqda'),
+    (DONE, 'Tayyor'),
+    (FAILED, 'Xato'),
+]
+
+IN_PROGRESS = (QUEUED, GRADING)
+STALE_AFTER = timedelta(minutes=10)
+POLL_INTERVAL = 3   # status endpoint javobidagi retry_after (soniya)
+
+
+def group_name(user_id):
+    return f'grading_{user_id}'
+
+
+def claim(queryset, session_id, user):
+    """
+    Sessiyani navbatga qo'yish (shartli UPDATE) → (session | None, dispatch: bool)
+    dispatch=False — ish allaqachon navbatda/baholanmoqda (takroriy finish)
+    """
+    now = timezone.now()
+    base = queryset.filter(id=session_id, user=user, is_completed=False)
+    fresh = base.filter(grading_status__in=['', FAILED])
+    stale = base.filter(grading_status__in=IN_PROGRESS, grading_started_at__lt=now - STALE_AFTER)
+    updated = (fresh | stale).update(
+        grading_status=QUEUED, grading_error='', grading_started_at=now,
+    )
+    session = base.first()
+    return session, bool(updated)
+
+
+def status_payload(kind, session, result=None):
+    payload = {
+        'type': 'grading',
+        'kind': kind,
+        'job_id': session.id,
+        'session_id': session.id,
+        'status': session.grading_status or (DONE if session.is_completed else ''),
+    }
+    if session.grading_error:
+        payload['error'] = session.grading_error
+    if result is not None:
+        payload['result'] = result
+    return payload
+
+
+def push(user_id, payload):
+    """Foydalanuvchining ochiq WebSocket lariga natija (Celery worker dan)"""
+    try:
+        from asgiref.sync import async_to_sync
+        from channels.layers import get_channel_layer
+
+        layer = get_channel_layer()
+        if layer is None:
+            return
+        async_to_sync(layer.group_send)(group_name(user_id), {'type': 'grading.update', 'payload': payload})
+    except Exception as e:
+        logger.warning(f"[grading] push error: {e}")
+
+
+def fail(kind, queryset, session, error):
+    """Baholash yakunlanmadi: FAILED + xato matni va foydalanuvchiga push (client poll qilib qolmasin)"""
+    logger.error(f"[grading] {kind.upper()} #{session.id} failed: {error}")
+    queryset.update(grading_status=FAILED, grading_error=str(error)[:500])
+    session.refresh_from_db()
+    push(session.user_id, status_payload(kind, session))
+    return {'status': 'failed'}
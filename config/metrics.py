@@ -0,0 +1,258 @@
+"""
+Speaking pipeline lari uchun latency metrikalari — process ichidagi HDR uslubidagi histogrammalar.
+
+    metrics.observe('stt', seconds, provider='openai', model='whisper-1', pipeline='practice')
+    with metrics.timer('db_write', model='PracticeMessage'):
+        ...
+
+    turn = metrics.Trace('practice', provider='gemini', model='gemini-2.0-flash', session=12)
+    with turn.stage('ffmpeg'):
+        ...
+    turn.mark('time_to_first_audio')   # turn boshidan birinchi audio yuborilguncha
+    turn.finish()                       # 'turn' histogrammasi + "[trace] {...}" JSON log qatori
+
+Histogramma (pipeline, stage, provider, model) bo'yicha. Qiymatlar mikrosekundda log-linear
+bucket larga tushadi: har bir 2 darajasi SUB_BUCKETS ta teng bo'lakka bo'lingan (~1.6% aniqlik),
+xotira — faqat uchragan bucket lar. p50 / p95 / p99 shu bucket lardan hisoblanadi.
+
+Stage lar:
+    decode                    — websocket xabari → audio bytes (base64 / framing)
+    ffmpeg, stt               — practice.audio.to_wav16k, Whisper
+    llm_first_token, llm_completion
+    tts, send                 — tts_cache (hit bo'lsa ham), socketga yozish
+    db_write, context_append  — _save_message (DB, chat_context)
+    upstream_send             — AICallConsumer: browser audio → Gemini Live
+    time_to_first_audio, turn — Trace.mark() / Trace.finish() (turn — faqat status='ok')
+
+/metrics — Prometheus text formati (summary: 0.5 / 0.95 / 0.99 kvantillar + tts_cache.stats()).
+Metrikalar har bir process niki: consumer lar ishlaydigan ASGI (daphne) process dan scrape qilinadi.
+Ruxsat: "Authorization: Bearer <settings.METRICS_TOKEN>". Token berilmagan bo'lsa endpoint yopiq
+(403) — faqat DEBUG da tokensiz ochiq.
+"""
+import hmac
+import json
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.http import HttpResponse
+
+logger = logging.getLogger(__name__)
+
+SUB_BUCKET_BITS = 7
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC = 'speaking_stage_seconds'
+
+_histograms = {}        # (pipeline, stage, provider, model) → Histogram
+_lock = threading.Lock()
+
+
+# ─── Histogramma ──────────────────────────────────────────────────────────────
+
+def _bucket(us):
+    """mikrosekund → bucket kaliti (kalit oshib borsa qiymat ham oshadi)"""
+    if us < SUB_BUCKETS:
+        return us
+    shift = us.bit_length() - SUB_BUCKET_BITS
+    return (shift << SUB_BUCKET_BITS) | (us >> shift)
+
+
+def _bucket_value(key):
+    """bucket kaliti → bucket o'rtasidagi qiymat (mikrosekund)"""
+    shift = key >> SUB_BUCKET_BITS
+    if not shift:
+        return key
+    low = (key & (SUB_BUCKETS - 1)) << shift
+    return low + ((1 << shift) - 1) / 2
+
+
+class Histogram:
+    __slots__ = ('counts', 'count', 'sum', 'max')
+
+    def __init__(self):
+        self.counts = {}
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def record(self, seconds):
+        seconds = max(seconds, 0.0)
+        key = _bucket(int(seconds * 1_000_000))
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.count += 1
+        self.sum += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q):
+        """soniya; bo'sh histogramma — 0"""
+        if not self.count:
+            return 0.0
+        rank = max(1, q * self.count)
+        seen = 0
+        for key in sorted(self.counts):
+            seen += self.counts[key]
+            if seen >= rank:
+                return min(_bucket_value(key) / 1_000_000, self.max)
+        return self.max
+
+
+def observe(stage, seconds, provider='', model='', pipeline=''):
+    key = (pipeline, stage, provider, model)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.record(seconds)
+
+
+@contextmanager
+def timer(stage, provider='', model='', pipeline=''):
+    """Blok vaqtini yozadi (xato bo'lsa ham); async kod ichida ham ishlaydi"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - started, provider, model, pipeline)
+
+
+def snapshot():
+    """[{pipeline, stage, provider, model, count, sum, max, p50, p95, p99}] — soniyada"""
+    with _lock:
+        items = sorted(_histograms.items())
+        rows = []
+        for (pipeline, stage, provider, model), hist in items:
+            row = {
+                'pipeline': pipeline, 'stage': stage, 'provider': provider, 'model': model,
+                'count': hist.count, 'sum': hist.sum, 'max': hist.max,
+            }
+            row.update({f'p{int(q * 100)}': hist.quantile(q) for q in QUANTILES})
+            rows.append(row)
+    return rows
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+
+
+# ─── Turn trace ───────────────────────────────────────────────────────────────
+
+class Trace:
+    """
+    Bitta speaking turn: stage lar histogrammaga ham, turn ro'yxatiga ham yoziladi.
+    provider / model — pipeline darajasidagi metrikalar (time_to_first_audio, turn) uchun teg.
+    """
+
+    def __init__(self, pipeline, started=None, provider='', model='', **fields):
+        self.pipeline = pipeline
+        self.provider = provider
+        self.model = model
+        self.started = started or time.perf_counter()
+        self.fields = fields
+        self.stages = []
+        self.marks = {}
+        self.finished = False
+
+    def observe(self, stage, seconds, provider='', model=''):
+        observe(stage, seconds, provider, model, self.pipeline)
+        entry = {'stage': stage, 'ms': round(seconds * 1000, 1)}
+        if provider:
+            entry['provider'] = provider
+        if model:
+            entry['model'] = model
+        self.stages.append(entry)
+
+    @contextmanager
+    def stage(self, stage, provider='', model=''):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - started, provider, model)
+
+    def mark(self, name):
+        """Turn boshidan hozirgacha — faqat birinchi marta (masalan time_to_first_audio)"""
+        if name in self.marks:
+            return
+        seconds = time.perf_counter() - self.started
+        self.marks[name] = round(seconds * 1000, 1)
+        observe(name, seconds, self.provider, self.model, self.pipeline)
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def finish(self, status='ok'):
+        if self.finished:
+            return
+        self.finished = True
+        total = time.perf_counter() - self.started
+        if status == 'ok':
+            # busy / bo'sh turnlar p50 ni pastga tortmasin — ular faqat trace log da
+            observe('turn', total, self.provider, self.model, self.pipeline)
+        record = {
+            'pipeline': self.pipeline, 'status': status, 'total_ms': round(total * 1000, 1),
+            **self.marks, **self.fields, 'stages': self.stages,
+        }
+        logger.info(f"[trace] {json.dumps(record, default=str)}")
+
+
+# ─── Prometheus ───────────────────────────────────────────────────────────────
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render():
+    """Prometheus text exposition format (0.0.4)"""
+    from . import tts_cache
+
+    lines = [
+        f'# HELP {METRIC} Speaking pipeline stage latency (in-process HDR histogram)',
+        f'# TYPE {METRIC} summary',
+    ]
+    rows = snapshot()
+    for row in rows:
+        labels = {k: row[k] for k in ('pipeline', 'stage', 'provider', 'model')}
+        for q in QUANTILES:
+            lines.append(f"{METRIC}{_labels(**labels, quantile=q)} {row[f'p{int(q * 100)}']:.6f}")
+        lines.append(f"{METRIC}_sum{_labels(**labels)} {row['sum']:.6f}")
+        lines.append(f"{METRIC}_count{_labels(**labels)} {row['count']}")
+
+    lines += [f'# HELP {METRIC}_max Slowest observation', f'# TYPE {METRIC}_max gauge']
+    for row in rows:
+        labels = {k: row[k] for k in ('pipeline', 'stage', 'provider', 'model')}
+        lines.append(f"{METRIC}_max{_labels(**labels)} {row['max']:.6f}")
+
+    cache = tts_cache.stats()
+    lines += ['# HELP speaking_tts_cache_events_total TTS cache events', '# TYPE speaking_tts_cache_events_total counter']
+    for event, value in sorted(cache.items()):
+        if event not in ('memory_bytes', 'hit_ratio'):
+            lines.append(f'speaking_tts_cache_events_total{_labels(event=event)} {value}')
+    lines += [
+        '# TYPE speaking_tts_cache_memory_bytes gauge',
+        f"speaking_tts_cache_memory_bytes {cache['memory_bytes']}",
+    ]
+    if cache['hit_ratio'] is not None:
+        lines += ['# TYPE speaking_tts_cache_hit_ratio gauge', f"speaking_tts_cache_hit_ratio {cache['hit_ratio']}"]
+    return '\n'.join(lines) + '\n'
+
+
+def _authorized(request):
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if not token:
+        return settings.DEBUG
+    given = request.headers.get('Authorization', '')
+    return hmac.compare_digest(given.encode(), f'Bearer {token}'.encode())
+
+
+def metrics_view(request):
+    if not _authorized(request):
+        return HttpResponse('Forbidden', status=403, content_type='text/plain')
+    return HttpResponse(render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,68 @@
+"""
+Umumiy Redis ulanishi (leaderboard, navbatlar, hisoblagichlar uchun).
+
+Redis ishlamay qolsa har so'rovda timeout kutmaslik uchun qisqa
+"circuit breaker" bor: xatodan keyin REDIS_RETRY_AFTER soniya davomida
+get_redis() None qaytaradi va chaqiruvchi DB fallback ga o'tadi.
+"""
+import asyncio
+import logging
+import time
+import weakref
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+REDIS_RETRY_AFTER = 30
+
+_client = None
+_async_clients = weakref.WeakKeyDictionary()
+_down_until = 0.0
+
+_CLIENT_OPTIONS = dict(
+    decode_responses=True,
+    socket_connect_timeout=0.5,
+    socket_timeout=1,
+    health_check_interval=30,
+)
+
+
+def get_redis():
+    """Sync redis.Redis (decode_responses=True) yoki Redis mavjud bo'lmasa None"""
+    global _client
+    if time.monotonic() < _down_until:
+        return None
+    if _client is None:
+        try:
+            import redis
+            _client = redis.Redis.from_url(settings.REDIS_URL, **_CLIENT_OPTIONS)
+        except Exception as e:
+            logger.warning(f"[redis] client init error: {e}")
+            mark_down()
+            return None
+    return _client
+
+
+def get_async_redis():
+    """redis.asyncio klienti — har bir event loop uchun alohida (consumer lar uchun)"""
+    if time.monotonic() < _down_until:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        try:
+            import redis.asyncio as aioredis
+            client = aioredis.Redis.from_url(settings.REDIS_URL, **_CLIENT_OPTIONS)
+        except Exception as e:
+            logger.warning(f"[redis] async client init error: {e}")
+            mark_down()
+            return None
+        _async_clients[loop] = client
+    return client
+
+
+def mark_down():
+    """Redis xatosidan keyin chaqiriladi — bir muddat DB fallback ishlatiladi"""
+    global _down_until
+    _down_until = time.monotonic() + REDIS_RETRY_AFTER
@@ -474,7 +474,19 @@ X_FRAME_OPTIONS = 'ALLOWALL'
 # ─── OpenAI & Bot ─────────────────────────────────────────────────────────────
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 GEMINI_API_KEY  = os.getenv('GEMINI_API_KEY', '')
+# config/ai_clients.py — umumiy HTTP pool, concurrency va timeout (soniya)
+AI_HTTP_POOL_SIZE = int(os.getenv('AI_HTTP_POOL_SIZE', '32'))
+AI_MAX_CONCURRENCY = {
+    'openai': int(os.getenv('AI_OPENAI_CONCURRENCY', '32')),
+    'gemini': int(os.getenv('AI_GEMINI_CONCURRENCY', '32')),
+}
+AI_TIMEOUTS = {'openai': 30, 'gemini': 20}
+# config/tts_cache.py — xotira (LRU) va MEDIA_ROOT/tts_cache limitlari (bayt)
+TTS_CACHE_MEMORY_BYTES = int(os.getenv('TTS_CACHE_MEMORY_BYTES', str(32 * 1024 * 1024)))
+TTS_CACHE_DISK_BYTES = int(os.getenv('TTS_CACHE_DISK_BYTES', str(512 * 1024 * 1024)))
 BOT_SECRET = os.getenv('BOT_SECRET', 'speaking-bot-secret-key-2024')
+# config/metrics.py — /metrics uchun Bearer token (bo'sh — yopiq, faqat DEBUG da ochiq)
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
 ADMIN_CHAT_IDS = os.getenv('ADMIN_CHAT_IDS', '')
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_PAYMENT_CHAT = os.getenv('TELEGRAM_PAYMENT_CHAT', '@nodirbek_shukurov1')
@@ -499,6 +511,15 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'Asia/Tashkent'
 
+# Telegram yuborish alohida navbatda — bitta worker process (notifications/telegram.py)
+CELERY_TASK_ROUTES = {
+    'notifications.tasks.*': {'queue': 'telegram'},
+    # OpenAI baholash (10-30 s) — alohida worker, alohida concurrency
+    'ielts_mock.tasks.*': {'queue': 'grading'},
+    'cefr_mock.tasks.*': {'queue': 'grading'},
+}
+TELEGRAM_GLOBAL_RATE = int(os.getenv('TELEGRAM_GLOBAL_RATE', '30'))
+
 from celery.schedules import crontab
 CELERY_BEAT_SCHEDULE = {
     # Har kuni 22:00 (Toshkent vaqti) — progress xabari
@@ -516,6 +537,21 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'users.tasks.send_premium_expiry_warnings',
         'schedule': crontab(hour=10, minute=0),
     },
+    # Har 10 daqiqada — muddati o'tgan premiumlarni o'chirish (bulk UPDATE)
+    'expire-premiums': {
+        'task': 'users.tasks.expire_premiums',
+        'schedule': crontab(minute='*/10'),
+    },
+    # Har 10 daqiqada — weekly / monthly / alltime leaderboard snapshot
+    'leaderboard-snapshots': {
+        'task': 'leaderboard.tasks.refresh_leaderboard_snapshots',
+        'schedule': crontab(minute='*/10'),
+    },
+    # Har daqiqada — Telegram outbox: qayta urinishlar va yo'qolgan trigger lar
+    'telegram-outbox': {
+        'task': 'notifications.tasks.deliver_outbox',
+        'schedule': crontab(),
+    },
 }
 
 
@@ -0,0 +1,237 @@
+"""
+TTS audio cache — bir xil matn qayta-qayta OpenAI TTS ga yuborilmasin.
+
+Kalit: sha256(model, voice, format, normalizatsiya qilingan matn).
+Ikki qavat:
+  1) process ichidagi LRU — TTS_CACHE_MEMORY_BYTES bayt limiti bilan
+  2) MEDIA_ROOT/tts_cache/<ab>/<hash>.<fmt> fayllari — TTS_CACHE_DISK_BYTES
+     dan oshsa eng eski (mtime) fayllar o'chiriladi
+
+Cache hit bo'lsa tarmoq chaqiruvi umuman bo'lmaydi. Bir vaqtda bir xil
+matn uchun kelgan async so'rovlar bitta TTS chaqiruvini kutadi.
+
+    mp3 = await synthesize_async(text)     # consumer lar
+    mp3 = synthesize(text)                 # sync view lar
+    stats()                                # hit / miss hisoblagichlari
+"""
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import Counter, OrderedDict
+from pathlib import Path
+
+from django.conf import settings
+
+from . import ai_clients
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VOICE = 'alloy'
+DEFAULT_MODEL = 'tts-1'
+DEFAULT_FORMAT = 'mp3'
+
+MEMORY_BYTES = getattr(settings, 'TTS_CACHE_MEMORY_BYTES', 32 * 1024 * 1024)
+DISK_BYTES = getattr(settings, 'TTS_CACHE_DISK_BYTES', 512 * 1024 * 1024)
+PRUNE_EVERY = 200       # har N ta yozuvdan keyin disk hajmini tekshirish
+
+_stats = Counter()
+_inflight = {}          # (loop, key) → Future — single-flight
+
+
+def cache_dir() -> Path:
+    return Path(settings.MEDIA_ROOT) / 'tts_cache'
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+
+def cache_key(text, voice=DEFAULT_VOICE, model=DEFAULT_MODEL, fmt=DEFAULT_FORMAT) -> str:
+    raw = '\0'.join([model, voice, fmt, _normalize(text)])
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+# ─── 1-qavat: LRU (bayt limiti bilan) ─────────────────────────────────────────
+
+class _ByteLRU:
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is not None:
+                self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        if len(value) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._data[key] = value
+            self.size += len(value)
+            while self.size > self.max_bytes:
+                _, evicted = self._data.popitem(last=False)
+                self.size -= len(evicted)
+                _stats['memory_evictions'] += 1
+
+
+_memory = _ByteLRU(MEMORY_BYTES)
+
+
+# ─── 2-qavat: fayllar ─────────────────────────────────────────────────────────
+
+def _path(key, fmt):
+    return cache_dir() / key[:2] / f'{key}.{fmt}'
+
+
+def _disk_get(key, fmt):
+    try:
+        return _path(key, fmt).read_bytes()
+    except OSError:
+        return None
+
+
+def _disk_put(key, fmt, data):
+    path = _path(key, fmt)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.warning(f'[tts_cache] disk write error: {e}')
+        return
+    _stats['disk_writes'] += 1
+    if _stats['disk_writes'] % PRUNE_EVERY == 0:
+        prune_disk()
+
+
+def prune_disk(max_bytes=None):
+    """Disk cache hajmini max_bytes gacha kamaytirish (eng eski fayllar o'chadi)"""
+    max_bytes = DISK_BYTES if max_bytes is None else max_bytes
+    root = cache_dir()
+    if not root.exists():
+        return 0
+    files = []
+    total = 0
+    for path in root.glob('*/*'):
+        if path.suffix == '.tmp':
+            continue
+        try:
+            st = path.stat()
+        except OSError:
+            continue
+        files.append((st.st_mtime, st.st_size, path))
+        total += st.st_size
+    removed = 0
+    for _, size, path in sorted(files):
+        if total <= max_bytes:
+            break
+        try:
+            path.unlink()
+            total -= size
+            removed += 1
+        except OSError:
+            pass
+    _stats['disk_evictions'] += removed
+    return removed
+
+
+# ─── Lookup ───────────────────────────────────────────────────────────────────
+
+def _lookup(key, fmt):
+    data = _memory.get(key)
+    if data is not None:
+        _stats['memory_hits'] += 1
+        return data
+    data = _disk_get(key, fmt)
+    if data is not None:
+        _stats['disk_hits'] += 1
+        _memory.put(key, data)
+        return data
+    return None
+
+
+def _store(key, fmt, data):
+    _memory.put(key, data)
+    _disk_put(key, fmt, data)
+
+
+def lookup(text, voice=DEFAULT_VOICE, model=DEFAULT_MODEL, fmt=DEFAULT_FORMAT):
+    """Faqat cache dan (tarmoqsiz) — yo'q bo'lsa None"""
+    return _lookup(cache_key(text, voice, model, fmt), fmt)
+
+
+def synthesize(text, voice=DEFAULT_VOICE, model=DEFAULT_MODEL, fmt=DEFAULT_FORMAT) -> bytes:
+    """Sync: cache → OpenAI TTS"""
+    key = cache_key(text, voice, model, fmt)
+    data = _lookup(key, fmt)
+    if data is not None:
+        return data
+    _stats['misses'] += 1
+    resp = ai_clients.openai_client().audio.speech.create(
+        model=model, voice=voice, input=text, response_format=fmt,
+    )
+    data = resp.content
+    if data:
+        _store(key, fmt, data)
+    return data
+
+
+async def synthesize_async(text, voice=DEFAULT_VOICE, model=DEFAULT_MODEL, fmt=DEFAULT_FORMAT) -> bytes:
+    """Async: LRU → disk (thread) → OpenAI TTS; bir xil kalit uchun bitta chaqiruv"""
+    key = cache_key(text, voice, model, fmt)
+    data = _memory.get(key)
+    if data is not None:
+        _stats['memory_hits'] += 1
+        return data
+
+    loop = asyncio.get_running_loop()
+    flight_key = (id(loop), key)
+    pending = _inflight.get(flight_key)
+    if pending is not None:
+        _stats['coalesced'] += 1
+        return await asyncio.shield(pending)
+
+    future = loop.create_future()
+    _inflight[flight_key] = future
+    try:
+        data = await asyncio.to_thread(_lookup, key, fmt)
+        if data is None:
+            _stats['misses'] += 1
+            async with ai_clients.limit('openai'):
+                resp = await ai_clients.async_openai_client().audio.speech.create(
+                    model=model, voice=voice, input=text, response_format=fmt,
+                )
+            data = resp.content
+            if data:
+                await asyncio.to_thread(_store, key, fmt, data)
+        future.set_result(data)
+        return data
+    except BaseException as e:
+        future.set_exception(e)
+        # Kutayotgan bo'lmasa "exception never retrieved" ogohlantirishi chiqmasin
+        future.exception()
+        raise
+    finally:
+        _inflight.pop(flight_key, None)
+
+
+def stats() -> dict:
+    hits = _stats['memory_hits'] + _stats['disk_hits']
+    total = hits + _stats['misses']
+    return {
+        **_stats,
+        'memory_bytes': _memory.size,
+        'hit_ratio': round(hits / total, 3) if total else None,
+    }
@@ -3,6 +3,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from rest_framework_simplejwt.views import TokenRefreshView
+from config.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -17,4 +18,5 @@ urlpatterns = [
     path('api/leaderboard/', include('leaderboard.urls')),
     path('api/notifications/', include('notifications.urls')),
     path('api/token/refresh/', TokenRefreshView.as_view()),
+    path('metrics', metrics_view),
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
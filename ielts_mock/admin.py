@@ -240,13 +240,14 @@ class IELTSAnswerInline(admin.TabularInline):
 
 @admin.register(IELTSSession)
 class IELTSSessionAdmin(admin.ModelAdmin):
-    list_display    = ['user', 'overall_band_display', 'is_completed', 'started_at']
-    list_filter     = ['is_completed']
+    list_display    = ['user', 'overall_band_display', 'is_completed', 'grading_status', 'started_at']
+    list_filter     = ['is_completed', 'grading_status']
     search_fields   = ['user__username', 'user__first_name']
     readonly_fields = [
         'user', 'started_at', 'ended_at', 'overall_band',
         'sub_scores', 'strengths', 'improvements',
-        'mistakes', 'recommendations', 'is_completed'
+        'mistakes', 'recommendations', 'is_completed',
+        'grading_status', 'grading_error', 'grading_started_at',
     ]
     inlines = [IELTSAnswerInline]
 
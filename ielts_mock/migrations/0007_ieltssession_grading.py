@@ -0,0 +1,28 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ielts_mock', '0006_new_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ieltssession',
+            name='grading_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='ieltssession',
+            name='grading_started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='ieltssession',
+            name='grading_status',
+            field=models.CharField(blank=True, choices=[('', '—'), ('queued', 'Navbatda'), ('grading', 'Baholanmoqda'), ('done', 'Tayyor'), ('failed', 'Xato')], default='', max_length=10),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.conf import settings
+from config import grading
 
 
 class IELTSQuestion(models.Model):
@@ -75,6 +76,10 @@ class IELTSSession(models.Model):
     mistakes = models.JSONField(null=True, blank=True)
     recommendations = models.JSONField(null=True, blank=True)
     is_completed = models.BooleanField(default=False)
+    # Asinxron baholash holati (config.grading)
+    grading_status = models.CharField(max_length=10, choices=grading.STATUS_CHOICES, default='', blank=True)
+    grading_error = models.TextField(blank=True)
+    grading_started_at = models.DateTimeField(null=True, blank=True)
 
     class Meta:
         ordering = ['-started_at']
@@ -24,5 +24,6 @@ class IELTSSessionSerializer(serializers.ModelSerializer):
         fields = [
             "id", "started_at", "ended_at", "overall_band",
             "sub_scores", "strengths", "improvements",
-            "mistakes", "recommendations", "is_completed", "answers",
+            "mistakes", "recommendations", "is_completed",
+            "grading_status", "answers",
         ]
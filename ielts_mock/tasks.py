@@ -0,0 +1,133 @@
+"""
+ielts_mock/tasks.py — IELTS Speaking imtihonini baholash ('grading' navbati)
+"""
+import json
+import logging
+
+from celery import shared_task
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from config import grading
+
+logger = logging.getLogger(__name__)
+
+
+def _evaluate(session):
+    """gpt-4o baholashi → dict"""
+    from config.ai_clients import openai_client
+
+    answers = list(session.answers.select_related('question').all())
+    qa_parts = []
+    for ans in answers:
+        part_num = ans.question.part
+        q_text = ans.question.question
+        a_text = ans.transcript if ans.transcript else '(no answer)'
+        qa_parts.append('[Part ' + str(part_num) + '] Q: ' + q_text + '\nA: ' + a_text)
+    qa_text = '\n\n'.join(qa_parts)
+
+    resp = openai_client().chat.completions.create(
+        model="gpt-4o",
+        messages=[
+            {"role": "system", "content": "You are a strict but fair IELTS Speaking examiner. Evaluate responses based on 4 criteria: Fluency & Coherence, Lexical Resource, Grammatical Range & Accuracy, Pronunciation. Give band scores from 1.0 to 9.0 in 0.5 increments."},
+            {"role": "user", "content": f"""Evaluate this IELTS Speaking test:
+
+{qa_text}
+
+Return JSON:
+{{
+  "overall_band": 6.5,
+  "sub_scores": {{"fluency": 7.0, "lexical": 6.5, "grammar": 6.5, "pronunciation": 6.0}},
+  "strengths": ["strength 1", "strength 2"],
+  "improvements": ["area 1", "area 2"],
+  "mistakes": [
+    {{"error": "...", "correction": "...", "explanation": "..."}}
+  ],
+  "recommendations": ["tip 1", "tip 2", "tip 3"]
+}}"""}
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=1200
+    )
+    return json.loads(resp.choices[0].message.content)
+
+
+def _band(value):
+    band = float(value)
+    if not 0 <= band <= 9:
+        raise ValueError(f'band out of range: {band}')
+    return band
+
+
+def _fields(result):
+    """Model javobi → IELTSSession maydonlari (band lar float, "6.5" ham); yaroqsiz bo'lsa ValueError / TypeError"""
+    if not isinstance(result, dict):
+        raise ValueError('IELTS result is not a JSON object')
+    sub_scores = result.get('sub_scores')
+    return {
+        'overall_band': _band(result.get('overall_band')),
+        'sub_scores': (
+            {name: _band(value) for name, value in sub_scores.items()} if isinstance(sub_scores, dict) else {}
+        ),
+        **{
+            name: result.get(name) if isinstance(result.get(name), list) else []
+            for name in ('strengths', 'improvements', 'mistakes', 'recommendations')
+        },
+    }
+
+
+@shared_task(bind=True, max_retries=2, default_retry_delay=15, acks_late=True)
+def grade_ielts_session(self, session_id: int):
+    """FinishIELTSSessionView navbatga qo'yadi; natija DB ga va WebSocket ga"""
+    from leaderboard import engine as leaderboard_engine
+    from users import quotas, scores
+    from users.models import User
+    from webapp.activity import record_activity
+    from .models import IELTSSession
+    from .serializers import IELTSSessionSerializer
+
+    pending = IELTSSession.objects.filter(id=session_id, is_completed=False)
+    session = pending.first()
+    if session is None:
+        return {'status': 'skipped'}
+    pending.update(grading_status=grading.GRADING)
+
+    try:
+        fields = _fields(_evaluate(session))
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            raise self.retry(exc=e)
+        return grading.fail('ielts', pending, session, e)
+
+    try:
+        with transaction.atomic():
+            updated = pending.update(
+                **fields,
+                ended_at=timezone.now(),
+                is_completed=True,
+                grading_status=grading.DONE,
+                grading_error='',
+            )
+            if not updated:
+                # Parallel ish (qayta yuborilgan) allaqachon yakunlagan
+                return {'status': 'skipped'}
+            User.objects.filter(id=session.user_id).update(ielts_count=F('ielts_count') + 1)
+    except Exception as e:
+        return grading.fail('ielts', pending, session, e)
+
+    # Natija saqlangan (DONE) — qolgan qadamlardagi xato push ni to'xtatmasin
+    data = None
+    try:
+        record_activity(session.user_id)
+        leaderboard_engine.incr('ielts_count', session.user_id)
+        quotas.incr('ielts', session.user_id)
+
+        session = IELTSSession.objects.select_related('user').prefetch_related('answers__question').get(id=session_id)
+        scores.record_ielts(session)
+        data = IELTSSessionSerializer(session).data
+    except Exception as e:
+        logger.error(f"[grading] IELTS #{session_id} post-processing error: {e}")
+        session.refresh_from_db()
+    grading.push(session.user_id, grading.status_payload('ielts', session, data))
+    return {'status': 'done', 'overall_band': session.overall_band}
@@ -5,6 +5,7 @@ urlpatterns = [
     path("start/", views.StartIELTSSessionView.as_view()),
     path("<int:session_id>/answer/<int:question_id>/", views.SubmitIELTSAnswerView.as_view()),
     path("<int:session_id>/finish/", views.FinishIELTSSessionView.as_view()),
+    path("<int:session_id>/status/", views.IELTSSessionStatusView.as_view()),
     path("my-sessions/", views.MyIELTSSessionsView.as_view()),
     path("bot/questions/", views.BotIELTSQuestionsView.as_view()),
 ]
@@ -1,17 +1,15 @@
-import json
 import random
 from rest_framework import generics
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated,AllowAny
-from django.utils import timezone
+from django.db import transaction
 from django.conf import settings
-from openai import OpenAI
+from config import grading
 from .models import IELTSQuestion, IELTSSession, IELTSAnswer
+from .tasks import grade_ielts_session
 from .serializers import IELTSSessionSerializer, IELTSQuestionSerializer
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
 
 class StartIELTSSessionView(APIView):
     permission_classes = [IsAuthenticated]
@@ -57,61 +55,32 @@ class SubmitIELTSAnswerView(APIView):
 
 
 class FinishIELTSSessionView(APIView):
+    """Baholash Celery da ('grading' navbati) — darhol 202, natija ws/grading/ yoki status/ orqali"""
     permission_classes = [IsAuthenticated]
 
     def post(self, request, session_id):
-        try:
-            session = IELTSSession.objects.get(id=session_id, user=request.user, is_completed=False)
-        except IELTSSession.DoesNotExist:
+        session, dispatch = grading.claim(IELTSSession.objects, session_id, request.user)
+        if session is None:
             return Response({"error": "Session not found"}, status=404)
+        if dispatch:
+            transaction.on_commit(lambda: grade_ielts_session.delay(session.id))
+        return Response(grading.status_payload('ielts', session), status=202)
 
-        answers = list(session.answers.select_related('question').all())
-        qa_parts = []
-        for ans in answers:
-            part_num = ans.question.part
-            q_text = ans.question.question
-            a_text = ans.transcript if ans.transcript else '(no answer)'
-            qa_parts.append('[Part ' + str(part_num) + '] Q: ' + q_text + '\nA: ' + a_text)
-        qa_text = '\n\n'.join(qa_parts)
-
-        resp = client.chat.completions.create(
-            model="gpt-4o",
-            messages=[
-                {"role": "system", "content": "You are a strict but fair IELTS Speaking examiner. Evaluate responses based on 4 criteria: Fluency & Coherence, Lexical Resource, Grammatical Range & Accuracy, Pronunciation. Give band scores from 1.0 to 9.0 in 0.5 increments."},
-                {"role": "user", "content": f"""Evaluate this IELTS Speaking test:
-
-{qa_text}
-
-Return JSON:
-{{
-  "overall_band": 6.5,
-  "sub_scores": {{"fluency": 7.0, "lexical": 6.5, "grammar": 6.5, "pronunciation": 6.0}},
-  "strengths": ["strength 1", "strength 2"],
-  "improvements": ["area 1", "area 2"],
-  "mistakes": [
-    {{"error": "...", "correction": "...", "explanation": "..."}}
-  ],
-  "recommendations": ["tip 1", "tip 2", "tip 3"]
-}}"""}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=1200
-        )
-        result = json.loads(resp.choices[0].message.content)
-        session.overall_band = result.get("overall_band")
-        session.sub_scores = result.get("sub_scores")
-        session.strengths = result.get("strengths")
-        session.improvements = result.get("improvements")
-        session.mistakes = result.get("mistakes")
-        session.recommendations = result.get("recommendations")
-        session.ended_at = timezone.now()
-        session.is_completed = True
-        session.save()
 
-        request.user.ielts_count += 1
-        request.user.save(update_fields=["ielts_count"])
+class IELTSSessionStatusView(APIView):
+    permission_classes = [IsAuthenticated]
 
-        return Response(IELTSSessionSerializer(session).data)
+    def get(self, request, session_id):
+        session = IELTSSession.objects.filter(id=session_id, user=request.user).first()
+        if session is None:
+            return Response({"error": "Session not found"}, status=404)
+        if session.is_completed:
+            session = IELTSSession.objects.prefetch_related('answers__question').get(id=session.id)
+            return Response(grading.status_payload('ielts', session, IELTSSessionSerializer(session).data))
+        payload = grading.status_payload('ielts', session)
+        if session.grading_status in grading.IN_PROGRESS:
+            payload['retry_after'] = grading.POLL_INTERVAL
+        return Response(payload)
 
 
 class MyIELTSSessionsView(generics.ListAPIView):
@@ -119,7 +88,10 @@ class MyIELTSSessionsView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return IELTSSession.objects.filter(user=self.request.user, is_completed=True)
+        return (
+            IELTSSession.objects.filter(user=self.request.user, is_completed=True)
+            .prefetch_related('answers__question')
+        )
 
 class BotIELTSQuestionsView(APIView):
     permission_classes = [AllowAny]
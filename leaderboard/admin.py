@@ -4,5 +4,6 @@ from .models import LeaderboardEntry
 
 @admin.register(LeaderboardEntry)
 class LeaderboardEntryAdmin(admin.ModelAdmin):
-    list_display = ["rank", "user", "period", "chat_count", "practice_count", "total_score"]
+    list_display = ["rank", "user", "period", "chat_count", "practice_count",
+                    "ielts_count", "cefr_count", "voice_rooms", "total_score", "updated_at"]
     list_filter = ["period"]
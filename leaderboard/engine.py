@@ -0,0 +1,270 @@
+"""
+Leaderboard engine — Redis sorted set lar (har bir metrika uchun bitta ZSET).
+
+    lb:chat_count       user_id → chat_count
+    lb:practice_count   user_id → practice_count
+    lb:ielts_count      user_id → ielts_count
+    lb:cefr_count       user_id → cefr_count
+    lb:voice_rooms      user_id → tugagan voice room lar soni
+
+- incr():   hisoblagich oshirilgan joyda chaqiriladi (commit dan keyin ZINCRBY, faqat is_active)
+- remove() / restore(): user nofaol / qayta faol bo'lganda (leaderboard.signals) — set lar
+            rebuild va DB fallback bilan bir xil (is_active=True) userlarni saqlaydi
+- top():    top-N — ZREVRANGE, O(log n + N)
+- rank():   user o'rni — ZREVRANK, O(log n)
+- rebuild(): ZSET ni DB dan qayta qurish (manage.py rebuild_leaderboard)
+
+weekly / monthly reytinglar — LeaderboardEntry snapshot qatorlaridan
+(leaderboard.tasks.refresh_leaderboard_snapshots yozadi).
+
+Redis yo'q / set hali qurilmagan bo'lsa — alltime snapshot, u ham bo'lmasa
+User jadvalidan to'g'ridan-to'g'ri hisoblash.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Count, Q, F, ExpressionWrapper, IntegerField
+
+from config.redis_client import get_redis, mark_down
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('chat_count', 'practice_count', 'ielts_count', 'cefr_count', 'voice_rooms')
+PERIODS = ('weekly', 'monthly', 'alltime')
+
+REBUILD_LOCK_TTL = 60
+_CHUNK = 1000
+
+# Redis yo'qligida (breaker ochiq) yo'qolgan increment lar — Redis qaytganda ready key o'chiriladi
+_dirty = set()
+
+
+def _key(metric):
+    return f'lb:{metric}'
+
+
+def _ready_key(metric):
+    return f'lb:{metric}:ready'
+
+
+# ─── Yozish ───────────────────────────────────────────────────────────────────
+
+def incr(metric, *user_ids, amount=1):
+    """Hisoblagich DB da oshirilgandan keyin ZSET ni ham oshirish"""
+    user_ids = [uid for uid in user_ids if uid]
+    if metric not in METRICS or not user_ids:
+        return
+    transaction.on_commit(lambda: _zincr(metric, user_ids, amount))
+
+
+def _zincr(metric, user_ids, amount):
+    r = get_redis()
+    if r is None:
+        _dirty.add(metric)
+        return
+    from users.models import User
+
+    user_ids = list(User.objects.filter(id__in=user_ids, is_active=True).values_list('id', flat=True))
+    if not user_ids:
+        return
+    try:
+        _clear_dirty(r)
+        pipe = r.pipeline(transaction=False)
+        for uid in user_ids:
+            pipe.zincrby(_key(metric), amount, uid)
+        pipe.execute()
+    except Exception as e:
+        # Yo'qolgan increment — set ni keyingi o'qishda qayta qurish
+        logger.warning(f"[leaderboard] zincrby {metric} error: {e}")
+        mark_down()
+        try:
+            r.delete(_ready_key(metric))
+        except Exception:
+            _dirty.add(metric)
+
+
+def remove(user_id):
+    """Nofaol user — barcha set lardan (top / rank da joy egallamasin)"""
+    r = get_redis()
+    if r is None:
+        _dirty.update(METRICS)
+        return
+    try:
+        pipe = r.pipeline(transaction=False)
+        for metric in METRICS:
+            pipe.zrem(_key(metric), user_id)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"[leaderboard] zrem {user_id} error: {e}")
+        mark_down()
+        _dirty.update(METRICS)
+
+
+def restore(user_id):
+    """Qayta faol bo'lgan user — ballari set larda yo'q, set lar DB dan qayta quriladi"""
+    _dirty.update(METRICS)
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        _clear_dirty(r)
+    except Exception as e:
+        logger.warning(f"[leaderboard] restore {user_id} error: {e}")
+        mark_down()
+
+
+def _clear_dirty(r):
+    """Breaker yopilgandan keyin: increment yo'qolgan set lar keyingi o'qishda qayta quriladi"""
+    if not _dirty:
+        return
+    metrics = list(_dirty)
+    r.delete(*[_ready_key(metric) for metric in metrics])
+    _dirty.difference_update(metrics)
+
+
+def rebuild(metric):
+    """ZSET ni DB dan qayta qurish (vaqtinchalik key + RENAME — atomik almashtirish)"""
+    r = get_redis()
+    if r is None:
+        return 0
+    tmp = f'{_key(metric)}:tmp'
+    total = 0
+    try:
+        r.delete(tmp)
+        batch = {}
+        for user_id, score in _db_scores(metric).iterator(chunk_size=_CHUNK):
+            batch[user_id] = score
+            if len(batch) >= _CHUNK:
+                r.zadd(tmp, batch)
+                total += len(batch)
+                batch = {}
+        if batch:
+            r.zadd(tmp, batch)
+            total += len(batch)
+
+        pipe = r.pipeline()
+        if total:
+            pipe.rename(tmp, _key(metric))
+        else:
+            pipe.delete(_key(metric))
+        pipe.set(_ready_key(metric), 1)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"[leaderboard] rebuild {metric} error: {e}")
+        mark_down()
+        return 0
+    return total
+
+
+def _ensure_ready(r, metric):
+    """Set qurilganmi? Yo'q bo'lsa bitta jarayon qayta quradi, qolganlar DB dan o'qiydi"""
+    _clear_dirty(r)
+    if r.exists(_ready_key(metric)):
+        return True
+    if r.set(f'{_key(metric)}:lock', 1, nx=True, ex=REBUILD_LOCK_TTL):
+        rebuild(metric)
+        return bool(r.exists(_ready_key(metric)))
+    return False
+
+
+# ─── O'qish ───────────────────────────────────────────────────────────────────
+
+def top(metric, limit, period='alltime'):
+    """[(user_id, score), ...] — kamayish tartibida"""
+    if period != 'alltime':
+        return _snapshot_top(metric, limit, period)
+    r = get_redis()
+    if r is not None:
+        try:
+            if _ensure_ready(r, metric):
+                rows = r.zrevrange(_key(metric), 0, limit - 1, withscores=True)
+                return [(int(uid), int(score)) for uid, score in rows]
+        except Exception as e:
+            logger.warning(f"[leaderboard] top {metric} error: {e}")
+            mark_down()
+    if _has_snapshot('alltime'):
+        return _snapshot_top(metric, limit, 'alltime')
+    return list(_db_scores(metric)[:limit])
+
+
+def rank(metric, user_id, period='alltime'):
+    """(rank, score) — 1 dan boshlanadi; reytingda bo'lmasa None"""
+    if period != 'alltime':
+        return _snapshot_rank(metric, user_id, period)
+    r = get_redis()
+    if r is not None:
+        try:
+            if _ensure_ready(r, metric):
+                pipe = r.pipeline(transaction=False)
+                pipe.zrevrank(_key(metric), user_id)
+                pipe.zscore(_key(metric), user_id)
+                pos, score = pipe.execute()
+                if pos is None or not score:
+                    return None
+                return pos + 1, int(score)
+        except Exception as e:
+            logger.warning(f"[leaderboard] rank {metric} error: {e}")
+            mark_down()
+    if _has_snapshot('alltime'):
+        return _snapshot_rank(metric, user_id, 'alltime')
+    return _db_rank(metric, user_id)
+
+
+# ─── Snapshot (LeaderboardEntry) ──────────────────────────────────────────────
+
+def _rank_field(metric):
+    return f'{metric}_rank'
+
+
+def _snapshot_rows(metric, period):
+    """Shu metrika bo'yicha reytingdagi qatorlar (o'rin snapshot da hisoblangan)"""
+    from .models import LeaderboardEntry
+    return LeaderboardEntry.objects.filter(period=period, **{f'{_rank_field(metric)}__isnull': False})
+
+
+def _has_snapshot(period):
+    from .models import LeaderboardEntry
+    return LeaderboardEntry.objects.filter(period=period).exists()
+
+
+def _snapshot_top(metric, limit, period):
+    rows = _snapshot_rows(metric, period).order_by(_rank_field(metric), 'user_id')
+    return list(rows.values_list('user_id', metric)[:limit])
+
+
+def _snapshot_rank(metric, user_id, period):
+    """Tayyor o'rin — bitta qator (user, period), COUNT siz"""
+    row = _snapshot_rows(metric, period).filter(user_id=user_id).values_list(_rank_field(metric), metric).first()
+    if not row or not row[1]:
+        return None
+    return row
+
+
+# ─── DB fallback ──────────────────────────────────────────────────────────────
+
+def _scored_users(metric):
+    from users.models import User
+
+    qs = User.objects.filter(is_active=True)
+    if metric == 'voice_rooms':
+        qs = qs.annotate(
+            cnt_u1=Count('voice_rooms_as_user1', filter=Q(voice_rooms_as_user1__status='ended'), distinct=True),
+            cnt_u2=Count('voice_rooms_as_user2', filter=Q(voice_rooms_as_user2__status='ended'), distinct=True),
+        ).annotate(
+            score=ExpressionWrapper(F('cnt_u1') + F('cnt_u2'), output_field=IntegerField())
+        )
+    else:
+        qs = qs.annotate(score=F(metric))
+    return qs.filter(score__gt=0)
+
+
+def _db_scores(metric):
+    return _scored_users(metric).order_by('-score', 'id').values_list('id', 'score')
+
+
+def _db_rank(metric, user_id):
+    qs = _scored_users(metric)
+    score = qs.filter(id=user_id).values_list('score', flat=True).first()
+    if not score:
+        return None
+    return qs.filter(score__gt=score).count() + 1, score
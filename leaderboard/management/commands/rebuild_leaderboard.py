@@ -0,0 +1,27 @@
+"""
+Leaderboard Redis ZSET larini DB dan qayta qurish.
+
+    python manage.py rebuild_leaderboard
+    python manage.py rebuild_leaderboard --metric chat_count
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Leaderboard sorted set larini (lb:<metric>) DB hisoblagichlaridan qayta quradi"
+
+    def add_arguments(self, parser):
+        from leaderboard.engine import METRICS
+        parser.add_argument('--metric', choices=METRICS, help="Faqat bitta metrika")
+
+    def handle(self, *args, **options):
+        from config.redis_client import get_redis
+        from leaderboard.engine import METRICS, rebuild
+
+        if get_redis() is None:
+            raise CommandError("Redis mavjud emas (REDIS_URL)")
+
+        for metric in [options['metric']] if options['metric'] else METRICS:
+            total = rebuild(metric)
+            self.stdout.write(f"  lb:{metric} — {total} ta user")
+        self.stdout.write(self.style.SUCCESS("✅ Leaderboard qayta qurildi"))
@@ -0,0 +1,99 @@
+# Generated by Django 5.2.11 on 2026-10-17 04:14
+
+from django.conf import settings
+from django.db import migrations, models
+
+METRICS = ('chat_count', 'practice_count', 'ielts_count', 'cefr_count', 'voice_rooms')
+
+
+def fill_ranks(apps, schema_editor):
+    """Mavjud snapshot qatorlari uchun metrika o'rinlari (keyingi beat ishga tushishini kutmasdan)"""
+    LeaderboardEntry = apps.get_model('leaderboard', 'LeaderboardEntry')
+    periods = LeaderboardEntry.objects.values_list('period', flat=True).distinct()
+    for period in list(periods):
+        rows = list(LeaderboardEntry.objects.filter(period=period).only('id', *METRICS))
+        for metric in METRICS:
+            rank, prev = 0, None
+            for position, row in enumerate(sorted(rows, key=lambda r: -getattr(r, metric)), 1):
+                score = getattr(row, metric)
+                if score != prev:
+                    rank, prev = position, score
+                setattr(row, f'{metric}_rank', rank if score > 0 else None)
+        LeaderboardEntry.objects.bulk_update(rows, [f'{m}_rank' for m in METRICS], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('leaderboard', '0003_snapshot_columns'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='lb_period_chat_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='lb_period_practice_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='lb_period_ielts_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='lb_period_cefr_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='leaderboardentry',
+            name='lb_period_voice_idx',
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='cefr_count_rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='chat_count_rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='ielts_count_rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='practice_count_rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='leaderboardentry',
+            name='voice_rooms_rank',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['period', 'chat_count_rank'], name='lb_period_chat_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['period', 'practice_count_rank'], name='lb_period_practice_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['period', 'ielts_count_rank'], name='lb_period_ielts_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['period', 'cefr_count_rank'], name='lb_period_cefr_rank_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='leaderboardentry',
+            index=models.Index(fields=['period', 'voice_rooms_rank'], name='lb_period_voice_rank_idx'),
+        ),
+        migrations.RunPython(fill_ranks, migrations.RunPython.noop),
+    ]
@@ -9,13 +9,31 @@ class LeaderboardEntry(models.Model):
     period = models.CharField(max_length=10, choices=PERIOD_CHOICES)
     chat_count = models.PositiveIntegerField(default=0)
     practice_count = models.PositiveIntegerField(default=0)
+    ielts_count = models.PositiveIntegerField(default=0)
+    cefr_count = models.PositiveIntegerField(default=0)
+    voice_rooms = models.PositiveIntegerField(default=0)
     total_score = models.PositiveIntegerField(default=0)
     rank = models.PositiveIntegerField(default=0)
+    # Metrika bo'yicha RANK() (leaderboard.tasks) — engine top / rank shu ustunlardan o'qiydi;
+    # metrika 0 bo'lsa NULL (reytingda yo'q)
+    chat_count_rank = models.PositiveIntegerField(null=True, blank=True)
+    practice_count_rank = models.PositiveIntegerField(null=True, blank=True)
+    ielts_count_rank = models.PositiveIntegerField(null=True, blank=True)
+    cefr_count_rank = models.PositiveIntegerField(null=True, blank=True)
+    voice_rooms_rank = models.PositiveIntegerField(null=True, blank=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         unique_together = ('user', 'period')
         ordering = ['rank']
+        indexes = [
+            models.Index(fields=['period', 'rank'], name='lb_period_rank_idx'),
+            models.Index(fields=['period', 'chat_count_rank'], name='lb_period_chat_rank_idx'),
+            models.Index(fields=['period', 'practice_count_rank'], name='lb_period_practice_rank_idx'),
+            models.Index(fields=['period', 'ielts_count_rank'], name='lb_period_ielts_rank_idx'),
+            models.Index(fields=['period', 'cefr_count_rank'], name='lb_period_cefr_rank_idx'),
+            models.Index(fields=['period', 'voice_rooms_rank'], name='lb_period_voice_rank_idx'),
+        ]
 
     def __str__(self):
         return f"#{self.rank} {self.user} ({self.period})"
@@ -0,0 +1,27 @@
+"""
+User is_active o'zgarganda leaderboard ZSET larini moslash (rebuild / DB fallback faqat faol userlar).
+"""
+from django.db import transaction
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+
+@receiver(post_save, sender='users.User')
+def sync_active(sender, instance, created, update_fields=None, **kwargs):
+    if 'is_active' not in instance.__dict__:
+        return
+    if update_fields is not None and 'is_active' not in update_fields:
+        return
+    was = instance.__dict__.get('_active_was')
+    instance._active_was = instance.is_active
+    if created or was == instance.is_active:
+        return
+
+    from . import engine
+
+    user_id = instance.pk
+    if not instance.is_active:
+        # was None (snapshot yo'q) — ZREM zararsiz, baribir bajariladi
+        transaction.on_commit(lambda: engine.remove(user_id))
+    elif was is False:
+        transaction.on_commit(lambda: engine.restore(user_id))
@@ -0,0 +1,186 @@
+"""
+Leaderboard snapshot — LeaderboardEntry jadvalini to'ldirish (Celery beat).
+
+Har bir period (weekly / monthly / alltime) uchun bitta SQL:
+  1) CTE — har bir user uchun period ichidagi hisoblagichlar
+  2) RANK() OVER (ORDER BY total_score DESC) va har bir metrika bo'yicha alohida RANK()
+     (<metric>_rank, metrika 0 bo'lsa NULL) — engine top / rank (period, <metric>_rank)
+     indeksi bo'yicha tayyor o'rinni o'qiydi
+  3) INSERT ... ON CONFLICT (user_id, period) DO UPDATE — bulk upsert
+  4) Shu ishga tushishda yangilanmagan eski qatorlar o'chiriladi
+
+weekly  — joriy hafta (Dushanba 00:00 dan), monthly — joriy oy (1-sanadan).
+alltime — User dagi umumiy hisoblagichlar (profilda ko'rinadigan raqamlar).
+"""
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .engine import PERIODS
+
+logger = logging.getLogger(__name__)
+
+
+def _tables():
+    from users.models import User
+    from chat.models import ChatRoom
+    from webapp.models import VoiceRoom
+    from practice.models import PracticeSession
+    from ielts_mock.models import IELTSSession
+    from cefr_mock.models import CEFRSession
+    from .models import LeaderboardEntry
+    return {
+        'user': User._meta.db_table,
+        'chat': ChatRoom._meta.db_table,
+        'voice': VoiceRoom._meta.db_table,
+        'practice': PracticeSession._meta.db_table,
+        'ielts': IELTSSession._meta.db_table,
+        'cefr': CEFRSession._meta.db_table,
+        'entry': LeaderboardEntry._meta.db_table,
+    }
+
+
+def period_start(period, now=None):
+    """Period boshlanish vaqti (local) — alltime uchun None"""
+    now = timezone.localtime(now or timezone.now())
+    midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+    if period == 'weekly':
+        return midnight - timedelta(days=now.weekday())
+    if period == 'monthly':
+        return midnight.replace(day=1)
+    return None
+
+
+# chat_count: ChatRoom + human VoiceRoom (matchmaking da oshiriladigan hisoblagich bilan bir xil)
+# voice_rooms: tugagan VoiceRoom lar (AI ham)
+_WINDOW_TOTALS = """
+WITH events (user_id, chat, practice, ielts, cefr, voice) AS (
+    SELECT user1_id, 1, 0, 0, 0, 0 FROM {chat} WHERE started_at >= %(since)s
+    UNION ALL
+    SELECT user2_id, 1, 0, 0, 0, 0 FROM {chat} WHERE started_at >= %(since)s
+    UNION ALL
+    SELECT user1_id,
+           CASE WHEN partner_type = 'human' THEN 1 ELSE 0 END, 0, 0, 0,
+           CASE WHEN status = 'ended' THEN 1 ELSE 0 END
+      FROM {voice} WHERE started_at >= %(since)s
+    UNION ALL
+    SELECT user2_id, 1, 0, 0, 0, CASE WHEN status = 'ended' THEN 1 ELSE 0 END
+      FROM {voice} WHERE started_at >= %(since)s AND user2_id IS NOT NULL AND partner_type = 'human'
+    UNION ALL
+    SELECT user_id, 0, 1, 0, 0, 0 FROM {practice}
+     WHERE is_completed = %(true)s AND COALESCE(ended_at, started_at) >= %(since)s
+    UNION ALL
+    SELECT user_id, 0, 0, 1, 0, 0 FROM {ielts}
+     WHERE is_completed = %(true)s AND COALESCE(ended_at, started_at) >= %(since)s
+    UNION ALL
+    SELECT user_id, 0, 0, 0, 1, 0 FROM {cefr}
+     WHERE is_completed = %(true)s AND COALESCE(ended_at, started_at) >= %(since)s
+),
+totals AS (
+    SELECT e.user_id,
+           SUM(e.chat) AS chat_count,
+           SUM(e.practice) AS practice_count,
+           SUM(e.ielts) AS ielts_count,
+           SUM(e.cefr) AS cefr_count,
+           SUM(e.voice) AS voice_rooms
+      FROM events e
+      JOIN {user} u ON u.id = e.user_id AND u.is_active = %(true)s
+     GROUP BY e.user_id
+)
+"""
+
+_ALLTIME_TOTALS = """
+WITH voice (user_id, n) AS (
+    SELECT v.user_id, COUNT(*) FROM (
+        SELECT user1_id AS user_id FROM {voice} WHERE status = 'ended'
+        UNION ALL
+        SELECT user2_id FROM {voice} WHERE status = 'ended' AND user2_id IS NOT NULL
+    ) v GROUP BY v.user_id
+),
+totals AS (
+    SELECT u.id AS user_id,
+           u.chat_count, u.practice_count, u.ielts_count, u.cefr_count,
+           COALESCE(voice.n, 0) AS voice_rooms
+      FROM {user} u
+      LEFT JOIN voice ON voice.user_id = u.id
+     WHERE u.is_active = %(true)s
+)
+"""
+
+_UPSERT = """
+INSERT INTO {entry} (
+    user_id, period, chat_count, practice_count, ielts_count, cefr_count,
+    voice_rooms, total_score, rank,
+    chat_count_rank, practice_count_rank, ielts_count_rank, cefr_count_rank, voice_rooms_rank,
+    updated_at
+)
+SELECT user_id, %(period)s, chat_count, practice_count, ielts_count, cefr_count, voice_rooms,
+       chat_count + practice_count + ielts_count + cefr_count,
+       RANK() OVER (ORDER BY chat_count + practice_count + ielts_count + cefr_count DESC),
+       CASE WHEN chat_count > 0 THEN RANK() OVER (ORDER BY chat_count DESC) END,
+       CASE WHEN practice_count > 0 THEN RANK() OVER (ORDER BY practice_count DESC) END,
+       CASE WHEN ielts_count > 0 THEN RANK() OVER (ORDER BY ielts_count DESC) END,
+       CASE WHEN cefr_count > 0 THEN RANK() OVER (ORDER BY cefr_count DESC) END,
+       CASE WHEN voice_rooms > 0 THEN RANK() OVER (ORDER BY voice_rooms DESC) END,
+       %(now)s
+  FROM totals
+ WHERE chat_count + practice_count + ielts_count + cefr_count + voice_rooms > 0
+ON CONFLICT (user_id, period) DO UPDATE SET
+    chat_count = excluded.chat_count,
+    practice_count = excluded.practice_count,
+    ielts_count = excluded.ielts_count,
+    cefr_count = excluded.cefr_count,
+    voice_rooms = excluded.voice_rooms,
+    total_score = excluded.total_score,
+    rank = excluded.rank,
+    chat_count_rank = excluded.chat_count_rank,
+    practice_count_rank = excluded.practice_count_rank,
+    ielts_count_rank = excluded.ielts_count_rank,
+    cefr_count_rank = excluded.cefr_count_rank,
+    voice_rooms_rank = excluded.voice_rooms_rank,
+    updated_at = excluded.updated_at
+"""
+
+
+def snapshot_period(period, now=None):
+    """Bitta period uchun LeaderboardEntry larni qayta hisoblash; period dagi qatorlar soni"""
+    from .models import LeaderboardEntry
+
+    now = now or timezone.now()
+    since = period_start(period, now)
+    tables = _tables()
+    ops = connection.ops
+    params = {
+        'period': period,
+        'now': ops.adapt_datetimefield_value(now),
+        'since': ops.adapt_datetimefield_value(since) if since else None,
+        'true': True,
+    }
+    totals = _ALLTIME_TOTALS if since is None else _WINDOW_TOTALS
+    sql = (totals + _UPSERT).format(**tables)
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        # Period dan chiqib ketgan (bu safar yozilmagan) qatorlar
+        cursor.execute(
+            f"DELETE FROM {tables['entry']} WHERE period = %s AND updated_at < %s",
+            [period, params['now']],
+        )
+    return LeaderboardEntry.objects.filter(period=period).count()
+
+
+@shared_task
+def refresh_leaderboard_snapshots():
+    """Celery beat: weekly / monthly / alltime reytinglarni yangilash"""
+    now = timezone.now()
+    result = {}
+    for period in PERIODS:
+        try:
+            result[period] = snapshot_period(period, now)
+        except Exception as e:
+            logger.error(f"[leaderboard] snapshot {period} error: {e}")
+    logger.info(f"[leaderboard] snapshots refreshed: {result}")
+    return result
@@ -2,6 +2,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from users.models import User
+from . import engine
 from .serializers import LeaderboardUserSerializer
 
 
@@ -13,5 +14,10 @@ class LeaderboardView(APIView):
         allowed = ["chat_count", "practice_count", "ielts_count", "cefr_count"]
         if sort_by not in allowed:
             sort_by = "chat_count"
-        users = User.objects.all().order_by(f"-{sort_by}")[:50]
+        period = request.query_params.get("period", "alltime")
+        if period not in engine.PERIODS:
+            period = "alltime"
+        top_ids = [uid for uid, _ in engine.top(sort_by, 50, period)]
+        by_id = User.objects.prefetch_related("received_ratings").in_bulk(top_ids)
+        users = [by_id[uid] for uid in top_ids if uid in by_id]
         return Response(LeaderboardUserSerializer(users, many=True).data)
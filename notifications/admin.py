@@ -1,52 +1,23 @@
-import json
-import os
-import requests
 from django.contrib import admin
 from django.conf import settings
 from django.utils import timezone
 from django.utils.html import format_html
-from .models import DailyReport, Broadcast
-
-
-def _send_text(token, chat_id, text, keyboard=None):
-    payload = {'chat_id': chat_id, 'text': text, 'parse_mode': 'HTML'}
-    if keyboard:
-        payload['reply_markup'] = keyboard
-    try:
-        r = requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            json=payload, timeout=10
-        )
-        return r.status_code == 200
-    except Exception:
-        return False
-
-
-def _send_photo(token, chat_id, img_path, caption, keyboard=None):
-    data = {'chat_id': str(chat_id), 'caption': caption, 'parse_mode': 'HTML'}
-    if keyboard:
-        data['reply_markup'] = json.dumps(keyboard)
-    try:
-        with open(img_path, 'rb') as f:
-            r = requests.post(
-                f"https://api.telegram.org/bot{token}/sendPhoto",
-                data=data, files={'photo': f}, timeout=15
-            )
-        return r.status_code == 200
-    except Exception:
-        return False
+from .models import DailyReport, Broadcast, TelegramMessage
 
 
 @admin.register(Broadcast)
 class BroadcastAdmin(admin.ModelAdmin):
-    list_display = ['title', 'status_badge', 'sent_count', 'created_by', 'created_at', 'sent_at']
+    list_display = ['title', 'status_badge', 'sent_count', 'failed_count', 'created_by', 'created_at', 'sent_at']
     list_filter = ['is_sent', 'created_at']
     search_fields = ['title', 'message']
-    readonly_fields = ['is_sent', 'sent_at', 'sent_count', 'created_by', 'image_preview']
+    readonly_fields = [
+        'is_sent', 'queued_at', 'sent_at', 'total_count', 'sent_count', 'failed_count',
+        'created_by', 'image_preview',
+    ]
     fields = [
         'title', 'message', 'image', 'image_preview',
         'link', 'button_text',
-        'is_sent', 'sent_count', 'sent_at', 'created_by'
+        'is_sent', 'queued_at', 'total_count', 'sent_count', 'failed_count', 'sent_at', 'created_by'
     ]
     actions = ['send_now']
 
@@ -56,6 +27,11 @@ class BroadcastAdmin(admin.ModelAdmin):
                 '<span style="color:#28a745;font-weight:bold">✅ Yuborildi ({})</span>',
                 obj.sent_count
             )
+        if obj.queued_at:
+            return format_html(
+                '<span style="color:#17a2b8;font-weight:bold">📤 Yuborilmoqda ({}/{})</span>',
+                obj.sent_count + obj.failed_count, obj.total_count
+            )
         return format_html('<span style="color:#ffc107;font-weight:bold">⏳ Kutmoqda</span>')
     status_badge.short_description = 'Holat'
 
@@ -75,7 +51,7 @@ class BroadcastAdmin(admin.ModelAdmin):
 
     @admin.action(description="📢 Hozir yuborish — barcha bot foydalanuvchilariga")
     def send_now(self, request, queryset):
-        from users.models import BotActivity
+        from .tasks import send_broadcast
 
         token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
         if not token:
@@ -83,58 +59,58 @@ class BroadcastAdmin(admin.ModelAdmin):
             return
 
         for broadcast in queryset:
-            if broadcast.is_sent:
+            if broadcast.is_sent or broadcast.queued_at:
                 self.message_user(
                     request,
-                    f"⚠️ '{broadcast.title}' allaqachon yuborilgan!",
+                    f"⚠️ '{broadcast.title}' allaqachon yuborilgan yoki navbatda!",
                     level='warning'
                 )
                 continue
 
-            telegram_ids = list(
-                BotActivity.objects.values_list('telegram_id', flat=True).distinct()
-            )
-            if not telegram_ids:
-                self.message_user(request, "⚠️ Bot foydalanuvchilari yo'q.", level='warning')
-                continue
-
-            kb = None
-            if broadcast.link:
-                btn = broadcast.button_text or "🔗 Batafsil"
-                kb = {"inline_keyboard": [[{"text": btn, "url": broadcast.link}]]}
-
-            sent = 0
-            failed = 0
-            for tg_id in telegram_ids:
-                try:
-                    if broadcast.image and broadcast.image.name:
-                        img_path = os.path.join(settings.MEDIA_ROOT, broadcast.image.name)
-                        if os.path.exists(img_path):
-                            ok = _send_photo(token, tg_id, img_path, broadcast.message, kb)
-                        else:
-                            ok = _send_text(token, tg_id, broadcast.message, kb)
-                    else:
-                        ok = _send_text(token, tg_id, broadcast.message, kb)
-                    if ok:
-                        sent += 1
-                    else:
-                        failed += 1
-                except Exception:
-                    failed += 1
-
-            broadcast.is_sent = True
-            broadcast.sent_at = timezone.now()
-            broadcast.sent_count = sent
-            broadcast.save(update_fields=['is_sent', 'sent_at', 'sent_count'])
+            broadcast.queued_at = timezone.now()
+            broadcast.save(update_fields=['queued_at'])
+            send_broadcast.delay(broadcast.pk)
             self.message_user(
                 request,
-                f"✅ '{broadcast.title}' — {sent} ta yuborildi, {failed} ta xato."
+                f"📤 '{broadcast.title}' navbatga qo'yildi — yuborish fonda davom etadi."
             )
 
 
+@admin.register(TelegramMessage)
+class TelegramMessageAdmin(admin.ModelAdmin):
+    list_display = ['chat_id', 'kind', 'status', 'attempts', 'error', 'broadcast', 'created_at', 'sent_at']
+    list_filter = ['status', 'kind', 'created_at']
+    search_fields = ['chat_id', 'text']
+    list_select_related = ['broadcast']
+    readonly_fields = [f.name for f in TelegramMessage._meta.fields]
+    actions = ['retry_failed']
+
+    def has_add_permission(self, request):
+        return False
+
+    @admin.action(description="🔁 Xato xabarlarni qayta yuborish")
+    def retry_failed(self, request, queryset):
+        from . import telegram
+
+        count = queryset.filter(status='failed').update(
+            status='pending', attempts=0, next_attempt_at=None, error=''
+        )
+        if count:
+            telegram.schedule_delivery()
+        self.message_user(request, f"🔁 {count} ta xabar qayta navbatga qo'yildi.")
+
+
 @admin.register(DailyReport)
 class DailyReportAdmin(admin.ModelAdmin):
     list_display = ["user", "date", "chats_count", "ielts_score", "cefr_score", "sent_at"]
     list_filter = ["date"]
     search_fields = ["user__username"]
     readonly_fields = ["sent_at"]
+    list_select_related = ["user"]
+    actions = ["resend"]
+
+    @admin.action(description="📨 Qayta yuborish (saqlangan hisobot)")
+    def resend(self, request, queryset):
+        from . import reports
+        count = reports.resend(queryset)
+        self.message_user(request, f"📨 {count} ta hisobot navbatga qo'yildi.")
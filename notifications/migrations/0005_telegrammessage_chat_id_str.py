@@ -0,0 +1,18 @@
+# Generated by Django 5.2.11 on 2026-10-17 04:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0004_telegrammessage'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='telegrammessage',
+            name='chat_id',
+            field=models.CharField(db_index=True, help_text="Telegram id yoki '@channel'", max_length=64),
+        ),
+    ]
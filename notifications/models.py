@@ -11,6 +11,9 @@ class Broadcast(models.Model):
     is_sent = models.BooleanField(default=False)
     sent_at = models.DateTimeField(null=True, blank=True)
     sent_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    total_count = models.PositiveIntegerField(default=0)
+    queued_at = models.DateTimeField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
@@ -44,3 +47,44 @@ class DailyReport(models.Model):
 
     def __str__(self):
         return f"{self.user} | {self.date}"
+
+
+class TelegramMessage(models.Model):
+    """
+    Telegram outbox — har bir xabar alohida qator (notifications/telegram.py).
+    Yuborish Celery 'telegram' navbatida, holati shu yerda saqlanadi.
+    """
+    STATUS_PENDING = 'pending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Navbatda'),
+        (STATUS_SENT, 'Yuborildi'),
+        (STATUS_FAILED, 'Xato'),
+    ]
+
+    chat_id = models.CharField(max_length=64, db_index=True, help_text="Telegram id yoki '@channel'")
+    kind = models.CharField(max_length=40, default='message', help_text="broadcast, premium, daily_report ...")
+    text = models.TextField()
+    reply_markup = models.JSONField(null=True, blank=True)
+    photo = models.CharField(max_length=255, blank=True, help_text="MEDIA_ROOT ga nisbatan rasm yo'li")
+    broadcast = models.ForeignKey(
+        Broadcast, on_delete=models.CASCADE, null=True, blank=True, related_name='messages'
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(null=True, blank=True)
+    error = models.CharField(max_length=255, blank=True)
+    telegram_message_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='tgmsg_status_due_idx'),
+            models.Index(fields=['broadcast', 'status'], name='tgmsg_broadcast_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} → {self.chat_id} [{self.status}]"
@@ -0,0 +1,289 @@
+"""
+Kunlik progress hisoboti (DailyReport) — batched.
+
+Userlar id bo'yicha keyset chunk larda olinadi (CHUNK_SIZE), har bir chunk uchun
+bir nechta guruhlangan so'rov:
+  - IELTS / CEFR: har bir user ning shu hafta va o'tgan haftadagi oxirgi sessiyasi
+    (PostgreSQL: DISTINCT ON, boshqa DB: ROW_NUMBER() OVER); IELTS part bandlari SessionScore dan
+  - Practice: started_at oynalari bo'yicha shartli aggregatsiya (count / avg)
+  - Tense: premium userlar uchun SUM(usage), SUM(correct) — telegram_id, tense bo'yicha
+Natija notifications.DailyReport ga (user, date) bo'yicha upsert qilinadi;
+report_data dan matnni qayta hisoblamasdan render() qilish / qayta yuborish mumkin.
+DailyReport.sent_at qo'yilgan userlar o'sha kuni qayta yuborishda o'tkazib yuboriladi.
+"""
+import logging
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Exists, F, OuterRef, Q, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+WEAK_TENSE_PCT = 70
+
+
+# ─── Aggregatsiya ─────────────────────────────────────────────────────────────
+
+def _latest(model, user_ids, start, end, fields):
+    """{user_id: {...fields}} — [start, end) oynadagi oxirgi yakunlangan sessiya"""
+    qs = model.objects.filter(user_id__in=user_ids, is_completed=True, started_at__gte=start)
+    if end is not None:
+        qs = qs.filter(started_at__lt=end)
+    if connection.vendor == 'postgresql':
+        qs = qs.order_by('user_id', '-started_at', '-id').distinct('user_id')
+    else:
+        qs = qs.annotate(
+            row_number=Window(
+                RowNumber(), partition_by=[F('user_id')],
+                order_by=[F('started_at').desc(), F('id').desc()],
+            )
+        ).filter(row_number=1)
+    return {row['user_id']: row for row in qs.values('user_id', *fields)}
+
+
+def _practice(user_ids, week_ago, two_weeks_ago):
+    from practice.models import PracticeSession
+
+    this_week = Q(started_at__gte=week_ago)
+    prev_week = Q(started_at__lt=week_ago)
+    scored = Q(overall_score__gt=0)
+    rows = (
+        PracticeSession.objects
+        .filter(user_id__in=user_ids, is_completed=True, started_at__gte=two_weeks_ago)
+        .order_by()
+        .values('user_id')
+        .annotate(
+            count_this=Count('id', filter=this_week),
+            avg_this=Avg('overall_score', filter=this_week & scored),
+            avg_prev=Avg('overall_score', filter=prev_week & scored),
+        )
+    )
+    return {row['user_id']: row for row in rows}
+
+
+def _weak_tenses(telegram_ids, today):
+    """{telegram_id: [[pct, tense], ...]} — 7 kunda aniqligi WEAK_TENSE_PCT dan past zamonlar"""
+    from users import tense_stats
+
+    weak = {}
+    for telegram_id, tenses in tense_stats.summary_many(telegram_ids, days=7, today=today).items():
+        items = [[d['accuracy'], t] for t, d in tenses.items() if d['accuracy'] < WEAK_TENSE_PCT]
+        if items:
+            weak[telegram_id] = sorted(items, key=lambda x: x[0])
+    return weak
+
+
+def collect(users, now):
+    """
+    users — User lar chunk i. → {user_id: report_data}
+    Faollik bo'lmagan userlar natijaga kirmaydi.
+    """
+    from ielts_mock.models import IELTSSession
+    from cefr_mock.models import CEFRSession
+    from users import scores
+    from users.models import SessionScore
+
+    week_ago = now - timedelta(days=7)
+    two_weeks_ago = now - timedelta(days=14)
+    user_ids = [u.id for u in users]
+
+    ielts_this = _latest(IELTSSession, user_ids, week_ago, None, ['id', 'overall_band'])
+    ielts_parts = scores.by_session(
+        SessionScore.IELTS, [row['id'] for row in ielts_this.values()], list(scores.IELTS_PARTS),
+    )
+    ielts_prev = _latest(IELTSSession, user_ids, two_weeks_ago, week_ago, ['overall_band'])
+    cefr_this = _latest(CEFRSession, user_ids, week_ago, None, ['score', 'level'])
+    cefr_prev = _latest(CEFRSession, user_ids, two_weeks_ago, week_ago, ['score'])
+    practice = _practice(user_ids, week_ago, two_weeks_ago)
+
+    premium_tg_ids = [
+        u.telegram_id for u in users
+        if u.telegram_id and u.is_premium and (not u.premium_expires or u.premium_expires >= now)
+    ]
+    weak = _weak_tenses(premium_tg_ids, now.date())
+
+    result = {}
+    for user in users:
+        data = {'name': user.first_name or ''}
+
+        row = ielts_this.get(user.id)
+        if row:
+            prev = ielts_prev.get(user.id)
+            data['ielts'] = {
+                'band': row['overall_band'] or 0,
+                'prev_band': (prev['overall_band'] or 0) if prev else None,
+                'sub': {
+                    scores.IELTS_PARTS[name]: value
+                    for name, value in ielts_parts.get(row['id'], {}).items()
+                },
+            }
+
+        row = cefr_this.get(user.id)
+        if row:
+            prev = cefr_prev.get(user.id)
+            data['cefr'] = {
+                'score': row['score'] or 0,
+                'level': row['level'] or '?',
+                'prev_score': (prev['score'] or 0) if prev else None,
+            }
+
+        row = practice.get(user.id)
+        if row and row['count_this']:
+            data['practice'] = {
+                'count': row['count_this'],
+                'avg': round(row['avg_this']) if row['avg_this'] else 0,
+                'prev_avg': round(row['avg_prev']) if row['avg_prev'] is not None else None,
+            }
+
+        if weak.get(user.telegram_id):
+            data['weak_tenses'] = weak[user.telegram_id][:4]
+
+        if len(data) > 1:
+            result[user.id] = data
+    return result
+
+
+# ─── Matn ─────────────────────────────────────────────────────────────────────
+
+def _trend(diff, unit=''):
+    if diff > 0:
+        return f"   ↑ +{diff}{unit} o'sdi 🎉"
+    if diff < 0:
+        return f"   ↓ {diff}{unit} kamaydi 📉"
+    return "   = O'zgarmadi ➡️"
+
+
+def render(data) -> str:
+    """report_data → Telegram HTML matni"""
+    lines = [f"📊 <b>{data.get('name') or 'Salom'}, bugungi progress:</b>\n"]
+
+    ielts = data.get('ielts')
+    if ielts:
+        band = ielts['band']
+        lines.append(f"📝 <b>IELTS:</b> Band <b>{band}/9.0</b>")
+        if ielts['prev_band'] is not None:
+            lines.append(_trend(round(band - ielts['prev_band'], 1)))
+        sub = ielts.get('sub') or {}
+        parts_text = ' | '.join(
+            f"P{i}:{sub[f'part{i}_band']}" for i in (1, 2, 3) if sub.get(f'part{i}_band')
+        )
+        if parts_text:
+            lines.append(f"   {parts_text}")
+        lines.append("")
+
+    cefr = data.get('cefr')
+    if cefr:
+        lines.append(f"🎓 <b>CEFR:</b> <b>{cefr['score']}/75</b> ({cefr['level']})")
+        if cefr['prev_score'] is not None:
+            lines.append(_trend(cefr['score'] - cefr['prev_score'], ' ball'))
+        lines.append("")
+
+    practice = data.get('practice')
+    if practice:
+        lines.append(
+            f"🎤 <b>Practice:</b> {practice['count']} ta sessiya, o'rtacha <b>{practice['avg']}/100</b>"
+        )
+        if practice['prev_avg'] is not None:
+            diff = practice['avg'] - practice['prev_avg']
+            if diff:
+                lines.append(_trend(diff, ' ball'))
+        lines.append("")
+
+    weak = data.get('weak_tenses')
+    if weak:
+        lines.append("⏰ <b>Zaif zamonlar (bu hafta):</b>")
+        for pct, tense in weak:
+            emoji = '⚠️' if pct >= 50 else '❌'
+            lines.append(f"   {emoji} {tense}: {pct}%")
+        lines.append("")
+
+    lines.append("💪 Har kuni mashq qiling — muvaffaqiyat sizniki!")
+    lines.append("📱 <b>My Progress:</b> /progress buyrug'ini yuboring")
+    return "\n".join(lines)
+
+
+# ─── Saqlash va yuborish ──────────────────────────────────────────────────────
+
+def _active_users(now, day):
+    """Oxirgi 7 kunda faol, bugungi hisoboti hali yuborilmagan userlar (beat retry / qo'lda qayta ishga tushirish)"""
+    from users.models import User
+    from .models import DailyReport
+    sent = DailyReport.objects.filter(user_id=OuterRef('pk'), date=day, sent_at__isnull=False)
+    return User.objects.filter(
+        ~Exists(sent),
+        telegram_id__isnull=False,
+        updated_at__gte=now - timedelta(days=7),
+    ).only('id', 'first_name', 'telegram_id', 'is_premium', 'premium_expires')
+
+
+def _save(reports, day):
+    """(user_id, data) lar → DailyReport upsert (user, date)"""
+    from .models import DailyReport
+
+    rows = [
+        DailyReport(
+            user_id=user_id, date=day,
+            practice_count=(data.get('practice') or {}).get('count', 0),
+            ielts_score=(data.get('ielts') or {}).get('band'),
+            cefr_score=(data.get('cefr') or {}).get('score'),
+            report_data=data,
+        )
+        for user_id, data in reports.items()
+    ]
+    DailyReport.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user', 'date'],
+        update_fields=['practice_count', 'ielts_score', 'cefr_score', 'report_data'],
+    )
+
+
+def send_daily_reports(now=None, chunk_size=CHUNK_SIZE):
+    """Faol userlar uchun bugungi hisobot → DailyReport + Telegram outbox (bir kunda bir marta)"""
+    from . import telegram
+    from .models import DailyReport
+
+    now = now or timezone.now()
+    day = timezone.localdate(now)
+    users_qs = _active_users(now, day)
+
+    total = queued = 0
+    last_id = 0
+    while True:
+        users = list(users_qs.filter(id__gt=last_id).order_by('id')[:chunk_size])
+        if not users:
+            break
+        last_id = users[-1].id
+        total += len(users)
+
+        reports = collect(users, now)
+        if not reports:
+            continue
+        tg_ids = {u.id: u.telegram_id for u in users}
+        # Outbox qatorlari va sent_at birga: yiqilgan chunk qayta ishga tushganda to'liq qaytadan yuboriladi
+        with transaction.atomic():
+            _save(reports, day)
+            queued += len(telegram.enqueue_many(
+                ((tg_ids[user_id], render(data)) for user_id, data in reports.items()),
+                kind='daily_report', schedule=False,
+            ))
+            DailyReport.objects.filter(user_id__in=list(reports), date=day).update(sent_at=timezone.now())
+
+    if queued:
+        telegram.schedule_delivery()
+    logger.info(f"[daily_report] queued={queued}/{total}")
+    return {'status': 'ok', 'users': total, 'queued': queued}
+
+
+def resend(reports):
+    """Saqlangan DailyReport larni qayta hisoblamasdan qayta yuborish"""
+    from . import telegram
+
+    reports = [r for r in reports.select_related('user') if r.user.telegram_id]
+    created = telegram.enqueue_many(
+        ((r.user.telegram_id, render(r.report_data)) for r in reports), kind='daily_report',
+    )
+    return len(created)
@@ -0,0 +1,139 @@
+"""
+Celery tasks: Telegram outbox yetkazish (navbat: 'telegram', settings.CELERY_TASK_ROUTES)
+"""
+import asyncio
+import logging
+from datetime import timedelta
+
+from celery import shared_task
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.utils import timezone
+
+from . import telegram
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 500
+LEASE = timedelta(minutes=10)   # olingan qatorlar — worker o'lsa shu vaqtdan keyin qayta olinadi
+
+_STATE_FIELDS = ['status', 'attempts', 'next_attempt_at', 'error', 'telegram_message_id', 'sent_at']
+
+
+def _due_q(now):
+    return Q(status='pending') & (Q(next_attempt_at__isnull=True) | Q(next_attempt_at__lte=now))
+
+
+def _claim(limit):
+    """Navbatdagi xabarlarni olish (lease bilan). Oddiy xabarlar broadcast dan oldin."""
+    from .models import TelegramMessage
+
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            TelegramMessage.objects
+            .select_for_update(skip_locked=True)
+            .filter(_due_q(now))
+            .order_by(F('broadcast_id').asc(nulls_first=True), 'id')
+            .values_list('id', flat=True)[:limit]
+        )
+        if not ids:
+            return []
+        TelegramMessage.objects.filter(id__in=ids).update(next_attempt_at=now + LEASE)
+    return list(TelegramMessage.objects.filter(id__in=ids).order_by('id'))
+
+
+def _refresh_broadcasts(broadcast_ids):
+    """Broadcast hisoblagichlari; navbatda xabar qolmasa — yakunlangan"""
+    from .models import Broadcast, TelegramMessage
+
+    for broadcast_id in broadcast_ids:
+        counts = TelegramMessage.objects.filter(broadcast_id=broadcast_id).aggregate(
+            sent=Count('id', filter=Q(status='sent')),
+            failed=Count('id', filter=Q(status='failed')),
+            pending=Count('id', filter=Q(status='pending')),
+        )
+        update = {'sent_count': counts['sent'], 'failed_count': counts['failed']}
+        if not counts['pending']:
+            update.update(is_sent=True, sent_at=timezone.now())
+        Broadcast.objects.filter(pk=broadcast_id).update(**update)
+
+
+def _drain():
+    """Vaqti kelgan barcha xabarlarni chunk lab yuborish → (sent, failed)"""
+    token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
+    if not token:
+        logger.warning('[telegram] TELEGRAM_BOT_TOKEN topilmadi — outbox yuborilmadi')
+        return 0, 0
+
+    from .models import TelegramMessage
+
+    file_ids = {}
+    sent = failed = 0
+    while True:
+        batch = _claim(CHUNK_SIZE)
+        if not batch:
+            break
+        asyncio.run(telegram.deliver(batch, token, file_ids))
+        TelegramMessage.objects.bulk_update(batch, _STATE_FIELDS)
+        sent += sum(1 for m in batch if m.status == 'sent')
+        failed += sum(1 for m in batch if m.status == 'failed')
+        _refresh_broadcasts({m.broadcast_id for m in batch if m.broadcast_id})
+    return sent, failed
+
+
+@shared_task(ignore_result=True)
+def deliver_outbox():
+    """Outbox dagi vaqti kelgan xabarlarni yuborish (enqueue dan keyin va har daqiqada beat)"""
+    sent, failed = _drain()
+    if sent or failed:
+        logger.info(f"[telegram] outbox: sent={sent} failed={failed}")
+    return {'sent': sent, 'failed': failed}
+
+
+@shared_task
+def send_broadcast(broadcast_id: int):
+    """
+    Broadcast → har bir bot foydalanuvchisi uchun TelegramMessage (bulk), keyin yuborish.
+    Admin so'rovi faqat shu task ni navbatga qo'yadi.
+    """
+    import os
+    from users.models import BotActivity
+    from .models import Broadcast, TelegramMessage
+
+    broadcast = Broadcast.objects.filter(pk=broadcast_id).first()
+    if not broadcast or broadcast.is_sent:
+        return {'status': 'skipped'}
+
+    if not TelegramMessage.objects.filter(broadcast=broadcast).exists():
+        photo = ''
+        if broadcast.image and broadcast.image.name:
+            if os.path.exists(os.path.join(settings.MEDIA_ROOT, broadcast.image.name)):
+                photo = broadcast.image.name
+
+        kb = None
+        if broadcast.link:
+            btn = broadcast.button_text or "🔗 Batafsil"
+            kb = {"inline_keyboard": [[{"text": btn, "url": broadcast.link}]]}
+
+        telegram_ids = (
+            BotActivity.objects.order_by()
+            .values_list('telegram_id', flat=True).distinct()
+            .iterator(chunk_size=5000)
+        )
+        # Hammasi yoki hech narsa: yarim yozilgan navbat qayta urinishni exists() bilan to'sib qo'ymasin
+        with transaction.atomic():
+            created = telegram.enqueue_many(
+                ((tg_id, broadcast.message) for tg_id in telegram_ids),
+                kind='broadcast', reply_markup=kb, photo=photo,
+                broadcast=broadcast, schedule=False,
+            )
+            Broadcast.objects.filter(pk=broadcast.pk).update(total_count=len(created))
+        logger.info(f"[broadcast] #{broadcast.pk}: {len(created)} ta xabar navbatga qo'yildi")
+        if not created:
+            _refresh_broadcasts([broadcast.pk])
+            return {'status': 'empty'}
+
+    sent, failed = _drain()
+    return {'status': 'ok', 'sent': sent, 'failed': failed}
@@ -0,0 +1,308 @@
+"""
+Telegram yuborish xizmati — barcha bot xabarlari shu yerdan o'tadi.
+
+    from notifications import telegram
+    telegram.enqueue(chat_id, text, kind='premium')          # bitta xabar
+    telegram.enqueue_many([(chat_id, text), ...], kind=...)   # ko'p xabar
+
+Xabar avval TelegramMessage (outbox) qatoriga yoziladi, transaction commit
+bo'lgach Celery 'telegram' navbatidagi deliver_outbox task i ishga tushadi.
+Task qatorlarni chunk lab oladi va aiohttp bilan parallel yuboradi:
+
+- global token bucket — TELEGRAM_GLOBAL_RATE (default 30 xabar/s)
+- har bir chat uchun — ketma-ket, kamida 1 s oraliq bilan
+- 429 → parameters.retry_after kutiladi (bucket lar to'xtatiladi), qisqa bo'lsa
+  shu yerning o'zida qayta yuboriladi, uzun bo'lsa next_attempt_at ga qoldiriladi
+- 400 / 403 (bot bloklangan, chat topilmadi) → failed, qayta urinilmaydi
+- tarmoq / 5xx → next_attempt_at bilan keyinroq (MAX_ATTEMPTS gacha)
+
+Limitlar process ichida — shuning uchun 'telegram' navbatini bitta worker
+process o'qiydi (docker-compose: celery ... -Q telegram -c 1).
+Rasm bir marta yuklanadi, qolgan chat larga Telegram file_id si bilan ketadi.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+API_URL = 'https://api.telegram.org/bot{token}/{method}'
+
+GLOBAL_RATE = getattr(settings, 'TELEGRAM_GLOBAL_RATE', 30)   # xabar / soniya
+PER_CHAT_RATE = 1
+CONCURRENCY = 30            # bir vaqtda ochiq HTTP so'rovlar
+INLINE_RETRIES = 3          # 429 da shu yerning o'zida qayta urinish
+MAX_INLINE_WAIT = 60        # soniya — bundan uzun retry_after → keyinroq
+MAX_ATTEMPTS = 6
+BACKOFF = [30, 60, 300, 900, 1800]
+UPLOAD_TRIES = 3            # rasm birinchi yuklanishi uchun ketma-ket urinishlar
+
+PERMANENT_ERRORS = {400, 403}
+
+
+# ─── Token bucket ─────────────────────────────────────────────────────────────
+
+class TokenBucket:
+    """rate token / soniya, capacity gacha yig'iladi; acquire() token bo'lguncha kutadi"""
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity or rate
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def pause(self, seconds):
+        """429 retry_after — bucket shuncha soniya bo'sh turadi (manfiy token = qarz)"""
+        self._refill()
+        self.tokens = min(self.tokens, 0) - seconds * self.rate
+
+
+class _ChatPacer:
+    """Bitta chat ga xabarlar ketma-ket va kamida 1/PER_CHAT_RATE soniya oraliq bilan"""
+
+    def __init__(self):
+        self.lock = asyncio.Lock()
+        self.next_at = 0.0
+
+    async def wait(self):
+        delay = self.next_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def sent(self):
+        self.next_at = max(self.next_at, time.monotonic() + 1 / PER_CHAT_RATE)
+
+    def pause(self, seconds):
+        self.next_at = max(self.next_at, time.monotonic() + seconds)
+
+
+# ─── Async sender ─────────────────────────────────────────────────────────────
+
+class _Sender:
+    def __init__(self, session, token, file_ids):
+        self.session = session
+        self.token = token
+        self.file_ids = file_ids
+        self.global_bucket = TokenBucket(GLOBAL_RATE)
+        self.chats = {}     # chat_id → _ChatPacer
+        self.sem = asyncio.Semaphore(CONCURRENCY)
+
+    def _chat(self, chat_id):
+        pacer = self.chats.get(chat_id)
+        if pacer is None:
+            pacer = self.chats[chat_id] = _ChatPacer()
+        return pacer
+
+    async def _request(self, msg):
+        """→ (http_status | None, json body | {})"""
+        import aiohttp
+
+        payload = {'chat_id': msg.chat_id, 'parse_mode': 'HTML'}
+        data = None
+        if msg.photo:
+            method = 'sendPhoto'
+            payload['caption'] = msg.text
+            file_id = self.file_ids.get(msg.photo)
+            if file_id:
+                payload['photo'] = file_id
+            else:
+                path = os.path.join(settings.MEDIA_ROOT, msg.photo)
+                content = await asyncio.to_thread(_read_file, path)
+                if content is None:
+                    # Rasm topilmadi — matn sifatida
+                    method, payload = 'sendMessage', {'chat_id': msg.chat_id, 'text': msg.text, 'parse_mode': 'HTML'}
+                else:
+                    data = aiohttp.FormData()
+                    for key, value in payload.items():
+                        data.add_field(key, str(value))
+                    if msg.reply_markup:
+                        data.add_field('reply_markup', json.dumps(msg.reply_markup))
+                    data.add_field('photo', content, filename=os.path.basename(path))
+        else:
+            method = 'sendMessage'
+            payload['text'] = msg.text
+        if data is None and msg.reply_markup:
+            payload['reply_markup'] = msg.reply_markup
+
+        url = API_URL.format(token=self.token, method=method)
+        try:
+            if data is not None:
+                resp = await self.session.post(url, data=data)
+            else:
+                resp = await self.session.post(url, json=payload)
+            async with resp:
+                try:
+                    body = await resp.json(content_type=None)
+                except ValueError:
+                    body = {}
+                return resp.status, body or {}
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            return None, {'description': str(e) or type(e).__name__}
+
+    async def send(self, msg):
+        """msg (TelegramMessage) holat maydonlarini yangilaydi — DB ga yozish chaqiruvchida"""
+        chat = self._chat(msg.chat_id)
+        for _ in range(INLINE_RETRIES):
+            async with chat.lock:
+                await chat.wait()
+                async with self.sem:
+                    await self.global_bucket.acquire()
+                    status, body = await self._request(msg)
+                chat.sent()
+            msg.attempts += 1
+
+            if status == 200 and body.get('ok'):
+                result = body.get('result') or {}
+                msg.status = msg.STATUS_SENT
+                msg.sent_at = timezone.now()
+                msg.telegram_message_id = result.get('message_id')
+                msg.next_attempt_at = None
+                msg.error = ''
+                photos = result.get('photo')
+                if msg.photo and photos:
+                    self.file_ids.setdefault(msg.photo, photos[-1]['file_id'])
+                return
+
+            error = f"{status or 'network'}: {body.get('description', '')}"[:255]
+            if status == 429:
+                retry_after = (body.get('parameters') or {}).get('retry_after', 1)
+                msg.error = error
+                chat.pause(retry_after)
+                self.global_bucket.pause(retry_after)
+                logger.warning(f"[telegram] 429 chat={msg.chat_id} retry_after={retry_after}")
+                if retry_after <= MAX_INLINE_WAIT and msg.attempts < MAX_ATTEMPTS:
+                    continue
+                _defer(msg, retry_after, error)
+                return
+            if status in PERMANENT_ERRORS:
+                msg.status = msg.STATUS_FAILED
+                msg.next_attempt_at = None
+                msg.error = error
+                return
+            _defer(msg, BACKOFF[min(msg.attempts, len(BACKOFF)) - 1], error)
+            return
+        _defer(msg, MAX_INLINE_WAIT, msg.error)
+
+
+def _read_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def _defer(msg, delay, error):
+    msg.error = error
+    if msg.attempts >= MAX_ATTEMPTS:
+        msg.status = msg.STATUS_FAILED
+        msg.next_attempt_at = None
+    else:
+        msg.next_attempt_at = timezone.now() + timedelta(seconds=delay)
+
+
+async def deliver(messages, token, file_ids=None):
+    """
+    TelegramMessage lar ro'yxatini yuborish (holat maydonlari joyida yangilanadi).
+    file_ids — {photo_path: telegram file_id}, chunk lar orasida qayta ishlatiladi.
+    """
+    import aiohttp
+
+    file_ids = {} if file_ids is None else file_ids
+    timeout = aiohttp.ClientTimeout(total=30, connect=5)
+    connector = aiohttp.TCPConnector(limit=CONCURRENCY)
+    async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+        sender = _Sender(session, token, file_ids)
+
+        # Har bir yangi rasm avval bitta chat ga yuklanadi → file_id
+        # (o'sha chat xato bersa — keyingisi bilan, UPLOAD_TRIES gacha)
+        done = set()
+        for msg in messages:
+            if not msg.photo or msg.photo in file_ids or id(msg) in done:
+                continue
+            tries = sum(1 for m in messages if id(m) in done and m.photo == msg.photo)
+            if tries >= UPLOAD_TRIES:
+                continue
+            await sender.send(msg)
+            done.add(id(msg))
+
+        await asyncio.gather(*(sender.send(m) for m in messages if id(m) not in done))
+    return messages
+
+
+# ─── Outbox (sync API) ────────────────────────────────────────────────────────
+
+# foydalanuvchi / guruh id si (-100...) yoki ommaviy kanal username i (@channel)
+CHAT_ID_RE = re.compile(r'^(?:-?\d+|@[A-Za-z][A-Za-z0-9_]{3,})$')
+
+
+def _chat_id(value):
+    value = str(value if value is not None else '').strip()
+    return value if CHAT_ID_RE.match(value) else None
+
+
+def enqueue(chat_id, text, kind='message', reply_markup=None, photo=''):
+    """Bitta xabarni navbatga qo'yish → TelegramMessage | None"""
+    created = enqueue_many([(chat_id, text)], kind=kind, reply_markup=reply_markup, photo=photo)
+    return created[0] if created else None
+
+
+def enqueue_many(items, kind='message', reply_markup=None, photo='', broadcast=None,
+                 batch_size=1000, schedule=True):
+    """
+    items — (chat_id, text) juftliklari; chat_id — son yoki '@channel'. Qatorlar bulk_create bilan yoziladi,
+    commit dan keyin deliver_outbox ishga tushadi.
+    """
+    from .models import TelegramMessage
+
+    rows = []
+    for chat_id, text in items:
+        chat_id = _chat_id(chat_id)
+        if chat_id is None:
+            continue
+        rows.append(TelegramMessage(
+            chat_id=chat_id, kind=kind, text=text,
+            reply_markup=reply_markup, photo=photo or '', broadcast=broadcast,
+        ))
+    if not rows:
+        return []
+    TelegramMessage.objects.bulk_create(rows, batch_size=batch_size)
+    if schedule:
+        schedule_delivery()
+    return rows
+
+
+def schedule_delivery():
+    """Commit dan keyin deliver_outbox — broker ishlamasa beat flush oladi"""
+    from django.db import transaction
+
+    def _send():
+        from .tasks import deliver_outbox
+        try:
+            deliver_outbox.delay()
+        except Exception as e:
+            logger.warning(f"[telegram] deliver_outbox schedule error: {e}")
+
+    transaction.on_commit(_send)
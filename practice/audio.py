@@ -0,0 +1,102 @@
+"""
+Audio transcoding (STT uchun) — diskka yozmasdan, event loop ni bloklamasdan.
+
+    wav = await to_wav16k(webm_bytes)
+
+ffmpeg asyncio.create_subprocess_exec orqali ishga tushadi: audio stdin ga,
+16 kHz mono WAV stdout dan o'qiladi. Bir worker da bir vaqtda
+MAX_CONCURRENT_TRANSCODES tadan ko'p ffmpeg ishlamaydi; navbatda
+QUEUE_TIMEOUT dan ortiq kutgan so'rov TranscodeBusy bilan qaytadi
+(back-pressure — sekin transcode boshqa socketlarni to'xtatmaydi).
+"""
+import asyncio
+import logging
+import shutil
+import subprocess
+import weakref
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+FFMPEG = shutil.which('ffmpeg') or 'ffmpeg'
+MAX_CONCURRENT_TRANSCODES = getattr(settings, 'MAX_CONCURRENT_TRANSCODES', 4)
+QUEUE_TIMEOUT = 5        # soniya — slot kutish
+TRANSCODE_TIMEOUT = 15   # soniya — bitta ffmpeg
+
+_semaphores = weakref.WeakKeyDictionary()
+
+
+class TranscodeError(Exception):
+    pass
+
+
+class TranscodeBusy(TranscodeError):
+    """Barcha slotlar band — so'rov rad etildi"""
+
+
+def _ffmpeg_args():
+    return [
+        FFMPEG, '-hide_banner', '-loglevel', 'error',
+        '-i', 'pipe:0',
+        '-ar', '16000', '-ac', '1', '-f', 'wav',
+        'pipe:1',
+    ]
+
+
+def _semaphore():
+    loop = asyncio.get_running_loop()
+    sem = _semaphores.get(loop)
+    if sem is None:
+        sem = _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_TRANSCODES)
+    return sem
+
+
+async def to_wav16k(data) -> bytes:
+    """bytes / memoryview (webm, ogg, mp4 ...) → 16 kHz mono WAV bytes"""
+    sem = _semaphore()
+    try:
+        await asyncio.wait_for(sem.acquire(), QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise TranscodeBusy('transcoder busy')
+    try:
+        return await _run_ffmpeg(data)
+    finally:
+        sem.release()
+
+
+async def _run_ffmpeg(data) -> bytes:
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *_ffmpeg_args(),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except NotImplementedError:
+        # Windows SelectorEventLoop — subprocess qo'llab-quvvatlanmaydi, thread da pipe orqali
+        return await asyncio.to_thread(_run_ffmpeg_blocking, bytes(data))
+
+    try:
+        out, err = await asyncio.wait_for(proc.communicate(data), TRANSCODE_TIMEOUT)
+    except asyncio.TimeoutError:
+        proc.kill()
+        await proc.wait()
+        raise TranscodeError('ffmpeg timeout')
+    except asyncio.CancelledError:
+        proc.kill()
+        raise
+
+    if proc.returncode != 0 or not out:
+        raise TranscodeError(f'ffmpeg failed: {err.decode(errors="ignore")[-300:]}')
+    return out
+
+
+def _run_ffmpeg_blocking(data: bytes) -> bytes:
+    try:
+        proc = subprocess.run(_ffmpeg_args(), input=data, capture_output=True, timeout=TRANSCODE_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        raise TranscodeError('ffmpeg timeout')
+    if proc.returncode != 0 or not proc.stdout:
+        raise TranscodeError(f'ffmpeg failed: {proc.stderr.decode(errors="ignore")[-300:]}')
+    return proc.stdout
@@ -7,26 +7,71 @@ Yangi yechim: Browser o'zi gapni yozadi, tugatganda 1 ta WebM audio yuboradi
 Flow:
   1. Browser: MediaRecorder bilan yozadi, sukunat aniqlansa stop qiladi
   2. Browser: {"type": "audio", "data": "<base64 webm>"} yuboradi
-  3. Server: Whisper → text → GPT-4o-mini → javob → TTS → MP3
+  3. Server: ffmpeg (pipe) → Whisper → text → GPT-4o-mini → javob → TTS → MP3
   4. Server: MP3 ni binary + "ai_audio_done" yuboradi
   5. Browser: MP3 ni play qiladi
 
+Binary rejim (?binary=1): audio base64/JSON siz — framing.py header + raw bytes
+(ikkala yo'nalishda). Eski {"type": "audio", "data": "<base64>"} ham ishlaydi.
+
+Streaming rejim (ws/practice/<id>/?stream=1):
+  3. Server: Whisper → Gemini token stream → ai_text_delta lar
+  4. Server: har bir tugagan gap darhol TTS → ai_audio_chunk (seq) + binary MP3
+  5. Server: ai_text (to'liq) + ai_done — browser chunk larni navbat bilan play qiladi
+
+Har bir turn config.metrics.Trace: decode, ffmpeg, stt, llm_first_token,
+llm_completion, tts, send, db_write stage lari + time_to_first_audio → /metrics va "[trace]" log.
+
 Token: ~$0.02 per 10 ta turn (Realtime API dan 50x arzon)
 """
 
 import io
+import re
 import json
+import random
+import time
 import base64
 import asyncio
+import binascii
 import logging
+from urllib.parse import parse_qs
 
 from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
 
+from config import ai_clients, chat_context, metrics, tts_cache
+from webapp.activity import record_activity
+from leaderboard import engine as leaderboard_engine
+from users import quotas, scores
+from . import framing, greetings
+from .audio import to_wav16k, TranscodeBusy
+
 logger = logging.getLogger(__name__)
 
-MAX_HISTORY = 8   # Token tejash
+# Streaming rejim: gap tugashi (. ! ? …) + bo'shliq — shu joyda TTS ga kesiladi
+SENTENCE_END = re.compile(r'[.!?…]+["\')\]]*\s+')
+MIN_TTS_CHARS = 12   # Juda qisqa bo'laklar ("Oh.") keyingi gap bilan qo'shiladi
+
+LLM_MODEL = 'gemini-2.0-flash'
+STT_MODEL = 'whisper-1'
+
+
+def pop_sentences(buffer: str):
+    """buffer → (tugagan gaplar ro'yxati, qoldiq matn)"""
+    sentences = []
+    start = 0
+    for m in SENTENCE_END.finditer(buffer):
+        piece = buffer[start:m.end()].strip()
+        if len(piece) >= MIN_TTS_CHARS:
+            sentences.append(piece)
+            start = m.end()
+    return sentences, buffer[start:]
+
+
+def _query_flag(scope, name) -> bool:
+    qs = parse_qs(scope.get('query_string', b'').decode())
+    return qs.get(name, ['0'])[0] in ('1', 'true', 'yes')
 
 
 class PracticeSessionConsumer(AsyncWebsocketConsumer):
@@ -45,20 +90,44 @@ class PracticeSessionConsumer(AsyncWebsocketConsumer):
 
         await self.accept()
 
-        self.chat_history  = []
+        # Rolling xulosa: chat_history[:self.summarized] — self.summary ichida (chat_context).
+        # chat_history[i] — sessiyaning (summary_base + i)-xabari, shuning uchun DB dagi
+        # summarized_count = summary_base + summarized (chat_context.compact bilan bir xil hisob)
+        self.summary       = self.session_obj.context_summary
+        self.summary_base  = self.session_obj.summarized_count
+        self.summarized    = 0
+        self.chat_history  = await self._load_history()
         self.full_transcript = []
+        self.compact_task  = None
         self.processing    = False  # Bir vaqtda 1 ta request
+        self.streaming     = _query_flag(self.scope, 'stream')  # ?stream=1
+        self.binary        = _query_flag(self.scope, 'binary')  # ?binary=1 — framing.py
+        self.turn          = None   # metrics.Trace — joriy turn (greeting yoki audio)
 
         self.ai_prompt, self.scenario_title = await self._get_ai_prompt()
         logger.info(f'Practice connect: user={self.user.id} session={self.session_id}')
 
+        # Client qaysi rejimlar yoqilganini biladi (eski clientlar bu xabarni e'tiborsiz qoldiradi)
+        await self.send(text_data=json.dumps({
+            'type': 'session_config',
+            'protocol': framing.VERSION,
+            'stream': self.streaming,
+            'binary': self.binary,
+        }))
+
         # AI birinchi salom beradi
+        self.turn = self._new_trace('practice_greeting')
         await self._send_greeting()
+        self.turn.finish()
 
     async def disconnect(self, close_code):
         pass
 
     async def receive(self, text_data=None, bytes_data=None):
+        received = time.perf_counter()
+        if bytes_data:
+            await self._receive_frame(bytes_data, received)
+            return
         if not text_data:
             return
 
@@ -66,15 +135,19 @@ class PracticeSessionConsumer(AsyncWebsocketConsumer):
         msg_type = data.get('type')
 
         if msg_type == 'audio':
-            # Browser to'liq gapni yubordi
-            if self.processing:
-                # Hozir band — ignore
-                await self.send(text_data=json.dumps({'type': 'busy'}))
-                return
+            # Eski JSON yo'li: {"type": "audio", "data": "<base64>"}
             audio_b64 = data.get('data', '')
             if audio_b64:
-                self.processing = True
-                asyncio.create_task(self._process_audio(audio_b64))
+                turn = self._new_trace('practice', received)
+                try:
+                    with turn.stage('decode'):
+                        audio = base64.b64decode(audio_b64)
+                except (binascii.Error, ValueError) as e:
+                    logger.warning(f'Practice bad audio: session={self.session_id} {e}')
+                    turn.finish('bad_audio')
+                    await self.send(text_data=json.dumps({'type': 'error', 'text': 'Invalid audio data'}))
+                    return
+                await self._start_turn(audio, turn)
 
         elif msg_type == 'end':
             feedback = await self._generate_feedback()
@@ -84,13 +157,49 @@ class PracticeSessionConsumer(AsyncWebsocketConsumer):
                 'data': feedback,
             }))
 
+    async def _receive_frame(self, bytes_data: bytes, received: float):
+        turn = self._new_trace('practice', received)
+        try:
+            with turn.stage('decode'):
+                frame_type, seq, codec, payload = framing.unpack(bytes_data)
+        except framing.FrameError as e:
+            logger.warning(f'Practice bad frame: session={self.session_id} {e}')
+            turn.finish('bad_audio')
+            await self.send(text_data=json.dumps({'type': 'error', 'text': str(e)}))
+            return
+        if frame_type == framing.AUDIO_IN:
+            logger.info(f'Practice audio frame: seq={seq} codec={framing.CODECS[codec]}')
+            await self._start_turn(payload, turn)
+
+    def _new_trace(self, pipeline, started=None):
+        return metrics.Trace(
+            pipeline, started, provider='gemini', model=LLM_MODEL,
+            session=self.session_id, user=self.user.id,
+            mode='stream' if self.streaming else 'batch',
+        )
+
+    async def _start_turn(self, audio, turn):
+        # Browser to'liq gapni yubordi
+        turn.set(audio_bytes=len(audio))
+        if self.processing:
+            # Hozir band — ignore
+            await self.send(text_data=json.dumps({'type': 'busy'}))
+            turn.finish('busy')
+            return
+        self.processing = True
+        self.turn = turn
+        asyncio.create_task(self._process_audio(audio))
+
     # ── Audio processing pipeline ─────────────────────────────────────
 
-    async def _process_audio(self, audio_b64: str):
+    async def _process_audio(self, audio):
+        turn = self.turn
+        status = 'ok'
         try:
             # 1. Whisper STT
-            transcript = await self._stt(audio_b64)
+            transcript = await self._stt(audio)
             if not transcript or len(transcript.strip()) < 2:
+                status = 'empty'
                 self.processing = False
                 await self.send(text_data=json.dumps({'type': 'ready'}))
                 return
@@ -103,31 +212,35 @@ class PracticeSessionConsumer(AsyncWebsocketConsumer):
             await self._save_message('user', transcript)
             self.full_transcript.append({'role': 'user', 'content': transcript})
 
-            # 2. GPT javob
-            ai_text = await self._gpt_response(transcript)
+            # 2-3. Javob: streaming (gap-gap TTS) yoki to'liq javob → bitta MP3
+            messages = self._reply_messages(transcript)
+            if self.streaming:
+                ai_text = await self._speak_streaming(messages, max_tokens=80)
+            else:
+                ai_text = await self._chat_completion(messages, max_tokens=80)
             if not ai_text:
+                status = 'no_reply'
                 self.processing = False
                 await self.send(text_data=json.dumps({'type': 'ready'}))
                 return
 
-            await self.send(text_data=json.dumps({
-                'type': 'ai_text',
-                'text': ai_text,
-            }))
+            self.chat_history.append({'role': 'assistant', 'content': ai_text})
             await self._save_message('assistant', ai_text)
             self.full_transcript.append({'role': 'assistant', 'content': ai_text})
+            if not self.streaming:
+                await self._speak(ai_text)
 
-            # 3. TTS → MP3
-            mp3 = await self._tts(ai_text)
-            if mp3:
-                await self.send(bytes_data=mp3)
-            await self.send(text_data=json.dumps({'type': 'ai_done'}))
-
+        except TranscodeBusy:
+            status = 'transcode_busy'
+            logger.warning(f'Practice STT busy: session={self.session_id}')
+            await self.send(text_data=json.dumps({'type': 'busy'}))
         except Exception as e:
+            status = 'error'
             logger.error(f'_process_audio error: {e}')
             await self.send(text_data=json.dumps({'type': 'ready'}))
         finally:
             self.processing = False
+            turn.finish(status)
 
     # ── Greeting ──────────────────────────────────────────────────────
 
@@ -136,31 +249,105 @@ class PracticeSessionConsumer(AsyncWebsocketConsumer):
         try:
             messages = [
                 {'role': 'system', 'content': self.ai_prompt},
-                {'role': 'user', 'content': 'Begin. One sentence only.'},
+                {'role': 'user', 'content': greetings.GREETING_INSTRUCTION},
             ]
-            greeting = await self._chat_completion(messages, max_tokens=40)
+            # Oldindan tayyorlangan greeting (matn + TTS cache) — LLM chaqiruvisiz
+            pool = await greetings.aget_pool(self.session_obj.scenario_id, self.ai_prompt)
+            greeting = random.choice(pool) if pool else ''
+            spoken = False
             if not greeting:
-                greeting = "Hello! Ready to practice?"
+                if self.streaming:
+                    greeting = await self._speak_streaming(messages, max_tokens=40)
+                else:
+                    greeting = await self._chat_completion(messages, max_tokens=40)
+                spoken = bool(greeting) and self.streaming
+            if not greeting:
+                greeting = greetings.GREETING_FALLBACK
 
-            await self.send(text_data=json.dumps({'type': 'ai_text', 'text': greeting}))
             await self._save_message('assistant', greeting)
             self.full_transcript.append({'role': 'assistant', 'content': greeting})
             self.chat_history.append({'role': 'assistant', 'content': greeting})
 
-            mp3 = await self._tts(greeting)
-            if mp3:
-                await self.send(bytes_data=mp3)
-            await self.send(text_data=json.dumps({'type': 'ai_done'}))
+            if not spoken:
+                await self._speak(greeting)
 
         except Exception as e:
             logger.error(f'_send_greeting error: {e}')
             await self.send(text_data=json.dumps({'type': 'ready'}))
 
+    # ── Javobni yuborish ──────────────────────────────────────────────
+
+    async def _speak(self, text: str):
+        """To'liq matn → bitta MP3 (eski rejim)"""
+        await self.send(text_data=json.dumps({'type': 'ai_text', 'text': text}))
+        mp3 = await self._tts(text)
+        if mp3:
+            await self._send_audio(mp3)
+        await self.send(text_data=json.dumps({'type': 'ai_done'}))
+
+    async def _send_audio(self, mp3: bytes, seq: int = 0):
+        with self.turn.stage('send'):
+            if self.binary:
+                mp3 = framing.pack(framing.AUDIO_OUT, seq, framing.CODEC_MP3, mp3)
+            await self.send(bytes_data=mp3)
+        self.turn.mark('time_to_first_audio')
+
+    async def _speak_streaming(self, messages: list, max_tokens: int) -> str:
+        """
+        Streaming rejim: LLM tokenlari kelishi bilan ai_text_delta,
+        har bir tugagan gap darhol TTS ga, audio chunk lar seq tartibida:
+            {"type": "ai_audio_chunk", "seq": n, "text": "..."} + binary MP3
+        Oxirida ai_text (to'liq matn) va ai_done. Qaytaradi: to'liq matn.
+        """
+        tts_queue = asyncio.Queue()
+        sender = asyncio.create_task(self._send_audio_chunks(tts_queue))
+        parts = []
+        buffer = ''
+        seq = 0
+
+        def schedule(sentence):
+            nonlocal seq
+            tts_queue.put_nowait((seq, sentence, asyncio.create_task(self._tts(sentence))))
+            seq += 1
+
+        try:
+            async for delta in self._chat_stream(messages, max_tokens):
+                parts.append(delta)
+                await self.send(text_data=json.dumps({'type': 'ai_text_delta', 'text': delta}))
+                sentences, buffer = pop_sentences(buffer + delta)
+                for sentence in sentences:
+                    schedule(sentence)
+            if buffer.strip():
+                schedule(buffer.strip())
+        finally:
+            tts_queue.put_nowait(None)
+            await sender
+
+        text = ''.join(parts).strip()
+        if text:
+            await self.send(text_data=json.dumps({'type': 'ai_text', 'text': text}))
+            await self.send(text_data=json.dumps({'type': 'ai_done', 'chunks': seq}))
+        return text
+
+    async def _send_audio_chunks(self, tts_queue: asyncio.Queue):
+        """TTS task lari parallel ishlaydi, lekin socketga seq tartibida chiqadi"""
+        while True:
+            item = await tts_queue.get()
+            if item is None:
+                return
+            seq, sentence, task = item
+            mp3 = await task
+            if mp3:
+                await self.send(text_data=json.dumps({
+                    'type': 'ai_audio_chunk', 'seq': seq, 'text': sentence,
+                }))
+                await self._send_audio(mp3, seq)
+
     # ── GPT ───────────────────────────────────────────────────────────
 
-    async def _gpt_response(self, user_text: str) -> str:
+    def _reply_messages(self, user_text: str) -> list:
         self.chat_history.append({'role': 'user', 'content': user_text})
-        history = self.chat_history[-MAX_HISTORY:]
+        self._maybe_compact()
 
         system = (
             self.ai_prompt +
@@ -169,105 +356,160 @@ class PracticeSessionConsumer(AsyncWebsocketConsumer):
             '3) Model correct grammar naturally. '
             '4) Stay in character.'
         )
+        # Xulosa + token budjetga sig'gan oxirgi xabarlar
+        return chat_context.build_prompt(system, self.summary, self.chat_history[self.summarized:])
+
+    # ── Rolling xulosa ────────────────────────────────────────────────
 
-        messages = [{'role': 'system', 'content': system}] + history
-        reply = await self._chat_completion(messages, max_tokens=80)
-        if reply:
-            self.chat_history.append({'role': 'assistant', 'content': reply})
-        return reply
+    def _maybe_compact(self):
+        """Xulosalanmagan qism budjetdan oshsa — eski xabarlar fonda xulosaga"""
+        if self.compact_task and not self.compact_task.done():
+            return
+        pending = self.chat_history[self.summarized:]
+        if chat_context.turns_tokens(pending) <= chat_context.SUMMARY_TRIGGER_TOKENS:
+            return
+        older = pending[:-chat_context.WINDOW]
+        if older:
+            self.compact_task = asyncio.create_task(self._compact(older))
+
+    async def _compact(self, older):
+        try:
+            summary = await chat_context.asummarize(self.summary, older)
+        except Exception as e:
+            logger.warning(f'Practice compact error: session={self.session_id} {e}')
+            return
+        if not summary:
+            return
+        start = self.summary_base + self.summarized
+        current = await self._save_summary(summary, start, start + len(older))
+        if current is None:
+            self.summary = summary
+            self.summarized += len(older)
+        else:
+            # Boshqa joyda (Celery) xulosalangan — DB dagi xulosa va hisobga o'tamiz
+            await self._resync_summary(*current)
+
+    async def _resync_summary(self, summary, summarized_count):
+        self.summary = summary
+        offset = summarized_count - self.summary_base
+        if 0 <= offset <= len(self.chat_history):
+            self.summarized = offset
+        else:
+            self.summary_base = summarized_count
+            self.summarized = 0
+            self.chat_history = await self._load_history()
+
+    @database_sync_to_async
+    def _save_summary(self, summary, start, summarized_count):
+        """compact() kabi shartli UPDATE; yozilmasa — DB dagi (context_summary, summarized_count)"""
+        from practice.models import PracticeSession
+        sessions = PracticeSession.objects.filter(id=self.session_obj.id)
+        if sessions.filter(summarized_count=start).update(
+            context_summary=summary, summarized_count=summarized_count,
+        ):
+            return None
+        logger.info(f'Practice summary skipped: session={self.session_id} (compacted elsewhere)')
+        return sessions.values_list('context_summary', 'summarized_count').first() or (self.summary, start)
+
+    def _gemini_chat(self, messages: list, max_tokens: int):
+        """OpenAI formatidagi messages → (Gemini chat, so'nggi user xabari)"""
+        # System va user/assistant xabarlarni ajratamiz
+        system_text = ''
+        history = []
+        contents = None
+
+        for msg in messages:
+            role = msg['role']
+            text = msg.get('content', '')
+            if role == 'system':
+                system_text = text
+            elif role == 'user':
+                contents = text          # so'nggi user xabari
+                history.append({'role': 'user', 'parts': [text]})
+            elif role == 'assistant':
+                history.append({'role': 'model', 'parts': [text]})
+
+        # So'nggi user xabarini historydan olib tashlaymiz (send_message_async ga beramiz)
+        chat_history = history[:-1] if history and history[-1]['role'] == 'user' else history
+
+        model = ai_clients.gemini_model(
+            LLM_MODEL,
+            system_instruction=system_text or None,
+            max_output_tokens=max_tokens,
+            temperature=0.7,
+        )
+        return model.start_chat(history=chat_history), contents or ''
 
     async def _chat_completion(self, messages: list, max_tokens: int = 80) -> str:
         """GPT-4o-mini o'rniga Gemini 1.5 Flash — tezroq va arzonroq"""
-        import google.generativeai as genai
-        from django.conf import settings
         try:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-
-            # System va user/assistant xabarlarni ajratamiz
-            system_text = ''
-            history = []
-            contents = None
-
-            for msg in messages:
-                role = msg['role']
-                text = msg.get('content', '')
-                if role == 'system':
-                    system_text = text
-                elif role == 'user':
-                    contents = text          # so'nggi user xabari
-                    history.append({'role': 'user', 'parts': [text]})
-                elif role == 'assistant':
-                    history.append({'role': 'model', 'parts': [text]})
-
-            # So'nggi user xabarini historydan olib tashlaymiz (send_message_async ga beramiz)
-            chat_history = history[:-1] if history and history[-1]['role'] == 'user' else history
-
-            model = genai.GenerativeModel(
-                'gemini-2.0-flash',
-                system_instruction=system_text or None,
-                generation_config=genai.GenerationConfig(
-                    max_output_tokens=max_tokens,
-                    temperature=0.7,
-                ),
-            )
-            chat = model.start_chat(history=chat_history)
-            resp = await chat.send_message_async(contents or '')
+            chat, contents = self._gemini_chat(messages, max_tokens)
+            with self.turn.stage('llm_completion', 'gemini', LLM_MODEL):
+                async with ai_clients.limit('gemini'):
+                    resp = await chat.send_message_async(
+                        contents, request_options=ai_clients.gemini_request_options()
+                    )
             return resp.text.strip()
         except Exception as e:
             logger.error(f'Gemini chat error: {e}')
             return ''
 
+    async def _chat_stream(self, messages: list, max_tokens: int = 80):
+        """Gemini javobini token bo'laklari bilan qaytaradi (async generator)"""
+        turn = self.turn
+        started = time.perf_counter()
+        first = True
+        try:
+            chat, contents = self._gemini_chat(messages, max_tokens)
+            async with ai_clients.limit('gemini'):
+                resp = await chat.send_message_async(
+                    contents, stream=True, request_options=ai_clients.gemini_request_options()
+                )
+                async for chunk in resp:
+                    try:
+                        text = chunk.text
+                    except ValueError:
+                        # Bo'sh / bloklangan chunk
+                        continue
+                    if text:
+                        if first:
+                            first = False
+                            turn.observe('llm_first_token', time.perf_counter() - started, 'gemini', LLM_MODEL)
+                        yield text
+        except Exception as e:
+            logger.error(f'Gemini stream error: {e}')
+        finally:
+            turn.observe('llm_completion', time.perf_counter() - started, 'gemini', LLM_MODEL)
+
     # ── STT ───────────────────────────────────────────────────────────
 
-    async def _stt(self, audio_b64: str) -> str:
-        """Base64 audio → ffmpeg → WAV → Whisper → text"""
-        import openai, tempfile, os, subprocess, shutil
-        from django.conf import settings
+    async def _stt(self, audio_bytes) -> str:
+        """Audio (bytes / memoryview) → ffmpeg (pipe) → WAV → Whisper → text"""
         try:
-            audio_bytes = base64.b64decode(audio_b64)
             logger.info(f'STT: audio size={len(audio_bytes)} bytes')
 
             if len(audio_bytes) < 3000:
                 logger.warning('STT: audio too small, skip')
                 return ''
 
-            # ffmpeg ni topamiz (Windows PATH muammosi)
-            ffmpeg_cmd = shutil.which('ffmpeg') or 'ffmpeg'
-            logger.info(f'STT: ffmpeg path = {ffmpeg_cmd}')
-
-            with tempfile.NamedTemporaryFile(suffix='.webm', delete=False) as f:
-                f.write(audio_bytes)
-                inp = f.name
-            out = inp.replace('.webm', '.wav')
-
-            try:
-                proc = subprocess.run(
-                    [ffmpeg_cmd, '-y', '-i', inp, '-ar', '16000', '-ac', '1', '-f', 'wav', out],
-                    capture_output=True, timeout=15
-                )
-                if proc.returncode != 0 or not os.path.exists(out):
-                    logger.error(f'ffmpeg failed: {proc.stderr.decode()[-300:]}')
-                    return ''
-
-                with open(out, 'rb') as f:
-                    wav_bytes = f.read()
-            finally:
-                for p in [inp, out]:
-                    try: os.unlink(p)
-                    except: pass
+            with self.turn.stage('ffmpeg'):
+                wav_bytes = await to_wav16k(audio_bytes)
 
             audio_file = io.BytesIO(wav_bytes)
             audio_file.name = 'speech.wav'
 
-            client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-            result = await client.audio.transcriptions.create(
-                model='whisper-1',
-                file=audio_file,
-                language='en',
-            )
+            with self.turn.stage('stt', 'openai', STT_MODEL):
+                async with ai_clients.limit('openai'):
+                    result = await ai_clients.async_openai_client().audio.transcriptions.create(
+                        model=STT_MODEL,
+                        file=audio_file,
+                        language='en',
+                    )
             text = result.text.strip()
             logger.info(f'STT result: "{text}"')
             return text
+        except TranscodeBusy:
+            raise
         except Exception as e:
             logger.error(f'STT error: {e}')
             return ''
@@ -275,18 +517,10 @@ class PracticeSessionConsumer(AsyncWebsocketConsumer):
     # ── TTS ───────────────────────────────────────────────────────────
 
     async def _tts(self, text: str) -> bytes:
-        """text → OpenAI TTS → MP3"""
-        import openai
-        from django.conf import settings
+        """text → TTS cache / OpenAI TTS → MP3"""
         try:
-            client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-            resp = await client.audio.speech.create(
-                model='tts-1',
-                voice='alloy',
-                input=text,
-                response_format='mp3',
-            )
-            return resp.content
+            with self.turn.stage('tts', 'openai', tts_cache.DEFAULT_MODEL):
+                return await tts_cache.synthesize_async(text, voice='alloy')
         except Exception as e:
             logger.error(f'TTS error: {e}')
             return b''
@@ -294,9 +528,6 @@ class PracticeSessionConsumer(AsyncWebsocketConsumer):
     # ── Feedback ─────────────────────────────────────────────────────
 
     async def _generate_feedback(self) -> dict:
-        import google.generativeai as genai
-        from django.conf import settings
-
         user_lines = [m['content'] for m in self.full_transcript if m['role'] == 'user']
         if not user_lines:
             return _empty_feedback()
@@ -327,16 +558,16 @@ Return this exact JSON structure:
 }}"""
 
         try:
-            genai.configure(api_key=settings.GEMINI_API_KEY)
-            model = genai.GenerativeModel(
-                'gemini-2.0-flash',
-                generation_config=genai.GenerationConfig(
-                    response_mime_type='application/json',
-                    max_output_tokens=800,
-                    temperature=0.3,
-                ),
+            model = ai_clients.gemini_model(
+                LLM_MODEL,
+                response_mime_type='application/json',
+                max_output_tokens=800,
+                temperature=0.3,
             )
-            resp = await model.generate_content_async(prompt)
+            async with ai_clients.limit('gemini'):
+                resp = await model.generate_content_async(
+                    prompt, request_options=ai_clients.gemini_request_options()
+                )
             return json.loads(resp.text)
         except Exception as e:
             logger.error(f'Gemini feedback error: {e}')
@@ -355,13 +586,31 @@ Return this exact JSON structure:
         except PracticeSession.DoesNotExist:
             return None
 
+    @database_sync_to_async
+    def _load_history(self):
+        """Oldingi ulanishdagi xulosalanmagan xabarlar (qayta ulanganda kontekst yo'qolmasin)"""
+        from practice.models import PracticeMessage
+        rows = (
+            PracticeMessage.objects.filter(session=self.session_obj)
+            .order_by('created_at', 'id')
+            .values_list('role', 'content')[self.summary_base:]
+        )
+        return [chat_context.turn(role, content) for role, content in rows]
+
     @database_sync_to_async
     def _get_ai_prompt(self):
         sc = self.session_obj.scenario
         return sc.ai_prompt, sc.title
 
+    async def _save_message(self, role, content):
+        with self.turn.stage('db_write', model='PracticeMessage'):
+            await self._save_message_db(role, content)
+        # HTTP send view bilan umumiy kontekst oynasi (key bo'lsagina)
+        with self.turn.stage('context_append', 'redis'):
+            await chat_context.append('practice', self.session_obj.id, chat_context.turn(role, content))
+
     @database_sync_to_async
-    def _save_message(self, role, content):
+    def _save_message_db(self, role, content):
         from practice.models import PracticeMessage
         try:
             PracticeMessage.objects.create(
@@ -385,9 +634,13 @@ Return this exact JSON structure:
             s.analysis_done    = True
             s.duration_seconds = int((timezone.now() - s.started_at).total_seconds())
             s.save()
+            scores.record_practice(s)
             u = s.user
             u.practice_count = (u.practice_count or 0) + 1
             u.save(update_fields=['practice_count'])
+            record_activity(u.id)
+            leaderboard_engine.incr('practice_count', u.id)
+            quotas.incr('practice', u.id)
         except Exception as e:
             logger.error(f'complete_session: {e}')
 
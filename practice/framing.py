@@ -0,0 +1,58 @@
+"""
+Practice socket binary frame protokoli (ws/practice/<id>/?binary=1).
+
+Har bir binary websocket xabari = 8 baytli header + payload:
+
+    0      1        2      3      4..7
+    type   version  codec  (0)    seq (uint32, big-endian)
+
+type:  AUDIO_IN  — browser → server, bitta to'liq gap audiosi
+       AUDIO_OUT — server → browser, TTS audio (streaming rejimda gap chunki)
+codec: CODECS dagi raqam
+
+Payload memoryview sifatida qaytadi — base64/JSON nusxalarisiz transcoder ga beriladi.
+Eski clientlar uchun {"type": "audio", "data": "<base64>"} JSON yo'li saqlanadi.
+"""
+import struct
+
+HEADER = struct.Struct('!BBBxI')
+VERSION = 1
+
+AUDIO_IN = 1
+AUDIO_OUT = 2
+
+CODEC_UNKNOWN = 0
+CODEC_WEBM = 1
+CODEC_OGG = 2
+CODEC_MP4 = 3
+CODEC_MP3 = 4
+CODEC_WAV = 5
+
+CODECS = {
+    CODEC_UNKNOWN: 'unknown',
+    CODEC_WEBM: 'webm',
+    CODEC_OGG: 'ogg',
+    CODEC_MP4: 'mp4',
+    CODEC_MP3: 'mp3',
+    CODEC_WAV: 'wav',
+}
+
+
+class FrameError(ValueError):
+    pass
+
+
+def pack(frame_type: int, seq: int, codec: int, payload: bytes) -> bytes:
+    return HEADER.pack(frame_type, VERSION, codec, seq & 0xFFFFFFFF) + payload
+
+
+def unpack(data: bytes):
+    """→ (frame_type, seq, codec, payload memoryview)"""
+    if len(data) < HEADER.size:
+        raise FrameError('frame too short')
+    frame_type, version, codec, seq = HEADER.unpack_from(data)
+    if version != VERSION:
+        raise FrameError(f'unsupported frame version {version}')
+    if codec not in CODECS:
+        raise FrameError(f'unknown codec {codec}')
+    return frame_type, seq, codec, memoryview(data)[HEADER.size:]
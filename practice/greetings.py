@@ -0,0 +1,39 @@
+"""
+Scenario ochilish gaplari (greeting) pool i.
+
+Har bir sessiya boshida LLM + TTS chaqirmaslik uchun har bir faol scenario
+uchun bir nechta tayyor greeting matni cache da saqlanadi, ularning audiosi
+esa TTS cache da (config/tts_cache.py) oldindan tayyorlanadi:
+
+    python manage.py warm_tts_cache
+
+Kalitda ai_prompt hash i bor — admin promptni o'zgartirsa pool avtomatik eskiradi.
+"""
+import hashlib
+
+from django.core.cache import cache
+
+GREETING_INSTRUCTION = 'Begin. One sentence only.'
+GREETING_FALLBACK = 'Hello! Ready to practice?'
+POOL_TTL = 60 * 60 * 24 * 30
+
+
+def pool_key(scenario_id, ai_prompt):
+    digest = hashlib.sha1((ai_prompt or '').encode()).hexdigest()[:12]
+    return f'practice:greetings:{scenario_id}:{digest}'
+
+
+def get_pool(scenario_id, ai_prompt):
+    return cache.get(pool_key(scenario_id, ai_prompt)) or []
+
+
+async def aget_pool(scenario_id, ai_prompt):
+    try:
+        return await cache.aget(pool_key(scenario_id, ai_prompt)) or []
+    except Exception:
+        # Cache backend ishlamasa — jonli generatsiya
+        return []
+
+
+def set_pool(scenario_id, ai_prompt, greetings):
+    cache.set(pool_key(scenario_id, ai_prompt), list(greetings), POOL_TTL)
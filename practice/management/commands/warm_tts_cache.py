@@ -0,0 +1,67 @@
+"""
+Practice greeting lari va TTS cache ni oldindan tayyorlash.
+
+    python manage.py warm_tts_cache
+    python manage.py warm_tts_cache --variants 5 --scenario 3
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Faol scenario lar uchun greeting pool yaratadi va ularning audiosini TTS cache ga yozadi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--variants', type=int, default=3, help="Har scenario uchun nechta greeting")
+        parser.add_argument('--scenario', type=int, help="Faqat bitta scenario ID")
+
+    def handle(self, *args, **options):
+        from config import tts_cache
+        from practice import greetings
+        from practice.models import PracticeScenario
+
+        scenarios = PracticeScenario.objects.filter(is_active=True).only('id', 'title', 'ai_prompt')
+        if options['scenario']:
+            scenarios = scenarios.filter(id=options['scenario'])
+
+        texts = [greetings.GREETING_FALLBACK]
+        for sc in scenarios:
+            pool = greetings.get_pool(sc.id, sc.ai_prompt)
+            # Model bir xil greeting qaytaraversa ham cheksiz aylanmasin
+            for _ in range(options['variants'] * 3):
+                if len(pool) >= options['variants']:
+                    break
+                text = self._generate(sc.ai_prompt)
+                if not text:
+                    break
+                if text not in pool:
+                    pool.append(text)
+            greetings.set_pool(sc.id, sc.ai_prompt, pool)
+            texts.extend(pool)
+            self.stdout.write(f"  {sc.title}: {len(pool)} ta greeting")
+
+        for text in texts:
+            try:
+                tts_cache.synthesize(text, voice='alloy')
+            except Exception as e:
+                self.stderr.write(f"  TTS xato: {text[:40]}… — {e}")
+
+        tts_cache.prune_disk()
+        self.stdout.write(self.style.SUCCESS(f"✅ {len(texts)} ta matn tayyor — {tts_cache.stats()}"))
+
+    def _generate(self, ai_prompt):
+        from config import ai_clients
+        from practice.greetings import GREETING_INSTRUCTION
+        try:
+            model = ai_clients.gemini_model(
+                'gemini-2.0-flash',
+                system_instruction=ai_prompt or None,
+                max_output_tokens=40,
+                temperature=0.9,
+            )
+            resp = model.generate_content(
+                GREETING_INSTRUCTION, request_options=ai_clients.gemini_request_options()
+            )
+            return resp.text.strip()
+        except Exception as e:
+            self.stderr.write(f"  Gemini xato: {e}")
+            return ''
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:29
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('practice', '0004_alter_practicescenario_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='practicesession',
+            name='context_summary',
+            field=models.TextField(blank=True, help_text='Eski xabarlar xulosasi (prompt uchun)'),
+        ),
+        migrations.AddField(
+            model_name='practicesession',
+            name='summarized_count',
+            field=models.PositiveIntegerField(default=0, help_text='Xulosaga kirgan xabarlar soni'),
+        ),
+    ]
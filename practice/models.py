@@ -117,6 +117,8 @@ class PracticeSession(models.Model):
 
     is_completed = models.BooleanField(default=False)
     analysis_done = models.BooleanField(default=False)
+    context_summary = models.TextField(blank=True, help_text="Eski xabarlar xulosasi (prompt uchun)")
+    summarized_count = models.PositiveIntegerField(default=0, help_text="Xulosaga kirgan xabarlar soni")
 
     class Meta:
         ordering = ['-started_at']
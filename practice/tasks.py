@@ -17,8 +17,7 @@ def analyze_practice_session(self, session_id: int):
     """
     try:
         from practice.models import PracticeSession, PracticeMessage
-        from openai import OpenAI
-        from django.conf import settings
+        from config.ai_clients import openai_client
 
         session = PracticeSession.objects.select_related('scenario', 'user').get(id=session_id)
 
@@ -38,7 +37,7 @@ def analyze_practice_session(self, session_id: int):
 
         full_transcript = "\n".join(f"User: {t}" for t in user_texts)
 
-        client = OpenAI(api_key=settings.OPENAI_API_KEY)
+        client = openai_client()
 
         prompt = f"""Analyze this English speaking practice transcript and return JSON.
 
@@ -99,6 +98,8 @@ Return ONLY valid JSON with this exact structure:
             'vocab_score', 'pronunciation_score', 'fluency_score',
             'tense_stats', 'analysis_done'
         ])
+        from users import scores
+        scores.record_practice(session)
 
         # User statistikasini yangilash
         _update_user_stats(session)
@@ -119,6 +120,8 @@ def _update_user_stats(session):
         user = session.user
         user.practice_count = (user.practice_count or 0) + 1
         user.save(update_fields=['practice_count'])
+        from leaderboard.engine import incr
+        incr('practice_count', user.id)
     except Exception as e:
         logger.warning(f"User stats update error: {e}")
 
@@ -131,9 +134,6 @@ def send_session_analysis_to_user(session_id: int, telegram_id: int):
     """
     try:
         from practice.models import PracticeSession
-        import aiohttp
-        import asyncio
-        from django.conf import settings
 
         session = PracticeSession.objects.get(id=session_id)
         if not session.ai_feedback:
@@ -158,19 +158,9 @@ def send_session_analysis_to_user(session_id: int, telegram_id: int):
 
         text += "\n📱 Batafsil tahlil uchun Web App → My Progress"
 
-        # Bot API orqali yuborish
-        bot_token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
-        if bot_token and telegram_id:
-            import requests
-            requests.post(
-                f"https://api.telegram.org/bot{bot_token}/sendMessage",
-                json={
-                    "chat_id": telegram_id,
-                    "text": text,
-                    "parse_mode": "HTML"
-                },
-                timeout=10
-            )
+        if telegram_id:
+            from notifications import telegram
+            telegram.enqueue(telegram_id, text, kind='practice_analysis')
 
     except Exception as e:
         logger.warning(f"send_session_analysis_to_user error: {e}")
\ No newline at end of file
@@ -5,16 +5,19 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django.utils import timezone
-from django.conf import settings
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from django.db import models
-from openai import OpenAI
+from config import async_api, chat_context
+from config.ai_clients import openai_client
+from webapp.activity import record_activity
+from leaderboard import engine as leaderboard_engine
+from users import quotas, scores
 from .models import PracticeCategory, PracticeScenario, PracticeSession, PracticeMessage
 from .serializers import PracticeCategorySerializer, PracticeScenarioSerializer, PracticeSessionSerializer
 
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
-
 class PracticeCategoryListView(generics.ListAPIView):
     serializer_class = PracticeCategorySerializer
     permission_classes = [IsAuthenticated]
@@ -33,7 +36,7 @@ class PracticeScenarioListView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        qs = PracticeScenario.objects.filter(is_active=True)
+        qs = PracticeScenario.objects.filter(is_active=True).select_related("category")
         category = self.request.query_params.get("category")
         difficulty = self.request.query_params.get("difficulty")
         if category:
@@ -60,35 +63,47 @@ class StartPracticeSessionView(APIView):
         return Response(PracticeSessionSerializer(session).data)
 
 
-class SendPracticeMessageView(APIView):
-    permission_classes = [IsAuthenticated]
+async def _recent_practice_messages(session_id, limit):
+    qs = PracticeMessage.objects.filter(session_id=session_id).order_by('-created_at', '-id')[:limit]
+    return [chat_context.turn(m.role, m.content) async for m in qs][::-1]
 
-    def post(self, request, session_id):
-        try:
-            session = PracticeSession.objects.get(id=session_id, user=request.user, is_completed=False)
-        except PracticeSession.DoesNotExist:
-            return Response({"error": "Session not found"}, status=404)
 
-        content = request.data.get("content", "")
-        if not content:
-            return Response({"error": "Content required"}, status=400)
+@method_decorator(csrf_exempt, name='dispatch')
+class SendPracticeMessageView(View):
+    """Async (ASGI), kontekst — xulosa + xulosalanmagan xabarlar (chat_context.pending). ?stream=1 → SSE."""
 
-        PracticeMessage.objects.create(session=session, role="user", content=content)
+    async def post(self, request, session_id):
+        user, data = await async_api.authenticate(request)
+        if user is None:
+            return async_api.unauthorized()
 
-        messages = list(session.messages.all())
-        history = [
-            {"role": "system", "content": session.scenario.ai_prompt}
-        ] + [
-            {"role": m.role if m.role == "user" else "assistant", "content": m.content}
-            for m in messages
-        ]
+        session = await (
+            PracticeSession.objects.select_related('scenario')
+            .filter(id=session_id, user=user, is_completed=False).afirst()
+        )
+        if session is None:
+            return JsonResponse({"error": "Session not found"}, status=404)
 
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini", messages=history, max_tokens=300
+        content = data.get("content", "")
+        if not content:
+            return JsonResponse({"error": "Content required"}, status=400)
+
+        await PracticeMessage.objects.acreate(session=session, role="user", content=content)
+        await chat_context.append('practice', session.id, chat_context.turn("user", content))
+        total = await PracticeMessage.objects.filter(session_id=session.id).acount()
+        history = await chat_context.pending(
+            'practice', session.id, lambda n: _recent_practice_messages(session.id, n),
+            session.summarized_count, total,
         )
-        ai_reply = resp.choices[0].message.content
-        msg = PracticeMessage.objects.create(session=session, role="assistant", content=ai_reply)
-        return Response({"role": "assistant", "content": ai_reply, "created_at": msg.created_at})
+        messages = chat_context.build_prompt(session.scenario.ai_prompt, session.context_summary, history)
+
+        async def on_done(reply):
+            msg = await PracticeMessage.objects.acreate(session=session, role="assistant", content=reply)
+            await chat_context.append('practice', session.id, chat_context.turn("assistant", reply))
+            await chat_context.maybe_compact('practice', session.id, session.summarized_count, total + 1)
+            return {"role": "assistant", "content": reply, "created_at": msg.created_at}
+
+        return await async_api.reply_response(request, chat_context.stream_reply(messages), on_done)
 
 
 class EndPracticeSessionView(APIView):
@@ -104,6 +119,8 @@ class EndPracticeSessionView(APIView):
         session.duration_seconds = int((session.ended_at - session.started_at).total_seconds())
         session.is_completed = True
         session.save()
+        record_activity(request.user.id)
+        quotas.incr('practice', request.user.id)
 
         messages = list(session.messages.filter(role="user"))
         if not messages:
@@ -111,7 +128,7 @@ class EndPracticeSessionView(APIView):
 
         conversation = "\n".join([f"User: {m.content}" for m in messages])
 
-        resp = client.chat.completions.create(
+        resp = openai_client().chat.completions.create(
             model="gpt-4o",
             messages=[
                 {"role": "system", "content": "You are an expert English language evaluator."},
@@ -142,9 +159,11 @@ Return JSON:
         session.ai_feedback = feedback
         session.overall_score = feedback.get("overall_score")
         session.save()
+        scores.record_practice(session)
 
         request.user.practice_count += 1
         request.user.save(update_fields=["practice_count"])
+        leaderboard_engine.incr("practice_count", request.user.id)
 
         return Response(PracticeSessionSerializer(session).data)
 
@@ -154,7 +173,11 @@ class MyPracticeSessionsView(generics.ListAPIView):
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
-        return PracticeSession.objects.filter(user=self.request.user, is_completed=True)
+        return (
+            PracticeSession.objects.filter(user=self.request.user, is_completed=True)
+            .select_related('scenario__category')
+            .prefetch_related('messages')
+        )
 
 
 """
@@ -204,16 +227,9 @@ def practice_start(request, scenario_id):
 
     # Free limit tekshirish
     user = request.user
-    if not user.has_premium_active:
-        from webapp.models import SiteSettings
-        try:
-            settings_obj = SiteSettings.objects.first()
-            free_limit = settings_obj.free_practice_limit if settings_obj else 3
-        except Exception:
-            free_limit = 3
-
-        if (user.practice_count or 0) >= free_limit:
-            return JsonResponse({'error': 'free_limit'}, status=403)
+    from users import entitlements
+    if entitlements.for_user(user).exhausted('free_practice_limit', user.practice_count):
+        return JsonResponse({'error': 'free_limit'}, status=403)
 
     try:
         scenario = PracticeScenario.objects.get(id=scenario_id, is_active=True)
@@ -264,6 +280,7 @@ def end_practice_session(request, session_id):
     session.duration_seconds = duration
     session.is_completed = True
     session.save(update_fields=['ended_at', 'duration_seconds', 'is_completed'])
+    quotas.incr('practice', request.user.id)
 
     # Celery orqali tahlil (async)
     analyze_practice_session.delay(session.id)
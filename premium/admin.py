@@ -1,4 +1,3 @@
-import requests
 from django.contrib import admin
 from django.conf import settings
 from django.utils import timezone
@@ -11,18 +10,10 @@ from .models import PremiumPlan, PremiumPurchase
 
 
 def _notify(chat_id, text):
-    token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
-    if not token or not chat_id:
-        return False
-    try:
-        r = requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            json={'chat_id': int(chat_id), 'text': text, 'parse_mode': 'HTML'},
-            timeout=10
-        )
-        return r.status_code == 200
-    except Exception:
+    from notifications import telegram
+    if not chat_id:
         return False
+    return telegram.enqueue(chat_id, text, kind='premium') is not None
 
 
 @admin.register(PremiumPlan)
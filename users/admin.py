@@ -1,8 +1,6 @@
 import json
-import requests as http_req
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from django.conf import settings
 from django.utils import timezone
 from django.utils.html import format_html
 from django.urls import path, reverse
@@ -14,20 +12,10 @@ from .models import User, Referral, BotActivity, UserTenseStats
 
 # ─── Helper ───────────────────────────────────────────────────────────────────
 
-def _send_telegram(chat_id, text, bot_token=None):
-    token = bot_token or getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
-    if not token:
-        return False
-    try:
-        resp = http_req.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            json={'chat_id': int(chat_id), 'text': text, 'parse_mode': 'HTML'},
-            timeout=10
-        )
-        return resp.status_code == 200
-    except Exception as e:
-        print(f"Telegram send error: {e}")
-        return False
+def _send_telegram(chat_id, text):
+    """Xabarni Telegram outbox ga qo'yish (notifications/telegram.py)"""
+    from notifications import telegram
+    return telegram.enqueue(chat_id, text, kind='admin') is not None
 
 
 # ─── Bot Faoliyat Admin ────────────────────────────────────────────────────────
@@ -157,7 +145,6 @@ class BotActivityAdmin(admin.ModelAdmin):
 
     @admin.action(description="✅ Premium so'rovini TASDIQLASH + xabar yuborish")
     def action_approve_premium(self, request, queryset):
-        bot_token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
         count = 0
         for act in queryset.filter(activity_type='premium_request'):
             plan = act.data.get('plan', '1 oy')
@@ -167,7 +154,6 @@ class BotActivityAdmin(admin.ModelAdmin):
                 f"💎 <b>{plan} Premium</b> so'rovingiz tasdiqlandi!\n"
                 f"⏳ Tez orada botda faollashtiriladi.\n\n"
                 f"<i>Botga qayting va /start bosing.</i>",
-                bot_token
             )
             if ok:
                 count += 1
@@ -175,7 +161,6 @@ class BotActivityAdmin(admin.ModelAdmin):
 
     @admin.action(description="❌ Premium so'rovini RAD ETISH + xabar yuborish")
     def action_reject_premium(self, request, queryset):
-        bot_token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
         count = 0
         for act in queryset.filter(activity_type='premium_request'):
             ok = _send_telegram(
@@ -183,7 +168,6 @@ class BotActivityAdmin(admin.ModelAdmin):
                 "❌ <b>Premium so'rovingiz rad etildi.</b>\n\n"
                 "To'lov cheki tasdiqlanmadi. Iltimos qayta urinib ko'ring "
                 "yoki admin bilan bog'laning.",
-                bot_token
             )
             if ok:
                 count += 1
@@ -231,20 +215,14 @@ class CustomUserAdmin(UserAdmin):
         if request.method == 'POST':
             text = request.POST.get('text', '').strip()
             if text:
+                from notifications import telegram
                 tg_users = User.objects.filter(
                     telegram_id__isnull=False
-                ).values_list('telegram_id', flat=True)
-                for tid in tg_users:
-                    ok = _send_telegram(tid, text)
-                    if ok:
-                        sent += 1
-                    else:
-                        failed += 1
+                ).values_list('telegram_id', flat=True).iterator(chunk_size=5000)
+                sent = len(telegram.enqueue_many(((tid, text) for tid in tg_users), kind='admin_broadcast'))
                 done = True
                 if sent:
-                    messages.success(request, f"✅ {sent} ta foydalanuvchiga xabar yuborildi.")
-                if failed:
-                    messages.warning(request, f"⚠️ {failed} ta foydalanuvchiga yubormadi (bloklangan yoki xato).")
+                    messages.success(request, f"📤 {sent} ta xabar navbatga qo'yildi — yuborish fonda davom etadi.")
         context = dict(
             self.admin_site.each_context(request),
             title='📢 Broadcast — Mass Message',
@@ -17,6 +17,7 @@ class UsersConfig(AppConfig):
 
         def custom_index(self_site, request, extra_context=None):
             try:
+                from users import entitlements
                 from users.models import User, BotActivity
                 from vocabulary.models import Word
                 from premium.models import PremiumPurchase
@@ -30,7 +31,7 @@ class UsersConfig(AppConfig):
                 extra_context.update({
                     # ── Stat karta raqamlari ──
                     'total_users': BotActivity.objects.values('telegram_id').distinct().count(),
-                    'premium_users': User.objects.filter(is_premium=True).count(),
+                    'premium_users': User.objects.filter(entitlements.premium_q(now)).count(),
                     'today_active': BotActivity.objects.filter(
                         created_at__date=today
                     ).values('telegram_id').distinct().count(),
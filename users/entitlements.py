@@ -0,0 +1,100 @@
+"""
+Premium huquqlari (entitlement) — faqat o'qish, DB ga yozmaydi.
+
+    ent = entitlements.for_user(request.user)   # user obyektida cache lanadi
+    ent.premium                                 # premium_expires bo'yicha hisoblanadi
+    ent.limit('free_practice_limit')            # premium → None (cheksiz)
+    ent.exhausted('free_practice_limit', used)  # limit tugaganmi
+
+Muddati o'tgan premium larda is_premium=False bo'lishi uchun
+users.tasks.expire_premiums bitta bulk UPDATE qiladi (Celery beat).
+Bungacha ham is_premium=True, premium_expires o'tgan user premium hisoblanmaydi.
+"""
+from django.db.models import Q
+from django.utils import timezone
+
+FREE_SEARCH_LIMIT = 2
+
+_CACHE_ATTR = '_entitlement'
+
+
+def is_active(is_premium, premium_expires, now=None):
+    """Premium hozir faolmi — faqat maydonlar bo'yicha, yon ta'sirsiz"""
+    if not is_premium:
+        return False
+    if premium_expires is None:
+        return True
+    return premium_expires >= (now or timezone.now())
+
+
+def premium_q(now=None, prefix=''):
+    """Faol premium userlar uchun Q — expire_premiums ishlamagan bo'lsa ham to'g'ri"""
+    now = now or timezone.now()
+    return Q(**{f'{prefix}is_premium': True}) & (
+        Q(**{f'{prefix}premium_expires__isnull': True}) | Q(**{f'{prefix}premium_expires__gte': now})
+    )
+
+
+class Entitlement:
+    """Bitta user ning huquqlari — so'rov davomida bir marta hisoblanadi"""
+
+    def __init__(self, user, now=None):
+        self.user = user
+        self.premium = is_active(user.is_premium, user.premium_expires, now)
+        self.expires = user.premium_expires if self.premium else None
+        self._settings = None
+
+    @property
+    def settings(self):
+        if self._settings is None:
+            try:
+                from webapp.models import AppSettings
+                self._settings = AppSettings.get()
+            except Exception:
+                self._settings = False
+        return self._settings
+
+    def free_limit(self, name):
+        """AppSettings dagi bepul limit (premium dan qat'i nazar)"""
+        if self.settings:
+            return getattr(self.settings, name)
+        # AppSettings o'qib bo'lmadi — model default i
+        from webapp.models import AppSettings
+        return AppSettings._meta.get_field(name).default
+
+    def limit(self, name):
+        """Amaldagi limit; premium uchun None (cheksiz)"""
+        return None if self.premium else self.free_limit(name)
+
+    def exhausted(self, name, used):
+        limit = self.limit(name)
+        return limit is not None and (used or 0) >= limit
+
+    def remaining(self, name, used):
+        limit = self.limit(name)
+        return None if limit is None else max(0, limit - (used or 0))
+
+    @property
+    def can_search_partner(self):
+        return self.premium or (self.user.free_searches_used or 0) < FREE_SEARCH_LIMIT
+
+    @property
+    def is_limited(self):
+        """Bepul limitlar tugagan va premium emas"""
+        return (
+            self.exhausted('free_practice_limit', self.user.practice_count)
+            or self.exhausted('free_ai_message_limit', self.user.ai_message_count)
+        )
+
+
+def for_user(user):
+    """User obyektida cache langan Entitlement (request.user — so'rov bo'yicha bitta)"""
+    ent = user.__dict__.get(_CACHE_ATTR)
+    if ent is None:
+        ent = Entitlement(user)
+        user.__dict__[_CACHE_ATTR] = ent
+    return ent
+
+
+def invalidate(user):
+    user.__dict__.pop(_CACHE_ATTR, None)
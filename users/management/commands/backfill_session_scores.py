@@ -0,0 +1,38 @@
+"""
+Tarixiy IELTS / CEFR / practice natijalari va bot mocklaridan SessionScore ni to'ldirish.
+
+    python manage.py backfill_session_scores
+
+Deploy da users.0010_backfill_session_scores migratsiyasi shuni bir marta bajaradi; buyruq —
+qayta to'ldirish uchun (masalan baholash mantig'i o'zgarganda).
+"""
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+    help = "Tugagan sessiyalar va BotActivity (ielts_mock / cefr_mock) dan SessionScore qatorlarini yozadi"
+
+    def handle(self, *args, **options):
+        from users import scores
+        from users.models import BotActivity, User
+        from ielts_mock.models import IELTSSession
+        from cefr_mock.models import CEFRSession
+        from practice.models import PracticeSession
+
+        counts = {}
+        done = IELTSSession.objects.filter(is_completed=True, overall_band__isnull=False)
+        counts['ielts'] = sum(scores.record_ielts(s) for s in done.select_related('user').iterator())
+
+        done = CEFRSession.objects.filter(is_completed=True, score__isnull=False)
+        counts['cefr'] = sum(scores.record_cefr(s) for s in done.select_related('user').iterator())
+
+        done = PracticeSession.objects.filter(overall_score__isnull=False)
+        counts['practice'] = sum(scores.record_practice(s) for s in done.select_related('user').iterator())
+
+        users = dict(User.objects.exclude(telegram_id__isnull=True).values_list('telegram_id', 'id'))
+        acts = BotActivity.objects.filter(activity_type__in=['ielts_mock', 'cefr_mock'])
+        counts['bot'] = sum(scores.record_bot(a, users.get(a.telegram_id)) for a in acts.iterator())
+
+        self.stdout.write(self.style.SUCCESS(
+            "✅ SessionScore: " + ', '.join(f"{k} {v} ta" for k, v in counts.items())
+        ))
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:34
+
+from datetime import timedelta
+
+from django.db import migrations, models
+
+
+def fill_rollups(apps, schema_editor):
+    """Mavjud kunlik qatorlardan haftalik / oylik yig'indilar"""
+    UserTenseStats = apps.get_model('users', 'UserTenseStats')
+    UserTenseRollup = apps.get_model('users', 'UserTenseRollup')
+
+    totals = {}
+    rows = UserTenseStats.objects.values_list(
+        'telegram_id', 'date', 'tense_name', 'usage_count', 'correct_count',
+    ).iterator(chunk_size=2000)
+    for telegram_id, date, tense_name, usage, correct in rows:
+        for period, start in (
+            ('week', date - timedelta(days=date.weekday())),
+            ('month', date.replace(day=1)),
+        ):
+            key = (telegram_id, period, start, tense_name)
+            u, c = totals.get(key, (0, 0))
+            totals[key] = (u + usage, c + correct)
+
+    UserTenseRollup.objects.bulk_create(
+        [
+            UserTenseRollup(
+                telegram_id=telegram_id, period=period, period_start=start,
+                tense_name=tense_name, usage_count=usage, correct_count=correct,
+            )
+            for (telegram_id, period, start, tense_name), (usage, correct) in totals.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0007_add_aiadvicehistory'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTenseRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('telegram_id', models.BigIntegerField()),
+                ('period', models.CharField(choices=[('week', 'Hafta'), ('month', 'Oy')], max_length=5)),
+                ('period_start', models.DateField()),
+                ('tense_name', models.CharField(max_length=50)),
+                ('usage_count', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Tense Rollup',
+                'verbose_name_plural': 'Tense Rollups',
+                'unique_together': {('telegram_id', 'period', 'period_start', 'tense_name')},
+            },
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
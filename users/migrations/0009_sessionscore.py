@@ -0,0 +1,36 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:37
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0008_usertenserollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SessionScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('telegram_id', models.BigIntegerField(blank=True, null=True)),
+                ('kind', models.CharField(choices=[('ielts', 'IELTS'), ('cefr', 'CEFR'), ('practice', 'Practice')], max_length=10)),
+                ('source', models.CharField(choices=[('web', 'Web / DRF'), ('bot', 'Bot (BotActivity)')], default='web', max_length=3)),
+                ('session_id', models.PositiveIntegerField()),
+                ('criterion', models.CharField(help_text='overall, fluency, part1, ...', max_length=20)),
+                ('value', models.FloatField()),
+                ('level', models.CharField(blank=True, max_length=5)),
+                ('started_at', models.DateTimeField()),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='session_scores', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Sessiya bali',
+                'verbose_name_plural': 'Sessiya ballari',
+                'indexes': [models.Index(fields=['user', 'kind', 'started_at'], name='score_user_kind_idx'), models.Index(fields=['telegram_id', 'kind', 'started_at'], name='score_tg_kind_idx')],
+                'unique_together': {('source', 'kind', 'session_id', 'criterion')},
+            },
+        ),
+    ]
@@ -0,0 +1,120 @@
+from django.db import migrations
+
+BATCH = 1000
+
+# users.scores dagi mezonlar xaritasining shu migratsiya vaqtidagi nusxasi —
+# keyinchalik scores.py o'zgarsa ham yangi DB larda migratsiya buzilmasin
+IELTS_SUBS = ('fluency', 'lexical', 'grammar', 'pronunciation')
+IELTS_PARTS = {'part1': 'part1_band', 'part2': 'part2_band', 'part3': 'part3_band'}
+CEFR_SUBS = ('fluency', 'accuracy', 'range', 'interaction', 'coherence')
+CEFR_PARTS = ('part1', 'part2', 'part3', 'part4')
+PRACTICE_SCORES = {
+    'overall': 'overall_score', 'grammar': 'grammar_score',
+    'vocab': 'vocab_score', 'fluency': 'fluency_score',
+}
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+def ielts_values(overall_band, sub_scores):
+    sub = sub_scores if isinstance(sub_scores, dict) else {}
+    values = {'overall': overall_band}
+    values.update({name: sub.get(name) for name in IELTS_SUBS})
+    values.update({name: sub.get(key) for name, key in IELTS_PARTS.items()})
+    return values
+
+
+def cefr_values(score, feedback):
+    fb = feedback if isinstance(feedback, dict) else {}
+    parts = fb.get('part_scores') if isinstance(fb.get('part_scores'), dict) else {}
+    values = {'overall': score}
+    values.update({name: fb.get(name) for name in CEFR_SUBS})
+    values.update({name: parts.get(name) for name in CEFR_PARTS})
+    return values
+
+
+def fill_session_scores(apps, schema_editor):
+    """Mavjud IELTS / CEFR / practice natijalari va bot mocklari → SessionScore (backfill_session_scores kabi)"""
+    SessionScore = apps.get_model('users', 'SessionScore')
+    BotActivity = apps.get_model('users', 'BotActivity')
+    User = apps.get_model('users', 'User')
+    IELTSSession = apps.get_model('ielts_mock', 'IELTSSession')
+    CEFRSession = apps.get_model('cefr_mock', 'CEFRSession')
+    PracticeSession = apps.get_model('practice', 'PracticeSession')
+
+    batch = []
+
+    def add(kind, source, session_id, started_at, values, user_id, telegram_id, level=''):
+        for criterion, value in values.items():
+            value = _number(value)
+            if value is not None:
+                batch.append(SessionScore(
+                    user_id=user_id, telegram_id=telegram_id, kind=kind, source=source,
+                    session_id=session_id, criterion=criterion, value=value,
+                    level=level or '', started_at=started_at,
+                ))
+        if len(batch) >= BATCH:
+            flush()
+
+    def flush():
+        SessionScore.objects.bulk_create(batch, batch_size=BATCH, ignore_conflicts=True)
+        batch.clear()
+
+    rows = IELTSSession.objects.filter(is_completed=True, overall_band__isnull=False).values_list(
+        'id', 'started_at', 'user_id', 'user__telegram_id', 'overall_band', 'sub_scores',
+    )
+    for session_id, started_at, user_id, telegram_id, band, sub_scores in rows.iterator(chunk_size=2000):
+        add('ielts', 'web', session_id, started_at, ielts_values(band, sub_scores), user_id, telegram_id)
+
+    rows = CEFRSession.objects.filter(is_completed=True, score__isnull=False).values_list(
+        'id', 'started_at', 'user_id', 'user__telegram_id', 'score', 'feedback', 'level',
+    )
+    for session_id, started_at, user_id, telegram_id, score, feedback, level in rows.iterator(chunk_size=2000):
+        add('cefr', 'web', session_id, started_at, cefr_values(score, feedback), user_id, telegram_id, level)
+
+    fields = list(PRACTICE_SCORES.values())
+    rows = PracticeSession.objects.filter(overall_score__isnull=False).values_list(
+        'id', 'started_at', 'user_id', 'user__telegram_id', *fields,
+    )
+    for session_id, started_at, user_id, telegram_id, *values in rows.iterator(chunk_size=2000):
+        add('practice', 'web', session_id, started_at, dict(zip(PRACTICE_SCORES, values)), user_id, telegram_id)
+
+    users = dict(User.objects.exclude(telegram_id__isnull=True).values_list('telegram_id', 'id'))
+    rows = BotActivity.objects.filter(activity_type__in=['ielts_mock', 'cefr_mock']).values_list(
+        'id', 'created_at', 'telegram_id', 'activity_type', 'data',
+    )
+    for activity_id, created_at, telegram_id, activity_type, data in rows.iterator(chunk_size=2000):
+        data = data if isinstance(data, dict) else {}
+        if activity_type == 'ielts_mock':
+            kind = 'ielts'
+            values = ielts_values(data.get('band') or data.get('overall_band'), data.get('sub_scores'))
+        else:
+            kind = 'cefr'
+            values = cefr_values(data.get('score'), data)
+        add(
+            kind, 'bot', activity_id, created_at, values, users.get(telegram_id), telegram_id,
+            str(data.get('level') or '')[:5],
+        )
+
+    if batch:
+        flush()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0009_sessionscore'),
+        ('ielts_mock', '0007_ieltssession_grading'),
+        ('cefr_mock', '0007_cefrsession_grading'),
+        ('practice', '0005_practicesession_context_summary'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_session_scores, migrations.RunPython.noop),
+    ]
@@ -2,7 +2,6 @@ import uuid
 from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django.utils import timezone
 
 
 class User(AbstractUser):
@@ -46,24 +45,35 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # users.signals — is_premium o'zgarishini qo'shimcha SELECT siz aniqlash uchun
+        if 'is_premium' in field_names:
+            instance._premium_was = instance.is_premium
+        # leaderboard.signals — is_active o'zgarishi uchun
+        if 'is_active' in field_names:
+            instance._active_was = instance.is_active
+        return instance
+
     def save(self, *args, **kwargs):
-        if not self.referral_code:
+        # Deferred (.only()) bo'lsa tekshirmaymiz — aks holda har save da SELECT
+        if 'referral_code' in self.__dict__ and not self.referral_code:
             self.referral_code = str(uuid.uuid4())[:8].upper()
         super().save(*args, **kwargs)
+        from .entitlements import invalidate
+        invalidate(self)
 
     @property
     def has_premium_active(self):
-        if not self.is_premium:
-            return False
-        if self.premium_expires and self.premium_expires < timezone.now():
-            self.is_premium = False
-            self.save(update_fields=['is_premium'])
-            return False
-        return True
+        """Faqat o'qiydi — muddati o'tganlarni users.tasks.expire_premiums o'chiradi"""
+        from .entitlements import for_user
+        return for_user(self).premium
 
     @property
     def can_search_partner(self):
-        return self.has_premium_active or self.free_searches_used < 2
+        from .entitlements import for_user
+        return for_user(self).can_search_partner
 
 
 class BotActivity(models.Model):
@@ -109,6 +119,75 @@ class UserTenseStats(models.Model):
         return f"{self.telegram_id} | {self.date} | {self.tense_name} — {self.accuracy}%"
 
 
+class UserTenseRollup(models.Model):
+    """
+    UserTenseStats ning haftalik (Dushanbadan) va oylik (1-sanadan) yig'indisi.
+    Kunlik qator bilan bitta tranzaksiyada yangilanadi (users.tense_stats.ingest) —
+    30 kunlik statistika kunlik qatorlarni yig'ish o'rniga bir necha qatordan o'qiladi.
+    """
+    WEEK = 'week'
+    MONTH = 'month'
+    PERIOD_CHOICES = [(WEEK, 'Hafta'), (MONTH, 'Oy')]
+
+    telegram_id = models.BigIntegerField()
+    period = models.CharField(max_length=5, choices=PERIOD_CHOICES)
+    period_start = models.DateField()
+    tense_name = models.CharField(max_length=50)
+    usage_count = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        # (telegram_id, period, period_start) — o'qishdagi indeksli diapazon
+        unique_together = ['telegram_id', 'period', 'period_start', 'tense_name']
+        verbose_name = 'Tense Rollup'
+        verbose_name_plural = 'Tense Rollups'
+
+    def __str__(self):
+        return f"{self.telegram_id} | {self.period} {self.period_start} | {self.tense_name}"
+
+
+class SessionScore(models.Model):
+    """
+    IELTS / CEFR / practice natijasining bitta bali = bitta qator (users.scores).
+    sub_scores / feedback / BotActivity.data JSON laridan ajratilgan — grafiklar,
+    trend va zaif tomonlar SQL da filtrlanadi va AVG qilinadi.
+    """
+    IELTS = 'ielts'
+    CEFR = 'cefr'
+    PRACTICE = 'practice'
+    KIND_CHOICES = [(IELTS, 'IELTS'), (CEFR, 'CEFR'), (PRACTICE, 'Practice')]
+
+    WEB = 'web'
+    BOT = 'bot'
+    SOURCE_CHOICES = [(WEB, 'Web / DRF'), (BOT, 'Bot (BotActivity)')]
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        null=True, blank=True, related_name='session_scores',
+    )
+    telegram_id = models.BigIntegerField(null=True, blank=True)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    source = models.CharField(max_length=3, choices=SOURCE_CHOICES, default=WEB)
+    # IELTSSession / CEFRSession / PracticeSession id (source=bot da — BotActivity id)
+    session_id = models.PositiveIntegerField()
+    criterion = models.CharField(max_length=20, help_text="overall, fluency, part1, ...")
+    value = models.FloatField()
+    level = models.CharField(max_length=5, blank=True)
+    started_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ['source', 'kind', 'session_id', 'criterion']
+        indexes = [
+            models.Index(fields=['user', 'kind', 'started_at'], name='score_user_kind_idx'),
+            models.Index(fields=['telegram_id', 'kind', 'started_at'], name='score_tg_kind_idx'),
+        ]
+        verbose_name = 'Sessiya bali'
+        verbose_name_plural = 'Sessiya ballari'
+
+    def __str__(self):
+        return f"{self.kind}#{self.session_id} {self.criterion}={self.value}"
+
+
 class AIAdviceHistory(models.Model):
     """Har bir AI tahlil natijasini saqlaydi — keyingi tahlillarda kontekst uchun"""
     user = models.ForeignKey(
@@ -0,0 +1,164 @@
+"""
+Bepul limitlar uchun foydalanish hisoblagichlari (quota).
+
+    quota:<feature>:<user_id>   → ishlatilgan soni (Redis string, QUOTA_TTL)
+
+- check(user, features)  — {feature: {allowed, used, total}}; bitta MGET
+- incr(feature, *ids)    — sessiya tugagan joyda (commit dan keyin, key bor bo'lsa INCR)
+- reset(user_id)         — key larni o'chirish → keyingi o'qishda DB dan qayta hisob
+
+Key yo'q bo'lsa (yangi user, TTL tugagan, Redis qayta ishga tushgan) qiymat DB dagi
+COUNT(*) dan olinadi va SET NX bilan yoziladi — TTL har safar DB bilan tekshiruv.
+Redis ishlamasa to'g'ridan-to'g'ri DB dan.
+"""
+import logging
+
+from django.db import transaction
+
+from config.redis_client import get_redis, mark_down
+from . import entitlements
+
+logger = logging.getLogger(__name__)
+
+QUOTA_TTL = 60 * 60 * 6
+
+# feature → AppSettings dagi limit maydoni
+FEATURES = {
+    'speaking': 'free_calls_limit',
+    'ai_call': 'free_ai_calls_limit',
+    'practice': 'free_practice_limit',
+    'ielts': 'free_ielts_limit',
+    'cefr': 'free_cefr_limit',
+}
+
+PREMIUM_RESULT = {'allowed': True, 'used': 0, 'total': 999}
+
+# Key mavjud bo'lsagina oshirish — yo'q bo'lsa keyingi o'qish DB dan oladi
+_INCR_IF_EXISTS = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCR', KEYS[1])
+end
+return false
+"""
+_incr_script = None
+
+
+def _key(feature, user_id):
+    return f'quota:{feature}:{user_id}'
+
+
+def _db_used(feature, user_id):
+    if feature in ('speaking', 'ai_call'):
+        from webapp import participants
+        return participants.ended_count(user_id, 'human' if feature == 'speaking' else 'ai')
+    if feature == 'practice':
+        from practice.models import PracticeSession
+        return PracticeSession.objects.filter(user_id=user_id, is_completed=True).count()
+    if feature == 'ielts':
+        from ielts_mock.models import IELTSSession
+        return IELTSSession.objects.filter(user_id=user_id, is_completed=True).count()
+    if feature == 'cefr':
+        from cefr_mock.models import CEFRSession
+        return CEFRSession.objects.filter(user_id=user_id, is_completed=True).count()
+    raise KeyError(feature)
+
+
+# ─── O'qish ───────────────────────────────────────────────────────────────────
+
+def used_many(user_id, features):
+    """{feature: used} — Redis MGET, yo'q key lar DB dan to'ldiriladi"""
+    features = [f for f in features if f in FEATURES]
+    if not features:
+        return {}
+    r = get_redis()
+    cached = [None] * len(features)
+    if r is not None:
+        try:
+            cached = r.mget([_key(f, user_id) for f in features])
+        except Exception as e:
+            logger.warning(f"[quota] mget error: {e}")
+            mark_down()
+            r = None
+
+    result = {}
+    missing = {}
+    for feature, value in zip(features, cached):
+        if value is not None:
+            result[feature] = int(value)
+        else:
+            result[feature] = missing[feature] = _db_used(feature, user_id)
+
+    if missing and r is not None:
+        try:
+            pipe = r.pipeline(transaction=False)
+            for feature, value in missing.items():
+                pipe.set(_key(feature, user_id), value, nx=True, ex=QUOTA_TTL)
+            pipe.execute()
+        except Exception as e:
+            logger.warning(f"[quota] set error: {e}")
+            mark_down()
+    return result
+
+
+def used(feature, user_id):
+    return used_many(user_id, [feature])[feature]
+
+
+def check(user, features):
+    """{feature: {'allowed', 'used', 'total'}} — premium uchun hisoblagichlar o'qilmaydi"""
+    features = [f for f in features if f in FEATURES]
+    ent = entitlements.for_user(user)
+    if ent.premium:
+        return {f: dict(PREMIUM_RESULT) for f in features}
+    counts = used_many(user.id, features)
+    result = {}
+    for feature in features:
+        total = ent.limit(FEATURES[feature])
+        result[feature] = {
+            'allowed': counts[feature] < total,
+            'used': counts[feature],
+            'total': total,
+        }
+    return result
+
+
+# ─── Yozish ───────────────────────────────────────────────────────────────────
+
+def incr(feature, *user_ids):
+    """Sessiya DB da yakunlangandan keyin hisoblagichni oshirish"""
+    user_ids = [uid for uid in user_ids if uid]
+    if feature not in FEATURES or not user_ids:
+        return
+    transaction.on_commit(lambda: _incr(feature, user_ids))
+
+
+def _incr(feature, user_ids):
+    global _incr_script
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        if _incr_script is None:
+            _incr_script = r.register_script(_INCR_IF_EXISTS)
+        for uid in user_ids:
+            _incr_script(keys=[_key(feature, uid)], client=r)
+    except Exception as e:
+        # Oshirilmay qolgan key — eskirgan qiymat qolmasligi uchun o'chiramiz
+        logger.warning(f"[quota] incr {feature} error: {e}")
+        mark_down()
+        try:
+            r.delete(*[_key(feature, uid) for uid in user_ids])
+        except Exception:
+            pass
+
+
+def reset(user_id, features=None):
+    """Key larni o'chirish — keyingi check DB dan qayta hisoblaydi"""
+    r = get_redis()
+    if r is None:
+        return
+    try:
+        r.delete(*[_key(f, user_id) for f in (features or FEATURES)])
+    except Exception as e:
+        logger.warning(f"[quota] reset error: {e}")
+        mark_down()
@@ -0,0 +1,189 @@
+"""
+Sessiya natijalari — SessionScore (user, kind, criterion, started_at) qatorlari.
+
+Yozish (natija tushganda):
+    scores.record_ielts(session)     — grade_ielts_session, bot_api_save_ielts, deep analysis
+    scores.record_cefr(session)      — grade_cefr_session, bot_api_save_cefr, deep analysis
+    scores.record_practice(session)  — practice tahlili tugaganda
+    scores.record_bot(activity)      — BotActivity (ielts_mock / cefr_mock)
+
+Qayta baholashda qatorlar ustidan yoziladi (upsert), yo'qolgan mezonlar o'chiriladi.
+Yozishdagi xato asosiy oqimni to'xtatmaydi — faqat log.
+
+O'qish:
+    scores.series(kind, criteria, user=...)        → sessiya bo'yicha [{started_at, level, overall, ...}]
+    scores.by_session(kind, session_ids, criteria) → {session_id: {criterion: value}}
+    scores.averages(kind, criteria, user=...)      → {criterion: avg} (bitta GROUP BY)
+"""
+import logging
+
+from django.db import transaction
+from django.db.models import Avg
+
+from .models import SessionScore
+
+logger = logging.getLogger(__name__)
+
+IELTS_SUBS = ('fluency', 'lexical', 'grammar', 'pronunciation')
+IELTS_PARTS = {'part1': 'part1_band', 'part2': 'part2_band', 'part3': 'part3_band'}
+CEFR_SUBS = ('fluency', 'accuracy', 'range', 'interaction', 'coherence')
+CEFR_PARTS = ('part1', 'part2', 'part3', 'part4')
+PRACTICE_SCORES = {
+    'overall': 'overall_score', 'grammar': 'grammar_score',
+    'vocab': 'vocab_score', 'fluency': 'fluency_score',
+}
+
+
+def _number(value):
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value > 0 else None
+
+
+# ─── JSON → mezonlar ──────────────────────────────────────────────────────────
+
+def ielts_values(overall_band, sub_scores):
+    sub = sub_scores if isinstance(sub_scores, dict) else {}
+    values = {'overall': overall_band}
+    values.update({name: sub.get(name) for name in IELTS_SUBS})
+    values.update({name: sub.get(key) for name, key in IELTS_PARTS.items()})
+    return values
+
+
+def cefr_values(score, feedback):
+    fb = feedback if isinstance(feedback, dict) else {}
+    parts = fb.get('part_scores') if isinstance(fb.get('part_scores'), dict) else {}
+    values = {'overall': score}
+    values.update({name: fb.get(name) for name in CEFR_SUBS})
+    values.update({name: parts.get(name) for name in CEFR_PARTS})
+    return values
+
+
+# ─── Yozish ───────────────────────────────────────────────────────────────────
+
+def _write(kind, source, session_id, started_at, values, user_id=None, telegram_id=None, level=''):
+    rows = [
+        SessionScore(
+            user_id=user_id, telegram_id=telegram_id, kind=kind, source=source,
+            session_id=session_id, criterion=criterion, value=value,
+            level=level or '', started_at=started_at,
+        )
+        for criterion, value in ((c, _number(v)) for c, v in values.items())
+        if value is not None
+    ]
+    try:
+        with transaction.atomic():
+            SessionScore.objects.filter(
+                source=source, kind=kind, session_id=session_id,
+            ).exclude(criterion__in=[r.criterion for r in rows]).delete()
+            if rows:
+                SessionScore.objects.bulk_create(
+                    rows,
+                    update_conflicts=True,
+                    unique_fields=['source', 'kind', 'session_id', 'criterion'],
+                    update_fields=['user', 'telegram_id', 'value', 'level', 'started_at'],
+                )
+    except Exception as e:
+        logger.warning(f"[scores] {kind}#{session_id} write error: {e}")
+    return len(rows)
+
+
+def _telegram_id(session):
+    return getattr(session.user, 'telegram_id', None) if session.user_id else None
+
+
+def record_ielts(session):
+    if not session.is_completed:
+        return 0
+    return _write(
+        SessionScore.IELTS, SessionScore.WEB, session.id, session.started_at,
+        ielts_values(session.overall_band, session.sub_scores),
+        user_id=session.user_id, telegram_id=_telegram_id(session),
+    )
+
+
+def record_cefr(session):
+    if not session.is_completed:
+        return 0
+    return _write(
+        SessionScore.CEFR, SessionScore.WEB, session.id, session.started_at,
+        cefr_values(session.score, session.feedback),
+        user_id=session.user_id, telegram_id=_telegram_id(session), level=session.level or '',
+    )
+
+
+def record_practice(session):
+    values = {name: getattr(session, field) for name, field in PRACTICE_SCORES.items()}
+    return _write(
+        SessionScore.PRACTICE, SessionScore.WEB, session.id, session.started_at, values,
+        user_id=session.user_id, telegram_id=_telegram_id(session),
+    )
+
+
+def record_bot(activity, user_id=None):
+    """Bot dan kelgan mock natijasi (BotActivity.data)"""
+    data = activity.data if isinstance(activity.data, dict) else {}
+    if activity.activity_type == 'ielts_mock':
+        kind = SessionScore.IELTS
+        values = ielts_values(data.get('band') or data.get('overall_band'), data.get('sub_scores'))
+    elif activity.activity_type == 'cefr_mock':
+        kind = SessionScore.CEFR
+        values = cefr_values(data.get('score'), data)
+    else:
+        return 0
+    return _write(
+        kind, SessionScore.BOT, activity.id, activity.created_at, values,
+        user_id=user_id, telegram_id=activity.telegram_id, level=str(data.get('level') or '')[:5],
+    )
+
+
+# ─── O'qish ───────────────────────────────────────────────────────────────────
+
+def series(kind, criteria, **filters):
+    """
+    Sessiyalar (eskidan yangiga), har birida criteria qiymatlari (yo'q — 0).
+    'overall' bo'lmagan sessiyalar kirmaydi. filters: user=, telegram_id=, source=, ...
+    """
+    rows = (
+        SessionScore.objects
+        .filter(kind=kind, criterion__in={'overall', *criteria}, **filters)
+        .order_by('started_at', 'session_id')
+        .values_list('session_id', 'started_at', 'level', 'criterion', 'value')
+    )
+    sessions = {}
+    for session_id, started_at, level, criterion, value in rows:
+        entry = sessions.get(session_id)
+        if entry is None:
+            entry = sessions[session_id] = {
+                'session_id': session_id, 'started_at': started_at, 'level': level,
+                **{c: 0 for c in criteria},
+            }
+        entry[criterion] = value
+    return [s for s in sessions.values() if s.get('overall')]
+
+
+def by_session(kind, session_ids, criteria, source=SessionScore.WEB):
+    """{session_id: {criterion: value}} — bitta so'rov"""
+    result = {}
+    if not session_ids:
+        return result
+    rows = SessionScore.objects.filter(
+        kind=kind, source=source, session_id__in=session_ids, criterion__in=criteria,
+    ).values_list('session_id', 'criterion', 'value')
+    for session_id, criterion, value in rows:
+        result.setdefault(session_id, {})[criterion] = value
+    return result
+
+
+def averages(kind, criteria, **filters):
+    """{criterion: o'rtacha} — bitta GROUP BY"""
+    rows = (
+        SessionScore.objects
+        .filter(kind=kind, criterion__in=criteria, **filters)
+        .order_by()
+        .values('criterion')
+        .annotate(avg=Avg('value'))
+    )
+    return {row['criterion']: row['avg'] for row in rows}
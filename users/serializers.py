@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
+from . import entitlements
 from .models import User, Referral
 
 
@@ -83,10 +84,10 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['referral_code', 'chat_count', 'practice_count', 'is_online']
 
     def get_has_premium(self, obj):
-        return obj.has_premium_active
+        return entitlements.for_user(obj).premium
 
     def get_can_search(self, obj):
-        return obj.can_search_partner
+        return entitlements.for_user(obj).can_search_partner
 
     def get_referral_link(self, obj):
         from django.conf import settings as dj_settings
@@ -97,40 +98,17 @@ class UserSerializer(serializers.ModelSerializer):
         return obj.practice_count or 0
 
     def get_free_mock_limit(self, obj):
-        try:
-            from webapp.models import AppSettings
-            return AppSettings.get().free_practice_limit
-        except Exception:
-            return 2
+        return entitlements.for_user(obj).free_limit('free_practice_limit')
 
     def get_free_ai_message_limit(self, obj):
-        try:
-            from webapp.models import AppSettings
-            return AppSettings.get().free_ai_message_limit
-        except Exception:
-            return 40
+        return entitlements.for_user(obj).free_limit('free_ai_message_limit')
 
     def get_free_chat_limit(self, obj):
-        try:
-            from webapp.models import AppSettings
-            return AppSettings.get().free_calls_limit
-        except Exception:
-            return 5
+        return entitlements.for_user(obj).free_limit('free_calls_limit')
 
     def get_is_limited(self, obj):
         """True if free limits are exhausted and user is not premium"""
-        if obj.has_premium_active:
-            return False
-        try:
-            from webapp.models import AppSettings
-            s = AppSettings.get()
-            if (obj.practice_count or 0) >= s.free_practice_limit:
-                return True
-            if (obj.ai_message_count or 0) >= s.free_ai_message_limit:
-                return True
-        except Exception:
-            pass
-        return False
+        return entitlements.for_user(obj).is_limited
 
     def get_avg_rating(self, obj):
         ratings = obj.received_ratings.all()
@@ -2,7 +2,7 @@
 Django signallari: Admin panel orqali premium o'zgarganda Telegram notification
 """
 import logging
-import requests
+from django.db import transaction
 from django.db.models.signals import pre_save, post_save
 from django.dispatch import receiver
 
@@ -10,36 +10,36 @@ logger = logging.getLogger(__name__)
 
 
 @receiver(pre_save, sender='users.User')
-def track_premium_change(sender, instance, **kwargs):
-    """Save old premium status before update"""
-    if instance.pk:
-        try:
-            old = sender.objects.get(pk=instance.pk)
-            instance._premium_was = old.is_premium
-        except sender.DoesNotExist:
-            instance._premium_was = False
-    else:
-        instance._premium_was = False
+def track_premium_change(sender, instance, update_fields=None, **kwargs):
+    """
+    is_premium o'zgardimi — User.from_db dagi snapshot bilan xotirada solishtiriladi.
+    SELECT faqat snapshot yo'q bo'lsa (qo'lda yaratilgan obyekt) bajariladi.
+    """
+    instance._premium_changed = False
+    if instance._state.adding or not instance.pk:
+        return
+    if update_fields is not None and 'is_premium' not in update_fields:
+        return
+
+    was = instance.__dict__.get('_premium_was')
+    if was is None:
+        was = sender.objects.filter(pk=instance.pk).values_list('is_premium', flat=True).first()
+    instance._premium_changed = was is not None and was != instance.is_premium
 
 
 @receiver(post_save, sender='users.User')
-def notify_premium_change(sender, instance, created, **kwargs):
-    """Admin premium o'zgartirsa → Telegram notification yuborish"""
-    if created:
-        return
+def notify_premium_change(sender, instance, created, update_fields=None, **kwargs):
+    """Admin premium o'zgartirsa → commit dan keyin Telegram outbox ga"""
+    changed = instance.__dict__.pop('_premium_changed', False)
+    if 'is_premium' in instance.__dict__ and (update_fields is None or 'is_premium' in update_fields):
+        instance._premium_was = instance.is_premium
 
-    old_premium = getattr(instance, '_premium_was', None)
-    if old_premium is None or old_premium == instance.is_premium:
+    if created or not changed:
         return
 
     if not instance.telegram_id:
         return
 
-    from django.conf import settings
-    token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
-    if not token:
-        return
-
     if instance.is_premium:
         exp_str = instance.premium_expires.strftime('%d.%m.%Y') if instance.premium_expires else '∞'
         text = (
@@ -59,19 +59,7 @@ def notify_premium_change(sender, instance, created, **kwargs):
             "Yana premium olish uchun /premium buyrug'ini yuboring."
         )
 
-    try:
-        resp = requests.post(
-            f"https://api.telegram.org/bot{token}/sendMessage",
-            json={
-                "chat_id": instance.telegram_id,
-                "text": text,
-                "parse_mode": "HTML",
-            },
-            timeout=10,
-        )
-        if not resp.ok:
-            logger.warning(f"[signal] Telegram notify failed: {resp.text[:200]}")
-        else:
-            logger.info(f"[signal] Premium change notified: {instance.telegram_id} → premium={instance.is_premium}")
-    except Exception as e:
-        logger.error(f"[signal] Telegram notify error: {e}")
+    from notifications import telegram
+    chat_id, is_premium = instance.telegram_id, instance.is_premium
+    transaction.on_commit(lambda: telegram.enqueue(chat_id, text, kind='premium'))
+    logger.info(f"[signal] Premium change queued: {chat_id} → premium={is_premium}")
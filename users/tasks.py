@@ -2,9 +2,7 @@
 Celery tasks: premium expiry notifications
 """
 import logging
-import requests
 from celery import shared_task
-from django.conf import settings
 from django.utils import timezone
 from datetime import timedelta
 
@@ -18,11 +16,7 @@ def send_premium_expiry_warnings():
     Telegram orqali ogohlantirish yuboradi.
     """
     from users.models import User
-
-    token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
-    if not token:
-        logger.warning('[premium_expiry] TELEGRAM_BOT_TOKEN topilmadi')
-        return
+    from notifications import telegram
 
     now = timezone.now()
     # 3 kun qolgan: bugun tugamagan, lekin 3 kundan keyin tugaydigan
@@ -36,8 +30,8 @@ def send_premium_expiry_warnings():
         telegram_id__isnull=False,
     )
 
-    sent = 0
-    for user in users:
+    items = []
+    for user in users.only('telegram_id', 'premium_expires'):
         exp_str = user.premium_expires.strftime('%d.%m.%Y')
         text = (
             "⏰ <b>Premium obunangiz tugayapti!</b>\n\n"
@@ -47,22 +41,42 @@ def send_premium_expiry_warnings():
             "botdagi <b>💎 Premium</b> tugmasini bosing.\n\n"
             "🙏 Speaking Bot jamoasi"
         )
-        try:
-            resp = requests.post(
-                f"https://api.telegram.org/bot{token}/sendMessage",
-                json={
-                    "chat_id": user.telegram_id,
-                    "text": text,
-                    "parse_mode": "HTML",
-                },
-                timeout=10,
-            )
-            if resp.ok:
-                sent += 1
-            else:
-                logger.warning(f"[premium_expiry] Telegram failed for {user.telegram_id}: {resp.text[:200]}")
-        except Exception as e:
-            logger.error(f"[premium_expiry] Error sending to {user.telegram_id}: {e}")
+        items.append((user.telegram_id, text))
+
+    queued = len(telegram.enqueue_many(items, kind='premium_expiry'))
+    logger.info(f"[premium_expiry] {queued} ta ogohlantirish navbatga qo'yildi")
+    return queued
+
+
+@shared_task
+def expire_premiums():
+    """
+    Muddati o'tgan premiumlarni bitta bulk UPDATE bilan o'chirish (signal larsiz).
+    Oxirgi sutkada tugaganlarga Telegram xabari yuboriladi.
+    """
+    from users.models import User
+    from notifications import telegram
+
+    now = timezone.now()
+    rows = list(
+        User.objects.filter(is_premium=True, premium_expires__lt=now)
+        .values_list('id', 'telegram_id', 'premium_expires')
+    )
+    if not rows:
+        return 0
 
-    logger.info(f"[premium_expiry] {sent}/{users.count()} foydalanuvchiga ogohlantirish yuborildi")
-    return sent
+    expired = User.objects.filter(
+        id__in=[r[0] for r in rows], is_premium=True, premium_expires__lt=now,
+    ).update(is_premium=False)
+
+    text = (
+        "ℹ️ <b>Premium obunangiz muddati tugadi.</b>\n\n"
+        "Yana premium olish uchun /premium buyrug'ini yuboring."
+    )
+    recent = now - timedelta(days=1)
+    telegram.enqueue_many(
+        ((tg_id, text) for _, tg_id, expires in rows if tg_id and expires >= recent),
+        kind='premium_expired',
+    )
+    logger.info(f"[premium_expiry] {expired} ta premium muddati tugadi")
+    return expired
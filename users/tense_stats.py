@@ -0,0 +1,161 @@
+"""
+Tense statistikasi — yozish (bot sync) va o'qish (bot, webapp, hisobotlar).
+
+    tense_stats.ingest(telegram_id, {"Present Simple": {"usage": 5, "correct": 4}, ...})
+    tense_stats.summary(telegram_id, days=30)  → {tense: {usage, correct, accuracy}}
+
+Yozish: har bir jadvalga bitta INSERT ... ON CONFLICT DO UPDATE (usage/correct
+mavjud qiymatga qo'shiladi) — get_or_create + save() siklidagi parallel sync
+larda yo'qoladigan increment lar yo'q. UserTenseStats (kun) va UserTenseRollup
+(hafta, oy) bitta tranzaksiyada.
+
+O'qish oynaga qarab:
+  days <= 7   — kunlik qatorlar (aniq)
+  days <= 92  — haftalik rollup (oyna boshi tushgan haftadan)
+  aks holda   — oylik rollup (oyna boshi tushgan oydan)
+Rollup oynani butun hafta / oyga kengaytiradi (ko'pi bilan 6 kun / 1 oy ortiq).
+"""
+from datetime import timedelta
+
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from .models import UserTenseRollup, UserTenseStats
+
+DAILY_MAX_DAYS = 7
+WEEKLY_MAX_DAYS = 92
+
+_UPSERT = """
+INSERT INTO {table} ({keys}, usage_count, correct_count{extra})
+VALUES {rows}
+ON CONFLICT ({keys}) DO UPDATE SET
+    usage_count = {table}.usage_count + excluded.usage_count,
+    correct_count = {table}.correct_count + excluded.correct_count{extra_set}
+"""
+
+_ACCURACY_SET = """,
+    accuracy = ROUND(CAST(100.0 * ({table}.correct_count + excluded.correct_count)
+                          / ({table}.usage_count + excluded.usage_count) AS NUMERIC), 1)"""
+
+
+def week_start(day):
+    return day - timedelta(days=day.weekday())
+
+
+def month_start(day):
+    return day.replace(day=1)
+
+
+def _clean(tense_data):
+    """{tense: (usage, correct)} — noto'g'ri / bo'sh yozuvlarsiz, bir xil nomlar qo'shilgan"""
+    counts = {}
+    for name, values in (tense_data or {}).items():
+        if not isinstance(values, dict):
+            continue
+        try:
+            usage = int(values.get('usage', 0))
+            correct = int(values.get('correct', 0))
+        except (TypeError, ValueError):
+            continue
+        name = str(name).strip()[:50]
+        if usage <= 0 or not name:
+            continue
+        correct = min(max(correct, 0), usage)
+        u, c = counts.get(name, (0, 0))
+        counts[name] = (u + usage, c + correct)
+    return counts
+
+
+def _upsert(cursor, model, keys, rows, accuracy=False):
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    width = len(rows[0])
+    sql = _UPSERT.format(
+        table=table,
+        keys=', '.join(qn(k) for k in keys),
+        extra=', accuracy' if accuracy else '',
+        extra_set=_ACCURACY_SET.format(table=table) if accuracy else '',
+        rows=', '.join(['(' + ', '.join(['%s'] * width) + ')'] * len(rows)),
+    )
+    cursor.execute(sql, [value for row in rows for value in row])
+
+
+def ingest(telegram_id, tense_data, day=None):
+    """Bot dan kelgan kunlik hisoblagichlar; yozilgan zamonlar soni"""
+    counts = _clean(tense_data)
+    if not counts:
+        return 0
+    day = day or timezone.now().date()
+    telegram_id = int(telegram_id)
+
+    daily = [
+        (telegram_id, day, name, usage, correct, round(correct / usage * 100, 1))
+        for name, (usage, correct) in counts.items()
+    ]
+    rollups = [
+        (telegram_id, period, start, name, usage, correct)
+        for period, start in (
+            (UserTenseRollup.WEEK, week_start(day)),
+            (UserTenseRollup.MONTH, month_start(day)),
+        )
+        for name, (usage, correct) in counts.items()
+    ]
+    with transaction.atomic(), connection.cursor() as cursor:
+        _upsert(cursor, UserTenseStats, ['telegram_id', 'date', 'tense_name'], daily, accuracy=True)
+        _upsert(cursor, UserTenseRollup, ['telegram_id', 'period', 'period_start', 'tense_name'], rollups)
+    return len(counts)
+
+
+# ─── O'qish ───────────────────────────────────────────────────────────────────
+
+def _window(telegram_ids, days, today):
+    """days oynasi uchun (telegram_id, tense_name, usage, correct) qatorlari queryset i"""
+    since = today - timedelta(days=max(days, 1) - 1)
+    if days <= DAILY_MAX_DAYS:
+        qs = UserTenseStats.objects.filter(telegram_id__in=telegram_ids, date__gte=since)
+    elif days <= WEEKLY_MAX_DAYS:
+        qs = UserTenseRollup.objects.filter(
+            telegram_id__in=telegram_ids, period=UserTenseRollup.WEEK,
+            period_start__gte=week_start(since),
+        )
+    else:
+        qs = UserTenseRollup.objects.filter(
+            telegram_id__in=telegram_ids, period=UserTenseRollup.MONTH,
+            period_start__gte=month_start(since),
+        )
+    return (
+        qs.order_by()
+        .values('telegram_id', 'tense_name')
+        .annotate(usage=Sum('usage_count'), correct=Sum('correct_count'))
+    )
+
+
+def _entry(usage, correct):
+    return {
+        'usage': usage,
+        'correct': correct,
+        'accuracy': round(correct / usage * 100) if usage > 0 else 0,
+    }
+
+
+def summary_many(telegram_ids, days=30, today=None):
+    """{telegram_id: {tense: {usage, correct, accuracy}}} — bitta GROUP BY so'rov"""
+    ids = [int(t) for t in telegram_ids if t]
+    if not ids:
+        return {}
+    today = today or timezone.now().date()
+    result = {}
+    for row in _window(ids, days, today):
+        if row['usage']:
+            result.setdefault(row['telegram_id'], {})[row['tense_name']] = _entry(
+                row['usage'], row['correct'],
+            )
+    return result
+
+
+def summary(telegram_id, days=30, today=None):
+    """days=1 — bugun; 30 — oxirgi 30 kun (haftalik rollup)"""
+    if not telegram_id:
+        return {}
+    return summary_many([telegram_id], days, today).get(int(telegram_id), {})
@@ -4,9 +4,11 @@ from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
+from django.db.models import Avg, Count, Q
 from django.utils import timezone
 from django.conf import settings
-from .models import User, BotActivity, UserTenseStats
+from .models import User, BotActivity, SessionScore
+from . import scores, tense_stats
 from .serializers import RegisterSerializer, LoginSerializer, UserSerializer, UserUpdateSerializer
 
 
@@ -80,11 +82,11 @@ class StatisticsView(APIView):
         from ielts_mock.models import IELTSSession
         from cefr_mock.models import CEFRSession
 
-        ratings = user.received_ratings.all()
-        avg_rating = round(sum(r.rating for r in ratings) / ratings.count(), 1) if ratings.exists() else None
+        avg_rating = user.received_ratings.aggregate(avg=Avg('rating'))['avg']
+        avg_rating = round(avg_rating, 1) if avg_rating is not None else None
 
-        ielts_sessions = IELTSSession.objects.filter(user=user, is_completed=True).order_by('ended_at')
-        cefr_sessions = CEFRSession.objects.filter(user=user, is_completed=True).order_by('ended_at')
+        ielts_sessions = list(IELTSSession.objects.filter(user=user, is_completed=True).order_by('ended_at'))
+        cefr_sessions = list(CEFRSession.objects.filter(user=user, is_completed=True).order_by('ended_at'))
 
         ielts_history = [
             {"band": s.overall_band, "date": s.ended_at.strftime('%d.%m') if s.ended_at else "—"}
@@ -109,8 +111,8 @@ class StatisticsView(APIView):
             if first and last:
                 cefr_improvement = last - first
 
-        last_ielts = ielts_sessions.last()
-        last_cefr = cefr_sessions.last()
+        last_ielts = ielts_sessions[-1] if ielts_sessions else None
+        last_cefr = cefr_sessions[-1] if cefr_sessions else None
 
         return Response({
             'chat_count': user.chat_count,
@@ -151,13 +153,16 @@ class BotActivityLogView(APIView):
         username = request.data.get("username", "")
         activity_type = request.data.get("activity_type", "")
 
-        BotActivity.objects.create(
+        activity = BotActivity.objects.create(
             telegram_id=telegram_id,
             full_name=full_name,
             username=username,
             activity_type=activity_type,
             data=request.data.get("data", {}),
         )
+        if activity_type in ("ielts_mock", "cefr_mock"):
+            user_id = User.objects.filter(telegram_id=telegram_id).values_list("id", flat=True).first()
+            scores.record_bot(activity, user_id)
 
         # /start bosganida DRF User modelida ham yarat yoki yangilang
         if activity_type == "start":
@@ -211,41 +216,41 @@ class BotStatisticsView(APIView):
         if not telegram_id:
             return Response({"error": "telegram_id required"}, status=400)
 
-        today = timezone.now().date()
-
-        ielts_acts = list(BotActivity.objects.filter(
-            telegram_id=telegram_id, activity_type="ielts_mock"
-        ).order_by("created_at"))
-
-        cefr_acts = list(BotActivity.objects.filter(
-            telegram_id=telegram_id, activity_type="cefr_mock"
-        ).order_by("created_at"))
+        mocks = BotActivity.objects.filter(
+            telegram_id=telegram_id, activity_type__in=["ielts_mock", "cefr_mock"]
+        )
+        day_start = timezone.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        counts = {
+            row["activity_type"]: row
+            for row in mocks.order_by().values("activity_type").annotate(
+                total=Count("id"), today=Count("id", filter=Q(created_at__gte=day_start)),
+            )
+        }
+        ielts_counts = counts.get("ielts_mock", {})
+        cefr_counts = counts.get("cefr_mock", {})
 
         ai_acts = BotActivity.objects.filter(
             telegram_id=telegram_id, activity_type="ai_chat"
         ).count()
 
-        # ─── IELTS tarixi ───────────────────────────────────
-        ielts_history = []
-        for a in ielts_acts:
-            band = a.data.get("band") or a.data.get("overall_band")
-            if band:
-                ielts_history.append({
-                    "band": float(band),
-                    "date": a.created_at.strftime('%d.%m'),
-                    "sub_scores": a.data.get("sub_scores", {}),
-                })
-
-        # ─── CEFR tarixi ────────────────────────────────────
-        cefr_history = []
-        for a in cefr_acts:
-            score = a.data.get("score")
-            if score:
-                cefr_history.append({
-                    "score": int(score),
-                    "level": a.data.get("level", "—"),
-                    "date": a.created_at.strftime('%d.%m'),
-                })
+        # ─── IELTS / CEFR tarixi (SessionScore) ─────────────
+        bot_scores = {"telegram_id": telegram_id, "source": SessionScore.BOT}
+        ielts_history = [
+            {
+                "band": h["overall"],
+                "date": h["started_at"].strftime('%d.%m'),
+                "sub_scores": {k: h[k] for k in scores.IELTS_SUBS if h[k]},
+            }
+            for h in scores.series(SessionScore.IELTS, scores.IELTS_SUBS, **bot_scores)
+        ]
+        cefr_history = [
+            {
+                "score": int(h["overall"]),
+                "level": h["level"] or "—",
+                "date": h["started_at"].strftime('%d.%m'),
+            }
+            for h in scores.series(SessionScore.CEFR, (), **bot_scores)
+        ]
 
         # ─── IELTS o'sish ───────────────────────────────────
         ielts_improvement = None
@@ -257,30 +262,23 @@ class BotStatisticsView(APIView):
         if len(cefr_history) >= 2:
             cefr_improvement = cefr_history[-1]['score'] - cefr_history[0]['score']
 
-        # ─── IELTS zaif qismlar (sub-scores o'rtacha) ───────
+        # ─── IELTS zaif qismlar (sub-scores o'rtacha, SQL AVG) ──
         weak_areas = []
-        if ielts_history:
-            totals = {'fluency': [], 'lexical': [], 'grammar': [], 'pronunciation': []}
-            for h in ielts_history:
-                for k in totals:
-                    v = h['sub_scores'].get(k)
-                    if v:
-                        totals[k].append(float(v))
-            avgs = {k: round(sum(v) / len(v), 1) for k, v in totals.items() if v}
-            if avgs:
-                sorted_areas = sorted(avgs.items(), key=lambda x: x[1])
-                labels = {
-                    'fluency': 'Fluency & Coherence',
-                    'lexical': 'Lexical Resource',
-                    'grammar': 'Grammatical Range',
-                    'pronunciation': 'Pronunciation',
-                }
-                for name, score in sorted_areas[:2]:
-                    weak_areas.append({'skill': labels.get(name, name), 'avg': score})
+        avgs = scores.averages(SessionScore.IELTS, scores.IELTS_SUBS, **bot_scores)
+        if avgs:
+            sorted_areas = sorted(avgs.items(), key=lambda x: x[1])
+            labels = {
+                'fluency': 'Fluency & Coherence',
+                'lexical': 'Lexical Resource',
+                'grammar': 'Grammatical Range',
+                'pronunciation': 'Pronunciation',
+            }
+            for name, score in sorted_areas[:2]:
+                weak_areas.append({'skill': labels.get(name, name), 'avg': round(score, 1)})
 
         # ─── Bugun qilingan mocklar ──────────────────────────
-        today_ielts = sum(1 for a in ielts_acts if a.created_at.date() == today)
-        today_cefr = sum(1 for a in cefr_acts if a.created_at.date() == today)
+        today_ielts = ielts_counts.get("today", 0)
+        today_cefr = cefr_counts.get("today", 0)
 
         # ─── So'z chastotasi tahlili ─────────────────────────
         STOP = {
@@ -292,9 +290,9 @@ class BotStatisticsView(APIView):
             'because','really','things','dont','cant','said','want','need','going',
         }
         all_words = []
-        for act in ielts_acts + cefr_acts:
-            for t in act.data.get("transcripts", []):
-                if t:
+        for transcripts in mocks.values_list("data__transcripts", flat=True):
+            for t in transcripts if isinstance(transcripts, list) else []:
+                if isinstance(t, str) and t:
                     words = re.findall(r'\b[a-zA-Z]{4,}\b', t.lower())
                     all_words.extend(w for w in words if w not in STOP)
 
@@ -311,9 +309,9 @@ class BotStatisticsView(APIView):
             pass
 
         return Response({
-            "total_mocks": len(ielts_acts) + len(cefr_acts),
-            "total_ielts": len(ielts_acts),
-            "total_cefr": len(cefr_acts),
+            "total_mocks": ielts_counts.get("total", 0) + cefr_counts.get("total", 0),
+            "total_ielts": ielts_counts.get("total", 0),
+            "total_cefr": cefr_counts.get("total", 0),
             "total_ai_chats": ai_acts,
             "today_ielts": today_ielts,
             "today_cefr": today_cefr,
@@ -350,23 +348,10 @@ class TenseSyncView(APIView):
         if not tense_data:
             return Response({"status": "no data"})
 
-        today = timezone.now().date()
-        for tense_name, counts in tense_data.items():
-            usage = counts.get("usage", 0)
-            correct = counts.get("correct", 0)
-            if usage <= 0:
-                continue
-            obj, created = UserTenseStats.objects.get_or_create(
-                telegram_id=telegram_id,
-                date=today,
-                tense_name=tense_name,
-                defaults={"usage_count": usage, "correct_count": correct},
-            )
-            if not created:
-                obj.usage_count += usage
-                obj.correct_count += correct
-            obj.accuracy = round(obj.correct_count / obj.usage_count * 100, 1) if obj.usage_count > 0 else 0
-            obj.save()
+        try:
+            tense_stats.ingest(telegram_id, tense_data)
+        except (TypeError, ValueError):
+            return Response({"error": "invalid data"}, status=400)
 
         return Response({"status": "synced"})
 
@@ -381,20 +366,7 @@ class TenseSyncView(APIView):
         if not telegram_id:
             return Response({"error": "telegram_id required"}, status=400)
 
-        from datetime import timedelta
-        start = timezone.now().date() - timedelta(days=days)
-        stats = UserTenseStats.objects.filter(telegram_id=telegram_id, date__gte=start)
-
-        summary = {}
-        for s in stats:
-            if s.tense_name not in summary:
-                summary[s.tense_name] = {"usage": 0, "correct": 0}
-            summary[s.tense_name]["usage"] += s.usage_count
-            summary[s.tense_name]["correct"] += s.correct_count
-
-        for tense in summary:
-            u = summary[tense]["usage"]
-            summary[tense]["accuracy"] = round(summary[tense]["correct"] / u * 100) if u > 0 else 0
+        summary = tense_stats.summary(telegram_id, days=days)
 
         return Response({"tense_stats": summary})
 
@@ -404,33 +376,13 @@ class UserTenseStatsView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from datetime import timedelta
-        user = request.user
-        telegram_id = user.telegram_id
+        telegram_id = request.user.telegram_id
         if not telegram_id:
             return Response({"today": {}, "monthly": {}})
 
-        today = timezone.now().date()
-        month_start = today - timedelta(days=30)
-
-        today_stats = UserTenseStats.objects.filter(telegram_id=telegram_id, date=today)
-        monthly_stats = UserTenseStats.objects.filter(telegram_id=telegram_id, date__gte=month_start)
-
-        def aggregate(qs):
-            result = {}
-            for s in qs:
-                if s.tense_name not in result:
-                    result[s.tense_name] = {"usage": 0, "correct": 0}
-                result[s.tense_name]["usage"] += s.usage_count
-                result[s.tense_name]["correct"] += s.correct_count
-            for tense in result:
-                u = result[tense]["usage"]
-                result[tense]["accuracy"] = round(result[tense]["correct"] / u * 100) if u > 0 else 0
-            return result
-
         return Response({
-            "today": aggregate(today_stats),
-            "monthly": aggregate(monthly_stats),
+            "today": tense_stats.summary(telegram_id, days=1),
+            "monthly": tense_stats.summary(telegram_id, days=30),
         })
 
 
@@ -439,9 +391,8 @@ class MyAnalysisView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        from datetime import timedelta
         import os
-        from openai import OpenAI
+        from config.ai_clients import openai_client
         from ielts_mock.models import IELTSSession
         from cefr_mock.models import CEFRSession
 
@@ -451,27 +402,9 @@ class MyAnalysisView(APIView):
             return Response({"analysis": "", "weak_tenses": [], "recommendations": [],
                              "ielts_summary": {}, "cefr_summary": {}})
 
-        today = timezone.now().date()
-        month_start = today - timedelta(days=30)
-
         # ── Tense statistikalar ──────────────────────────────────────────────
-        monthly_stats = UserTenseStats.objects.filter(telegram_id=telegram_id, date__gte=month_start)
-        today_stats   = UserTenseStats.objects.filter(telegram_id=telegram_id, date=today)
-
-        def aggregate(qs):
-            result = {}
-            for s in qs:
-                if s.tense_name not in result:
-                    result[s.tense_name] = {"usage": 0, "correct": 0}
-                result[s.tense_name]["usage"]   += s.usage_count
-                result[s.tense_name]["correct"] += s.correct_count
-            for tense in result:
-                u = result[tense]["usage"]
-                result[tense]["accuracy"] = round(result[tense]["correct"] / u * 100) if u > 0 else 0
-            return result
-
-        monthly    = aggregate(monthly_stats)
-        today_data = aggregate(today_stats)
+        monthly    = tense_stats.summary(telegram_id, days=30)
+        today_data = tense_stats.summary(telegram_id, days=1)
 
         weak_tenses = [
             {"tense": t, "accuracy": v["accuracy"], "usage": v["usage"]}
@@ -606,8 +539,7 @@ class MyAnalysisView(APIView):
                     "3. Three actionable recommendations (numbered)\n"
                     "Be encouraging but honest. Keep total response under 150 words."
                 )
-                oai  = OpenAI(api_key=openai_key)
-                resp = oai.chat.completions.create(
+                resp = openai_client().chat.completions.create(
                     model="gpt-4o-mini",
                     messages=[
                         {"role": "system", "content": "You are a professional English speaking coach."},
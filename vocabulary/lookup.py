@@ -0,0 +1,329 @@
+"""
+So'z qidirish (LookupWordView) — cache, negative cache, single-flight.
+
+    status, payload = lookup.lookup("Eloquent")
+
+1. normalize_word → key; yaroqsiz matn (raqam, belgi, juda uzun) → 'invalid'
+2. Process LRU (MEMORY_TTL) → Redis vocab:word:<key> → DB (Word.key unique index)
+3. vocab:neg:<key> — yaqinda "bunday so'z yo'q" deb topilgan (NEGATIVE_TTL)
+4. Miss: vocab:lock:<key> (SET NX) olgan bitta worker gpt-4o-mini dan so'raydi,
+   qolganlari cache / lock bo'shashini kutadi — bir so'z uchun bitta generatsiya.
+   Redis bo'lmasa process ichidagi lock; DB da get_or_create(key=...) dublikatdan himoya.
+
+Payload — WordSerializer maydonlari (is_saved siz, u foydalanuvchiga bog'liq).
+Word saqlanganda / o'chirilganda cache tozalanadi (vocabulary.signals).
+"""
+import json
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from django.db import IntegrityError
+
+from config.redis_client import get_redis, mark_down
+from .models import Word, normalize_word
+
+logger = logging.getLogger(__name__)
+
+WORD_TTL = 60 * 60 * 24
+NEGATIVE_TTL = 60 * 10
+LOCK_TTL = 30
+WAIT_TIMEOUT = 20
+WAIT_STEP = 0.2
+MEMORY_SIZE = 2000
+MEMORY_TTL = 60         # boshqa process lardagi tahrirlar shu vaqtda ko'rinadi
+
+VALID_LEVELS = {'A1', 'A2', 'B1', 'B2', 'C1', 'C2'}
+WORD_RE = re.compile(r"^[a-z](?:[a-z' -]{0,48}[a-z])?$")
+
+OK = 'ok'
+INVALID = 'invalid'
+NOT_FOUND = 'not_found'
+BUSY = 'busy'
+ERROR = 'error'
+
+_memory = OrderedDict()
+_memory_lock = threading.Lock()
+_local_locks = {}       # key → [Lock, shu lock ni ushlab / kutib turganlar soni]
+_local_locks_guard = threading.Lock()
+
+
+def _word_key(key):
+    return f'vocab:word:{key}'
+
+
+def _neg_key(key):
+    return f'vocab:neg:{key}'
+
+
+def _lock_key(key):
+    return f'vocab:lock:{key}'
+
+
+def payload(word):
+    return {
+        'id': word.id,
+        'word': word.word,
+        'level': word.level,
+        'definition': word.definition,
+        'translation_uz': word.translation_uz,
+        'examples': word.examples if isinstance(word.examples, list) else [],
+    }
+
+
+# ─── Cache qatlamlari ─────────────────────────────────────────────────────────
+
+def _memory_get(key):
+    with _memory_lock:
+        entry = _memory.get(key)
+        if entry is None:
+            return None
+        expires, value = entry
+        if expires < time.monotonic():
+            del _memory[key]
+            return None
+        _memory.move_to_end(key)
+        return value
+
+
+def _memory_put(key, value):
+    with _memory_lock:
+        _memory[key] = (time.monotonic() + MEMORY_TTL, value)
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_SIZE:
+            _memory.popitem(last=False)
+
+
+def _cache_get(r, key):
+    """→ payload | NOT_FOUND | None"""
+    value = _memory_get(key)
+    if value is not None:
+        return value
+    if r is None:
+        return None
+    try:
+        raw, negative = r.mget(_word_key(key), _neg_key(key))
+    except Exception as e:
+        logger.warning(f"[vocab] cache error: {e}")
+        mark_down()
+        return None
+    if raw:
+        value = json.loads(raw)
+        _memory_put(key, value)
+        return value
+    if negative:
+        return NOT_FOUND
+    return None
+
+
+def _cache_put(r, key, value):
+    _memory_put(key, value)
+    if r is None:
+        return
+    try:
+        r.set(_word_key(key), json.dumps(value, ensure_ascii=False), ex=WORD_TTL)
+    except Exception as e:
+        logger.warning(f"[vocab] cache set error: {e}")
+        mark_down()
+
+
+def _negative_put(r, key):
+    if r is None:
+        return
+    try:
+        r.set(_neg_key(key), 1, ex=NEGATIVE_TTL)
+    except Exception as e:
+        logger.warning(f"[vocab] negative set error: {e}")
+        mark_down()
+
+
+def invalidate(*keys):
+    """Word o'zgarganda — shu process da va Redis da"""
+    with _memory_lock:
+        for key in keys:
+            _memory.pop(key, None)
+    r = get_redis()
+    if r is None or not keys:
+        return
+    try:
+        r.delete(*[_word_key(k) for k in keys], *[_neg_key(k) for k in keys])
+    except Exception as e:
+        logger.warning(f"[vocab] invalidate error: {e}")
+        mark_down()
+
+
+# ─── Generatsiya ──────────────────────────────────────────────────────────────
+
+def _prompt(words):
+    listed = ', '.join(f'"{w}"' for w in words)
+    return f"""For each of these words: {listed}
+return JSON {{"words": [...]}} with one object per word, in the same order:
+{{
+  "word": "the word",
+  "level": "B2",
+  "definition": "Clear English definition",
+  "translation_uz": "O'zbekcha tarjima",
+  "examples": [
+    "Academic example sentence 1 using the word.",
+    "Academic example sentence 2 using the word.",
+    "Academic example sentence 3 using the word.",
+    "Academic example sentence 4 using the word.",
+    "Academic example sentence 5 using the word."
+  ]
+}}
+Level must be one of: A1, A2, B1, B2, C1, C2.
+If an item is not a real English word or phrase, return {{"word": "<item>", "invalid": true}} for it."""
+
+
+def generate_many(words):
+    """gpt-4o-mini → {key: dict | None}; None — so'z emas"""
+    from config.ai_clients import openai_client
+
+    resp = openai_client().chat.completions.create(
+        model="gpt-4o-mini",
+        messages=[
+            {"role": "system", "content": "You are an English dictionary and vocabulary expert."},
+            {"role": "user", "content": _prompt(words)},
+        ],
+        response_format={"type": "json_object"},
+        max_tokens=600 * len(words),
+    )
+    items = json.loads(resp.choices[0].message.content).get('words') or []
+    result = {normalize_word(w): None for w in words}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        key = normalize_word(item.get('word'))
+        if key not in result or item.get('invalid') or not item.get('definition'):
+            continue
+        level = str(item.get('level', '')).upper()
+        result[key] = {
+            'word': key,
+            'level': level if level in VALID_LEVELS else 'B1',
+            'definition': item.get('definition', ''),
+            'translation_uz': item.get('translation_uz', ''),
+            'examples': item.get('examples') if isinstance(item.get('examples'), list) else [],
+        }
+    return result
+
+
+def _store(key, data):
+    """get_or_create(key) — parallel yozuvda IntegrityError o'rniga mavjud qator"""
+    try:
+        word, _ = Word.objects.get_or_create(key=key, defaults={**data, 'word': key})
+    except IntegrityError:
+        word = Word.objects.get(key=key)
+    return word
+
+
+# ─── Single-flight ────────────────────────────────────────────────────────────
+
+@contextmanager
+def _local_lock(key):
+    """Process ichidagi kalit lock i; oxirgi kutuvchi chiqqandagina map dan o'chiriladi"""
+    with _local_locks_guard:
+        entry = _local_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _local_locks_guard:
+            entry[1] -= 1
+            if not entry[1]:
+                _local_locks.pop(key, None)
+
+
+def _acquire(r, key):
+    if r is None:
+        return None
+    try:
+        return bool(r.set(_lock_key(key), 1, nx=True, ex=LOCK_TTL))
+    except Exception as e:
+        logger.warning(f"[vocab] lock error: {e}")
+        mark_down()
+        return None
+
+
+def _release(r, key):
+    try:
+        r.delete(_lock_key(key))
+    except Exception as e:
+        logger.warning(f"[vocab] unlock error: {e}")
+
+
+def _wait(r, key):
+    """Boshqa worker generatsiya qilayotgan so'zni kutish"""
+    deadline = time.monotonic() + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(WAIT_STEP)
+        value = _cache_get(r, key)
+        if value is not None:
+            return value
+        try:
+            if not r.exists(_lock_key(key)):
+                break
+        except Exception:
+            break
+    word = Word.objects.filter(key=key).first()
+    if word is not None:
+        value = payload(word)
+        _cache_put(r, key, value)
+        return value
+    return _cache_get(r, key) or BUSY
+
+
+def _generate(r, key):
+    try:
+        data = generate_many([key])[key]
+    except Exception as e:
+        logger.warning(f"[vocab] generate '{key}' error: {e}")
+        return ERROR
+    if data is None:
+        _negative_put(r, key)
+        return NOT_FOUND
+    value = payload(_store(key, data))
+    _cache_put(r, key, value)
+    return value
+
+
+def _fill(r, key):
+    """Cache miss: DB, keyin bitta generatsiya"""
+    word = Word.objects.filter(key=key).first()
+    if word is not None:
+        value = payload(word)
+        _cache_put(r, key, value)
+        return value
+
+    acquired = _acquire(r, key)
+    if acquired is False:
+        return _wait(r, key)
+    if acquired is None:
+        # Redis yo'q — hech bo'lmasa shu process ichida bitta generatsiya
+        with _local_lock(key):
+            word = Word.objects.filter(key=key).first()
+            if word is not None:
+                return payload(word)
+            return _generate(None, key)
+    try:
+        return _generate(r, key)
+    finally:
+        _release(r, key)
+
+
+def lookup(text):
+    """→ (status, payload | None)"""
+    key = normalize_word(text)
+    if not key or not WORD_RE.match(key):
+        return INVALID, None
+
+    r = get_redis()
+    value = _cache_get(r, key)
+    if value is None:
+        value = _fill(r, key)
+    if isinstance(value, dict):
+        return OK, value
+    return value, None
@@ -0,0 +1,93 @@
+"""
+So'zlar ro'yxatidan Word larni oldindan yaratish (LookupWordView da kutish bo'lmasin).
+
+    python manage.py pregenerate_words words.txt
+    python manage.py pregenerate_words words.json --batch-size 20 --workers 4
+
+Fayl: har qatorda bitta so'z yoki JSON ro'yxat (["word", ...] / [{"word": ...}, ...]).
+Bazada bor so'zlar (Word.key) o'tkazib yuboriladi; qolganlari batch larda
+(bitta so'rovda --batch-size ta so'z) parallel generatsiya qilinib, bulk_create bilan yoziladi.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Ro'yxatdagi yangi so'zlar uchun AI bilan Word yaratadi (batch, parallel)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="So'zlar fayli (.txt yoki .json)")
+        parser.add_argument('--batch-size', type=int, default=10, help="Bitta AI so'rovidagi so'zlar soni")
+        parser.add_argument('--workers', type=int, default=4, help="Parallel so'rovlar soni")
+        parser.add_argument('--dry-run', action='store_true', help="Faqat nechta yangi so'z borligini ko'rsatish")
+
+    def handle(self, *args, **options):
+        from vocabulary import lookup, sampling
+        from vocabulary.models import Word, normalize_word
+
+        keys = []
+        seen = set()
+        invalid = 0
+        for raw in self._read(options['path']):
+            key = normalize_word(raw)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            if not lookup.WORD_RE.match(key):
+                invalid += 1
+                continue
+            keys.append(key)
+
+        existing = set()
+        for i in range(0, len(keys), 1000):
+            existing.update(Word.objects.filter(key__in=keys[i:i + 1000]).values_list('key', flat=True))
+        missing = [k for k in keys if k not in existing]
+        self.stdout.write(
+            f"  {len(keys)} ta so'z: {len(existing)} ta bazada bor, {len(missing)} ta yangi, {invalid} ta yaroqsiz"
+        )
+        if options['dry_run'] or not missing:
+            return
+
+        size = max(1, options['batch_size'])
+        batches = [missing[i:i + size] for i in range(0, len(missing), size)]
+        created = rejected = failed = 0
+        with ThreadPoolExecutor(max_workers=max(1, options['workers'])) as pool:
+            futures = {pool.submit(lookup.generate_many, batch): batch for batch in batches}
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    failed += len(batch)
+                    self.stderr.write(f"  AI xato ({batch[0]}…): {e}")
+                    continue
+                rows = [
+                    Word(key=key, **{**data, 'word': key})
+                    for key, data in result.items() if data is not None
+                ]
+                rejected += len(result) - len(rows)
+                Word.objects.bulk_create(rows, ignore_conflicts=True)
+                created += len(rows)
+                lookup.invalidate(*result)
+                sampling.invalidate(*{w.level for w in rows})
+                self.stdout.write(f"  +{len(rows)} ({created}/{len(missing)})")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {created} ta so'z yaratildi, {rejected} ta so'z emas, {failed} ta xato"
+        ))
+
+    def _read(self, path):
+        try:
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+        except OSError as e:
+            raise CommandError(f"Faylni o'qib bo'lmadi: {e}")
+        if path.endswith('.json'):
+            try:
+                items = json.loads(text)
+            except ValueError as e:
+                raise CommandError(f"JSON xato: {e}")
+            return [i.get('word', '') if isinstance(i, dict) else str(i) for i in items]
+        return text.splitlines()
@@ -0,0 +1,41 @@
+from django.db import migrations, models
+
+
+def fill_keys(apps, schema_editor):
+    """Mavjud so'zlar uchun key; faqat harf registri farq qiladigan dublikatlarga #id qo'shiladi"""
+    Word = apps.get_model('vocabulary', 'Word')
+    seen = set()
+    batch = []
+    for word in Word.objects.order_by('id').only('id', 'word').iterator(chunk_size=2000):
+        key = ' '.join((word.word or '').split()).lower()
+        if key in seen:
+            key = f'{key}#{word.id}'[:100]
+        seen.add(key)
+        word.key = key
+        batch.append(word)
+        if len(batch) >= 2000:
+            Word.objects.bulk_update(batch, ['key'])
+            batch = []
+    if batch:
+        Word.objects.bulk_update(batch, ['key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('vocabulary', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='word',
+            name='key',
+            field=models.CharField(editable=False, max_length=100, null=True),
+        ),
+        migrations.RunPython(fill_keys, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='word',
+            name='key',
+            field=models.CharField(editable=False, max_length=100, unique=True),
+        ),
+    ]
@@ -2,6 +2,11 @@ from django.db import models
 from django.conf import settings
 
 
+def normalize_word(text):
+    """Qidiruv kaliti: bo'shliqlar yig'ilgan, kichik harf"""
+    return ' '.join((text or '').split()).lower()
+
+
 class Word(models.Model):
     LEVEL_CHOICES = [
         ('A1', 'A1'), ('A2', 'A2'), ('B1', 'B1'),
@@ -9,6 +14,8 @@ class Word(models.Model):
     ]
 
     word = models.CharField(max_length=100, unique=True)
+    # normalize_word(word) — word__iexact o'rniga indeksli qidiruv (vocabulary.lookup)
+    key = models.CharField(max_length=100, unique=True, editable=False)
     level = models.CharField(max_length=2, choices=LEVEL_CHOICES)
     definition = models.TextField()
     translation_uz = models.TextField(blank=True)
@@ -23,6 +30,26 @@ class Word(models.Model):
     def __str__(self):
         return f"[{self.level}] {self.word}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # so'z o'zgartirilsa eski key ning cache i ham tozalanadi (vocabulary.signals)
+        instance._key_was = instance.__dict__.get('key')
+        # daraja o'zgarsa ikkala darajaning id ro'yxati yangilanadi (vocabulary.sampling)
+        instance._level_was = instance.__dict__.get('level')
+        return instance
+
+    def save(self, *args, **kwargs):
+        key = normalize_word(self.word)
+        if self.pk and key != self.key and Word.objects.filter(key=key).exclude(pk=self.pk).exists():
+            # Kalit boshqa so'zda ("Run" / "run") — 0002 migratsiyadagi kabi #id qo'shimchasi
+            key = f'{key}#{self.pk}'[:100]
+        self.key = key
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'word' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'key'}
+        super().save(*args, **kwargs)
+
 
 class UserWord(models.Model):
     user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='saved_words')
@@ -0,0 +1,150 @@
+"""
+Darajadan tasodifiy so'zlar — ORDER BY RANDOM() o'rniga.
+
+    words = sampling.sample('B1', 10, owner=f'user:{user.id}')
+
+1. Darajadagi barcha Word id lari — process xotirasi (MEMORY_TTL) → Redis vocab:ids:<level>
+   → DB (values_list, bitta marta). So'z qo'shilganda / darajasi o'zgarganda /
+   o'chirilganda tozalanadi (vocabulary.signals).
+2. random.sample bilan id tanlanadi, so'zlar bitta id__in so'rovi bilan olinadi.
+3. owner berilsa — vocab:seen:<owner>:<level> (Redis set) da yaqinda ko'rsatilgan
+   id lar; ular keyingi raundda chiqmaydi. Yangi so'z qolmasa (yoki set RECENT_MAX dan
+   oshsa) set tozalanadi va aylana qaytadan boshlanadi.
+"""
+import json
+import logging
+import random
+import threading
+import time
+
+from config.redis_client import get_redis, mark_down
+from .models import Word
+
+logger = logging.getLogger(__name__)
+
+IDS_TTL = 60 * 60 * 6
+MEMORY_TTL = 60         # boshqa process lardagi o'zgarishlar shu vaqtda ko'rinadi
+RECENT_TTL = 60 * 60 * 24
+RECENT_MAX = 300
+
+LEVELS = frozenset(code for code, _ in Word.LEVEL_CHOICES)
+
+_memory = {}            # faqat LEVELS — so'rovdagi ixtiyoriy qiymat xotirani o'stirmasin
+_memory_lock = threading.Lock()
+
+
+def _ids_key(level):
+    return f'vocab:ids:{level}'
+
+
+def _seen_key(owner, level):
+    return f'vocab:seen:{owner}:{level}'
+
+
+# ─── Daraja id lari ───────────────────────────────────────────────────────────
+
+def level_ids(level):
+    if level not in LEVELS:
+        return []
+    with _memory_lock:
+        entry = _memory.get(level)
+    if entry is not None and entry[0] > time.monotonic():
+        return entry[1]
+
+    ids = None
+    r = get_redis()
+    if r is not None:
+        try:
+            raw = r.get(_ids_key(level))
+            if raw:
+                ids = json.loads(raw)
+        except Exception as e:
+            logger.warning(f"[vocab] ids cache error: {e}")
+            mark_down()
+            r = None
+
+    if ids is None:
+        ids = list(Word.objects.filter(level=level).values_list('id', flat=True))
+        if r is not None:
+            try:
+                r.set(_ids_key(level), json.dumps(ids), ex=IDS_TTL)
+            except Exception as e:
+                logger.warning(f"[vocab] ids cache set error: {e}")
+                mark_down()
+
+    with _memory_lock:
+        _memory[level] = (time.monotonic() + MEMORY_TTL, ids)
+    return ids
+
+
+def invalidate(*levels):
+    """Darajaga so'z qo'shilganda / chiqqanda"""
+    levels = [lv for lv in levels if lv]
+    with _memory_lock:
+        for level in levels:
+            _memory.pop(level, None)
+    r = get_redis()
+    if r is None or not levels:
+        return
+    try:
+        r.delete(*[_ids_key(lv) for lv in levels])
+    except Exception as e:
+        logger.warning(f"[vocab] ids invalidate error: {e}")
+        mark_down()
+
+
+# ─── Yaqinda ko'rsatilganlar ──────────────────────────────────────────────────
+
+def _recent(r, owner, level):
+    try:
+        return {int(i) for i in r.smembers(_seen_key(owner, level))}
+    except Exception as e:
+        logger.warning(f"[vocab] seen read error: {e}")
+        mark_down()
+        return set()
+
+
+def _remember(r, owner, level, ids, reset):
+    key = _seen_key(owner, level)
+    try:
+        with r.pipeline(transaction=False) as pipe:
+            if reset:
+                pipe.delete(key)
+            pipe.sadd(key, *ids)
+            pipe.expire(key, RECENT_TTL)
+            pipe.execute()
+    except Exception as e:
+        logger.warning(f"[vocab] seen write error: {e}")
+        mark_down()
+
+
+# ─── Tanlash ──────────────────────────────────────────────────────────────────
+
+def sample(level, n, owner=None):
+    """Darajadan n ta tasodifiy Word (owner — takrorlanmaslik uchun kalit)"""
+    ids = level_ids(level)
+    if not ids:
+        return []
+
+    r = get_redis() if owner else None
+    candidates = ids
+    reset = False
+    if r is not None:
+        recent = _recent(r, owner, level)
+        if recent:
+            fresh = [i for i in ids if i not in recent]
+            if len(fresh) >= n and len(recent) < RECENT_MAX:
+                candidates = fresh
+            else:
+                reset = True
+
+    picked = random.sample(candidates, min(n, len(candidates)))
+    found = Word.objects.in_bulk(picked)
+    words = [found[i] for i in picked if i in found]
+    if len(words) < len(picked):
+        # Ro'yxat eskirgan (so'z o'chirilgan) — keyingi so'rovda DB dan qayta olinadi
+        invalidate(level)
+
+    if r is not None and words:
+        _remember(r, owner, level, [w.id for w in words], reset)
+    return words
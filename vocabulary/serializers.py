@@ -11,9 +11,14 @@ class WordSerializer(serializers.ModelSerializer):
 
     def get_is_saved(self, obj):
         request = self.context.get("request")
-        if request and request.user.is_authenticated:
-            return UserWord.objects.filter(user=request.user, word=obj).exists()
-        return False
+        if not (request and request.user.is_authenticated):
+            return False
+        # Ro'yxat uchun bitta so'rov — context butun (many=True) serializer uchun umumiy
+        if "saved_word_ids" not in self.context:
+            self.context["saved_word_ids"] = set(
+                UserWord.objects.filter(user=request.user).values_list("word_id", flat=True)
+            )
+        return obj.id in self.context["saved_word_ids"]
 
 
 class UserWordSerializer(serializers.ModelSerializer):
@@ -0,0 +1,40 @@
+"""
+Word o'zgarganda vocabulary.lookup va vocabulary.sampling cache larini tozalash.
+"""
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Word
+
+
+def _invalidate(instance):
+    from . import lookup
+
+    keys = {k for k in (instance.key, getattr(instance, '_key_was', None)) if k}
+    if keys:
+        transaction.on_commit(lambda: lookup.invalidate(*keys))
+
+
+def _invalidate_levels(*levels):
+    from . import sampling
+
+    levels = {lv for lv in levels if lv}
+    if levels:
+        transaction.on_commit(lambda: sampling.invalidate(*levels))
+
+
+@receiver(post_save, sender=Word)
+def word_saved(sender, instance, created, **kwargs):
+    _invalidate(instance)
+    level_was = getattr(instance, '_level_was', None)
+    if created or level_was != instance.level:
+        _invalidate_levels(instance.level, level_was)
+    instance._key_was = instance.key
+    instance._level_was = instance.level
+
+
+@receiver(post_delete, sender=Word)
+def word_deleted(sender, instance, **kwargs):
+    _invalidate(instance)
+    _invalidate_levels(instance.level)
@@ -1,15 +1,11 @@
-import json
 from rest_framework import generics, status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from django.conf import settings
-from openai import OpenAI
+from . import lookup, sampling
 from .models import Word, UserWord
 from .serializers import WordSerializer, UserWordSerializer
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
-
 
 class WordListView(generics.ListAPIView):
     serializer_class = WordSerializer
@@ -29,6 +25,7 @@ class WordListView(generics.ListAPIView):
 
 
 class LookupWordView(APIView):
+    """Word.key indeksi + cache; yangi so'z uchun bitta generatsiya (vocabulary.lookup)"""
     permission_classes = [IsAuthenticated]
 
     def post(self, request):
@@ -36,42 +33,19 @@ class LookupWordView(APIView):
         if not word_text:
             return Response({"error": "Word required"}, status=400)
 
-        existing = Word.objects.filter(word__iexact=word_text).first()
-        if existing:
-            return Response(WordSerializer(existing, context={"request": request}).data)
-
-        resp = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": "You are an English dictionary and vocabulary expert."},
-                {"role": "user", "content": f"""For the word "{word_text}", return JSON:
-{{
-  "word": "{word_text}",
-  "level": "B2",
-  "definition": "Clear English definition",
-  "translation_uz": "O'zbekcha tarjima",
-  "examples": [
-    "Academic example sentence 1 using the word.",
-    "Academic example sentence 2 using the word.",
-    "Academic example sentence 3 using the word.",
-    "Academic example sentence 4 using the word.",
-    "Academic example sentence 5 using the word."
-  ]
-}}
-Level must be one of: A1, A2, B1, B2, C1, C2"""}
-            ],
-            response_format={"type": "json_object"},
-            max_tokens=600
-        )
-        data = json.loads(resp.choices[0].message.content)
-        word_obj = Word.objects.create(
-            word=data.get("word", word_text),
-            level=data.get("level", "B1"),
-            definition=data.get("definition", ""),
-            translation_uz=data.get("translation_uz", ""),
-            examples=data.get("examples", []),
-        )
-        return Response(WordSerializer(word_obj, context={"request": request}).data)
+        result, data = lookup.lookup(word_text)
+        if result == lookup.INVALID:
+            return Response({"error": "Invalid word"}, status=400)
+        if result == lookup.NOT_FOUND:
+            return Response({"error": "Word not found"}, status=404)
+        if result == lookup.BUSY:
+            return Response({"error": "Word is being generated, try again"}, status=503)
+        if result == lookup.ERROR:
+            return Response({"error": "AI service unavailable"}, status=502)
+
+        data = dict(data)
+        data["is_saved"] = UserWord.objects.filter(user=request.user, word_id=data["id"]).exists()
+        return Response(data)
 
 
 class SaveWordView(APIView):
@@ -99,17 +73,22 @@ class SavedWordsView(generics.ListAPIView):
 
 
 class PracticeWordView(APIView):
-    """Get random words by level for practice"""
+    """Get random words by level for practice (yaqinda ko'rsatilganlarsiz — vocabulary.sampling)"""
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
         level = request.query_params.get("level", "B1")
-        words = list(Word.objects.filter(level=level).order_by("?")[:10])
+        if level not in sampling.LEVELS:
+            level = "B1"
+        words = sampling.sample(level, 10, owner=f"user:{request.user.id}")
         return Response(WordSerializer(words, many=True, context={"request": request}).data)
 
 
 class BotVocabularyView(APIView):
-    """Bot uchun: darajaga mos 20 ta so'z (BOT_SECRET bilan himoyalangan)"""
+    """
+    Bot uchun: darajaga mos 20 ta so'z (BOT_SECRET bilan himoyalangan).
+    ?telegram_id= berilsa — shu foydalanuvchiga yaqinda ko'rsatilgan so'zlar takrorlanmaydi.
+    """
     permission_classes = []
 
     def get(self, request):
@@ -119,11 +98,12 @@ class BotVocabularyView(APIView):
             return Response({"error": "Forbidden"}, status=403)
 
         level = request.query_params.get("level", "B1")
-        valid_levels = ['A1', 'A2', 'B1', 'B2', 'C1', 'C2']
-        if level not in valid_levels:
+        if level not in sampling.LEVELS:
             level = 'B1'
 
-        words = list(Word.objects.filter(level=level).order_by("?")[:20])
+        telegram_id = request.query_params.get("telegram_id")
+        owner = f"tg:{telegram_id}" if telegram_id and telegram_id.isdigit() else None
+        words = sampling.sample(level, 20, owner=owner)
         data = [
             {
                 "id": w.id,
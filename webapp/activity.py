@@ -0,0 +1,95 @@
+"""
+Foydalanuvchi faollik kalendari (UserActivityDay):
+- record_activity: sessiya tugaganda bugungi kunni belgilash (streak bilan)
+- week_and_streak: home sahifasi uchun hafta + streak — 1 ta so'rov
+- rebuild_user_days: tarixiy sanalardan streak larni qayta hisoblash (backfill)
+"""
+import logging
+from datetime import timedelta
+
+from django.db import IntegrityError
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+WEEKDAY_LABELS = ['Du', 'Se', 'Ch', 'Pa', 'Ju', 'Sh', 'Ya']
+
+
+def record_activity(*user_ids, day=None):
+    """
+    Berilgan userlar uchun `day` (default: bugun) ni faol kun sifatida belgilaydi.
+    Kun allaqachon belgilangan bo'lsa hech narsa qilmaydi.
+    """
+    from .models import UserActivityDay
+
+    day = day or timezone.localdate()
+    for user_id in filter(None, user_ids):
+        try:
+            if UserActivityDay.objects.filter(user_id=user_id, date=day).exists():
+                continue
+            prev_streak = UserActivityDay.objects.filter(
+                user_id=user_id, date=day - timedelta(days=1)
+            ).values_list('streak', flat=True).first() or 0
+            UserActivityDay.objects.create(user_id=user_id, date=day, streak=prev_streak + 1)
+        except IntegrityError:
+            # Parallel so'rov shu kunni allaqachon yozib qo'ygan
+            pass
+        except Exception as e:
+            logger.warning(f"[activity] user={user_id} day={day} error: {e}")
+
+
+def week_and_streak(user, today=None):
+    """
+    Joriy hafta (Du–Ya) kunlari va streak.
+    Streak bugungi qatordan olinadi — bugun faollik bo'lmasa 0.
+    """
+    from .models import UserActivityDay
+
+    today = today or timezone.localdate()
+    monday = today - timedelta(days=today.weekday())
+    sunday = monday + timedelta(days=6)
+
+    days = dict(UserActivityDay.objects.filter(
+        user=user, date__gte=monday, date__lte=sunday
+    ).values_list('date', 'streak'))
+
+    week_days = []
+    for i in range(7):
+        day = monday + timedelta(days=i)
+        week_days.append({
+            'date': day,
+            'label': WEEKDAY_LABELS[i],
+            'is_today': day == today,
+            'has_activity': day in days,
+        })
+    return week_days, days.get(today, 0)
+
+
+def compute_streaks(dates):
+    """Saralangan sanalar ro'yxati → [(date, streak), ...]"""
+    result = []
+    prev = None
+    streak = 0
+    for d in sorted(set(dates)):
+        streak = streak + 1 if prev is not None and d - prev == timedelta(days=1) else 1
+        result.append((d, streak))
+        prev = d
+    return result
+
+
+def rebuild_user_days(user_id, dates):
+    """Bitta user uchun barcha faol kunlarni (mavjudlari bilan birga) qayta yozish"""
+    from .models import UserActivityDay
+
+    existing = UserActivityDay.objects.filter(user_id=user_id).values_list('date', flat=True)
+    rows = [
+        UserActivityDay(user_id=user_id, date=d, streak=s)
+        for d, s in compute_streaks(list(dates) + list(existing))
+    ]
+    UserActivityDay.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=['user', 'date'],
+        update_fields=['streak'],
+    )
+    return len(rows)
@@ -5,3 +5,9 @@ class WebappConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'webapp'
     verbose_name = 'Web App'
+
+    def ready(self):
+        from config import config_cache
+        from . import participants
+        config_cache.connect_signals()
+        participants.connect_signals()
@@ -3,8 +3,10 @@ WebSocket consumers:
 - VoiceMatchmakingConsumer: find speaking partner
 - VoiceCallConsumer: WebRTC signaling (offer/answer/ICE)
 - AICallConsumer: OpenAI Realtime API proxy (ultra-low latency)
+- GradingConsumer: IELTS / CEFR baholash natijasi (Celery → push)
 """
 import json
+import time
 import asyncio
 import base64
 import logging
@@ -13,9 +15,13 @@ from channels.generic.websocket import AsyncWebsocketConsumer
 from channels.db import database_sync_to_async
 from django.utils import timezone
 
-logger = logging.getLogger(__name__)
+from config import grading, metrics
+from leaderboard import engine as leaderboard_engine
+from users import quotas
+from . import matchmaking
+from .activity import record_activity
 
-_search_queue: dict = {}
+logger = logging.getLogger(__name__)
 
 GEMINI_LIVE_MODEL = 'gemini-2.0-flash-live-001'
 
@@ -25,6 +31,7 @@ GEMINI_LIVE_MODEL = 'gemini-2.0-flash-live-001'
 class VoiceMatchmakingConsumer(AsyncWebsocketConsumer):
     async def connect(self):
         self.user = self.scope['user']
+        self.heartbeat_task = None
         if not self.user.is_authenticated:
             await self.close()
             return
@@ -32,7 +39,7 @@ class VoiceMatchmakingConsumer(AsyncWebsocketConsumer):
 
     async def disconnect(self, close_code):
         if hasattr(self, 'user') and self.user.is_authenticated:
-            _search_queue.pop(self.user.id, None)
+            await self._leave_queue()
             await self._update_searching(False)
 
     async def receive(self, text_data):
@@ -41,7 +48,7 @@ class VoiceMatchmakingConsumer(AsyncWebsocketConsumer):
         if t == 'search':
             await self._handle_search(data)
         elif t == 'cancel':
-            _search_queue.pop(self.user.id, None)
+            await self._leave_queue()
             await self._update_searching(False)
             await self.send(json.dumps({'type': 'cancelled'}))
 
@@ -49,19 +56,18 @@ class VoiceMatchmakingConsumer(AsyncWebsocketConsumer):
         gender_filter = data.get('gender_filter', 'any')
         level = data.get('level', 'any')
         name = (self.user.first_name or self.user.username).strip()
-        _search_queue[self.user.id] = {
+        await self._update_searching(True)
+        partner = await matchmaking.join({
             'channel_name': self.channel_name,
             'gender_filter': gender_filter,
+            'gender': self.user.gender,
             'level': level,
             'user_id': self.user.id,
             'name': name,
             'username': self.user.username,
-        }
-        await self._update_searching(True)
-        partner = self._find_match(gender_filter, level)
+        })
         if partner:
-            _search_queue.pop(self.user.id, None)
-            _search_queue.pop(partner['user_id'], None)
+            self._stop_heartbeat()
             room = await self._create_voice_room(partner['user_id'], gender_filter, level)
             await self.channel_layer.send(
                 partner['channel_name'],
@@ -79,18 +85,35 @@ class VoiceMatchmakingConsumer(AsyncWebsocketConsumer):
                 'partner': {'name': partner['name'], 'username': partner['username']},
             }))
         else:
+            self._start_heartbeat()
             await self.send(json.dumps({'type': 'searching'}))
 
-    def _find_match(self, gender_filter, level):
-        for uid, info in list(_search_queue.items()):
-            if uid == self.user.id:
-                continue
-            if level != 'any' and info['level'] != 'any' and info['level'] != level:
-                continue
-            return info
-        return None
+    # ── Navbat heartbeat — socket tirik ekan entry TTL yangilanadi ──
+
+    def _start_heartbeat(self):
+        self._stop_heartbeat()
+        self.heartbeat_task = asyncio.create_task(self._heartbeat_loop())
+
+    def _stop_heartbeat(self):
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+            self.heartbeat_task = None
+
+    async def _heartbeat_loop(self):
+        try:
+            while True:
+                await asyncio.sleep(matchmaking.HEARTBEAT_INTERVAL)
+                if not await matchmaking.heartbeat(self.user.id):
+                    break
+        except asyncio.CancelledError:
+            pass
+
+    async def _leave_queue(self):
+        self._stop_heartbeat()
+        await matchmaking.leave(self.user.id)
 
     async def match_found(self, event):
+        self._stop_heartbeat()
         await self.send(json.dumps({
             'type': 'matched',
             'room_id': event['room_id'],
@@ -111,6 +134,7 @@ class VoiceMatchmakingConsumer(AsyncWebsocketConsumer):
             connected_at=timezone.now(),
         )
         User.objects.filter(id__in=[self.user.id, partner_id]).update(chat_count=F('chat_count') + 1)
+        leaderboard_engine.incr('chat_count', self.user.id, partner_id)
         return room
 
     @database_sync_to_async
@@ -167,6 +191,9 @@ class VoiceCallConsumer(AsyncWebsocketConsumer):
                 room.ended_at = timezone.now()
                 room.duration_seconds = duration
                 room.save(update_fields=['status', 'ended_at', 'duration_seconds'])
+                record_activity(room.user1_id, room.user2_id)
+                leaderboard_engine.incr('voice_rooms', room.user1_id, room.user2_id)
+                quotas.incr('speaking' if room.partner_type == 'human' else 'ai_call', room.user1_id, room.user2_id)
         except VoiceRoom.DoesNotExist:
             pass
 
@@ -180,6 +207,11 @@ class AICallConsumer(AsyncWebsocketConsumer):
 
     Audio format: PCM16, 16kHz, mono (kirish)
                   PCM16, 24kHz, mono (chiqish — Gemini standart)
+
+    Metrikalar (config.metrics, pipeline='ai_call'): har bir chunk uchun upstream_send;
+    har bir Gemini turn i Trace — boshlanishi turn dan oldingi oxirgi user audio chunk i
+    (browser sukunatda ham yuborsa — pastki chegara), llm_first_token (birinchi javob),
+    time_to_first_audio, send, db_write, llm_completion (turn tugashi).
     """
 
     AI_INSTRUCTIONS = (
@@ -204,6 +236,7 @@ class AICallConsumer(AsyncWebsocketConsumer):
         self.gemini_session  = None
         self._gemini_ctx     = None
         self.forward_task    = None
+        self.last_audio_in   = None   # time.perf_counter() — oxirgi user audio chunk
         self.room            = await self._create_room()
 
         try:
@@ -221,16 +254,18 @@ class AICallConsumer(AsyncWebsocketConsumer):
     async def receive(self, text_data=None, bytes_data=None):
         # Browser PCM16 audio chunk → Gemini
         if bytes_data and self.gemini_session:
+            self.last_audio_in = time.perf_counter()
             try:
                 from google.genai import types as gtypes
-                await self.gemini_session.send(
-                    input=gtypes.LiveClientRealtimeInput(
-                        media_chunks=[gtypes.Blob(
-                            data=bytes_data,
-                            mime_type='audio/pcm;rate=16000',
-                        )]
+                with metrics.timer('upstream_send', 'gemini', GEMINI_LIVE_MODEL, pipeline='ai_call'):
+                    await self.gemini_session.send(
+                        input=gtypes.LiveClientRealtimeInput(
+                            media_chunks=[gtypes.Blob(
+                                data=bytes_data,
+                                mime_type='audio/pcm;rate=16000',
+                            )]
+                        )
                     )
-                )
             except Exception as e:
                 logger.error(f'AICallConsumer.receive audio error: {e}')
 
@@ -250,11 +285,10 @@ class AICallConsumer(AsyncWebsocketConsumer):
     # ── Gemini Live ulanish ────────────────────────────────────────────
 
     async def _connect_gemini(self):
-        import google.genai as google_genai
         from google.genai import types as gtypes
-        from django.conf import settings
+        from config.ai_clients import genai_client
 
-        client = google_genai.Client(api_key=settings.GEMINI_API_KEY)
+        client = genai_client()
 
         config = gtypes.LiveConnectConfig(
             response_modalities=['AUDIO'],
@@ -291,10 +325,20 @@ class AICallConsumer(AsyncWebsocketConsumer):
         try:
             while True:
                 turn = self.gemini_session.receive()
+                turn_begin = time.perf_counter()
+                trace = None
                 async for response in turn:
+                    if trace is None:
+                        trace = self._new_trace(turn_begin)
+                        trace.observe(
+                            'llm_first_token', time.perf_counter() - trace.started, 'gemini', GEMINI_LIVE_MODEL,
+                        )
+
                     # PCM16 audio → browser (binary)
                     if response.data:
-                        await self.send(bytes_data=response.data)
+                        with trace.stage('send'):
+                            await self.send(bytes_data=response.data)
+                        trace.mark('time_to_first_audio')
 
                     # Text transcript → browser
                     if response.text:
@@ -313,16 +357,30 @@ class AICallConsumer(AsyncWebsocketConsumer):
                                     'type': 'user_transcript',
                                     'text': txt.strip(),
                                 }))
-                                await self._save_msg_db('user', txt.strip())
+                                with trace.stage('db_write', model='AIMessage'):
+                                    await self._save_msg_db('user', txt.strip())
 
                 # Turn tugadi
                 await self.send(text_data=json.dumps({'type': 'ai_audio_done'}))
+                if trace:
+                    trace.observe(
+                        'llm_completion', time.perf_counter() - trace.started, 'gemini', GEMINI_LIVE_MODEL,
+                    )
+                    trace.finish()
 
         except asyncio.CancelledError:
             pass
         except Exception as e:
             logger.error(f'AICallConsumer._forward_from_gemini: {e}')
 
+    def _new_trace(self, turn_begin):
+        """Turn — shu turn davomidagi oxirgi user audio chunk idan (bo'lmasa turn_begin dan)"""
+        started = self.last_audio_in if self.last_audio_in and self.last_audio_in >= turn_begin else turn_begin
+        return metrics.Trace(
+            'ai_call', started, provider='gemini', model=GEMINI_LIVE_MODEL,
+            room=self.room.id, user=self.user.id,
+        )
+
     # ── Cleanup ───────────────────────────────────────────────────────
 
     async def _cleanup(self):
@@ -370,5 +428,30 @@ class AICallConsumer(AsyncWebsocketConsumer):
                 room.ended_at = timezone.now()
                 room.duration_seconds = duration
                 room.save(update_fields=['status', 'ended_at', 'duration_seconds'])
+                record_activity(room.user1_id, room.user2_id)
+                leaderboard_engine.incr('voice_rooms', room.user1_id, room.user2_id)
+                quotas.incr('ai_call', room.user1_id)
         except VoiceRoom.DoesNotExist:
-            pass
\ No newline at end of file
+            pass
+
+
+# ─── GradingConsumer ───────────────────────────────────────────────────────────
+
+class GradingConsumer(AsyncWebsocketConsumer):
+    """Foydalanuvchining baholash ishlari — grading_<user_id> guruhi (config.grading.push)"""
+
+    async def connect(self):
+        self.user = self.scope['user']
+        if not self.user.is_authenticated:
+            await self.close()
+            return
+        self.group = grading.group_name(self.user.id)
+        await self.channel_layer.group_add(self.group, self.channel_name)
+        await self.accept()
+
+    async def disconnect(self, close_code):
+        if hasattr(self, 'group'):
+            await self.channel_layer.group_discard(self.group, self.channel_name)
+
+    async def grading_update(self, event):
+        await self.send(text_data=json.dumps(event['payload']))
@@ -0,0 +1,41 @@
+"""
+Tarixiy sessiyalardan UserActivityDay jadvalini to'ldirish.
+
+    python manage.py backfill_activity
+"""
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = "Tugagan suhbat, practice va mock sessiyalaridan faol kunlar + streak ni qayta hisoblaydi"
+
+    def handle(self, *args, **options):
+        from webapp.activity import rebuild_user_days
+        from webapp.models import VoiceRoom
+        from practice.models import PracticeSession
+        from ielts_mock.models import IELTSSession
+        from cefr_mock.models import CEFRSession
+
+        days = defaultdict(set)
+
+        def collect(rows):
+            for user_id, started_at in rows:
+                if user_id and started_at:
+                    days[user_id].add(timezone.localtime(started_at).date())
+
+        ended_rooms = VoiceRoom.objects.filter(status='ended')
+        collect(ended_rooms.values_list('user1_id', 'started_at').iterator())
+        collect(ended_rooms.exclude(user2__isnull=True).values_list('user2_id', 'started_at').iterator())
+        for model in (PracticeSession, IELTSSession, CEFRSession):
+            collect(model.objects.filter(is_completed=True).values_list('user_id', 'started_at').iterator())
+
+        total = 0
+        for user_id, dates in days.items():
+            total += rebuild_user_days(user_id, dates)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ {len(days)} ta user, {total} ta faol kun yozildi"
+        ))
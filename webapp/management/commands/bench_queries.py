@@ -0,0 +1,71 @@
+"""
+Endpointlar bo'yicha so'rovlar soni / SQL vaqti / javob vaqti benchmarki (webapp.query_bench).
+
+    python manage.py bench_queries                       # SQLite: xotiradagi test DB
+    python manage.py bench_queries --users 5000 --heavy 300 --report bench.json --strict
+    python manage.py bench_queries --only bot-api        # faqat route da shu matn borlari
+
+Ma'lumot har safar vaqtinchalik test DB ga yoziladi va oxirida o'chiriladi — asosiy DB ga
+tegilmaydi. PostgreSQL da DATABASES['default'] user i CREATE DATABASE huquqiga ega bo'lishi kerak.
+--strict: byudjetdan oshgan yoki 5xx qaytargan endpoint bo'lsa xato kodi bilan chiqadi (CI uchun).
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = "Barcha webapp va API endpointlari uchun so'rovlar soni benchmarki (byudjet + JSON hisobot)"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=2000, help="Seed userlar soni")
+        parser.add_argument('--heavy', type=int, default=200, help="Heavy user dagi har turdagi yozuvlar soni")
+        parser.add_argument('--repeat', type=int, default=3, help="Har bir endpoint necha marta o'lchanadi")
+        parser.add_argument('--only', help="Faqat route ida shu matn bor endpointlar")
+        parser.add_argument('--seed', type=int, default=1, help="Random seed")
+        parser.add_argument('--report', help="JSON hisobot fayli")
+        parser.add_argument('--strict', action='store_true', help="Muammo bo'lsa xato bilan chiqish")
+
+    def handle(self, *args, **options):
+        from django.test.utils import setup_test_environment, teardown_test_environment
+        from webapp import query_bench
+
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            report = query_bench.run(
+                users=options['users'], heavy=options['heavy'], repeat=options['repeat'],
+                only=options['only'], seed_value=options['seed'], stdout=self._line,
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        if options['report']:
+            with open(options['report'], 'w', encoding='utf-8') as f:
+                json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+            self.stdout.write(f"📄 {options['report']}")
+
+        measured = [e for e in report['endpoints'] if 'skipped' not in e]
+        summary = (
+            f"{len(measured) - report['failed']}/{len(measured)} endpoint byudjetda "
+            f"({report['vendor']}, seed {report['seed']['seconds']}s, "
+            f"{len(report['endpoints']) - len(measured)} o'tkazib yuborildi)"
+        )
+        if report['failed'] and options['strict']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary) if not report['failed'] else self.style.WARNING(summary))
+
+    def _line(self, entry):
+        if 'skipped' in entry:
+            self.stdout.write(f"⏭️  {entry['route']:<55} {entry['skipped']}")
+            return
+        light, heavy = entry['light'], entry['heavy']
+        mark = self.style.SUCCESS('✅') if not entry['problems'] else self.style.ERROR('❌')
+        self.stdout.write(
+            f"{mark} {entry['route']:<55} q={light['queries']:>3}/{heavy['queries']:<3} "
+            f"sql={heavy['sql_ms']:>7.2f}ms  resp={heavy['response_ms']:>7.2f}ms  [{heavy['status']}]"
+        )
+        for problem in entry['problems']:
+            self.stdout.write(self.style.WARNING(f"     ⚠️  {problem}"))
@@ -0,0 +1,104 @@
+"""
+VoiceRoom so'rovlarining rejalarini (EXPLAIN) tekshirish.
+
+    python manage.py explain_voice_rooms [--user ID] [--strict]
+
+home, speaking, speaking_history, progress, quotas (bot_api_check_limit) va
+bot_api_stats ishlatadigan so'rovlar webapp.participants dagi bilan bir xil.
+Har biri uchun:
+  - jadval to'liq o'qilmasligi (SQLite: SCAN <table>, PostgreSQL: Seq Scan)
+  - ORDER BY indeksdan olinishi (SQLite: TEMP B-TREE, PostgreSQL: Sort bo'lmasligi)
+  - count so'rovlari faqat indeksdan o'qilishi (COVERING INDEX / Index Only Scan)
+PostgreSQL da kichik jadvalda ham indeks yo'li bor-yo'qligini ko'rish uchun
+enable_seqscan o'chiriladi (faqat shu tranzaksiya ichida).
+"""
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+
+class Command(BaseCommand):
+    help = "VoiceRoom / VoiceRoomParticipant so'rovlari indeks bilan ishlashini EXPLAIN orqali tekshiradi"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, help="User id (default: eng ko'p suhbatli user)")
+        parser.add_argument('--strict', action='store_true', help="Muammo bo'lsa xato bilan chiqish")
+
+    def handle(self, *args, **options):
+        from django.db.models import Count
+        from webapp import participants
+        from webapp.models import VoiceRoom, VoiceRoomParticipant
+
+        user_id = options['user']
+        if user_id is None:
+            top = (
+                VoiceRoomParticipant.objects.values('user_id')
+                .annotate(n=Count('id')).order_by('-n').first()
+            )
+            user_id = top['user_id'] if top else 0
+
+        day_start, day_end = participants.day_range()
+        checks = [
+            # (nomi, queryset, faqat indeksdan o'qilishi shartmi)
+            ('home: voice_rooms count', participants.recent(user_id).order_by().values('user_id'), True),
+            ('home: recent_convos', participants.ended(user_id)[:10], False),
+            ('speaking: recent_rooms', participants.recent(user_id)[:20], False),
+            ('speaking_history', participants.ended(user_id)[:20], False),
+            ('progress: voice_rooms', participants.ended_filter(user_id).values('user_id'), True),
+            ('quotas: speaking', participants.ended_filter(user_id, 'human').values('user_id'), True),
+            ('quotas: ai_call', participants.ended_filter(user_id, 'ai').values('user_id'), True),
+            ('bot_api_stats: today_calls', VoiceRoom.objects.filter(
+                status='ended', ended_at__gte=day_start, ended_at__lt=day_end,
+            ).order_by().values('status'), True),
+        ]
+
+        tables = [VoiceRoomParticipant._meta.db_table, VoiceRoom._meta.db_table]
+        failed = 0
+        for name, qs, index_only in checks:
+            plan = self._explain(qs)
+            problems = self._problems(plan, tables, index_only)
+            mark = self.style.SUCCESS('✅') if not problems else self.style.ERROR('❌')
+            self.stdout.write(f"{mark} {name}")
+            for line in plan.splitlines():
+                self.stdout.write(f"     {line}")
+            for problem in problems:
+                self.stdout.write(self.style.WARNING(f"     ⚠️  {problem}"))
+            failed += bool(problems)
+
+        summary = f"{len(checks) - failed}/{len(checks)} so'rov indeks bilan ({connection.vendor})"
+        if failed and options['strict']:
+            raise CommandError(summary)
+        self.stdout.write(self.style.SUCCESS(summary) if not failed else self.style.WARNING(summary))
+
+    def _explain(self, qs):
+        if connection.vendor != 'postgresql':
+            return qs.explain()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            plan = qs.explain()
+            transaction.set_rollback(True)
+        return plan
+
+    def _problems(self, plan, tables, index_only):
+        problems = []
+        if connection.vendor == 'postgresql':
+            for table in tables:
+                if f'Seq Scan on {table}' in plan:
+                    problems.append(f"{table} to'liq o'qiladi")
+            if 'Sort' in plan and 'Sort Key' in plan:
+                problems.append("ORDER BY indeksdan emas (Sort)")
+            if index_only and 'Index Only Scan' not in plan:
+                problems.append("faqat indeksdan o'qilmaydi")
+            return problems
+
+        for line in plan.splitlines():
+            words = line.split()
+            if 'SCAN' in words:
+                table = words[words.index('SCAN') + 1] if len(words) > words.index('SCAN') + 1 else ''
+                if table in tables and 'INDEX' not in words:
+                    problems.append(f"{table} to'liq o'qiladi")
+        if 'TEMP B-TREE' in plan:
+            problems.append("ORDER BY indeksdan emas (TEMP B-TREE)")
+        if index_only and 'COVERING INDEX' not in plan:
+            problems.append("faqat indeksdan o'qilmaydi")
+        return problems
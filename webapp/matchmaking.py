@@ -0,0 +1,198 @@
+"""
+Voice matchmaking navbati — barcha daphne worker lar uchun umumiy (Redis).
+
+Navbat bucket larga bo'lingan:
+    {mm}:q:<level>:<gender>:<gender_filter>   — user_id lar ro'yxati (FIFO)
+    {mm}:entries                              — hash: user_id → navbatdagi user ma'lumoti (JSON)
+    {mm}:alive                                — zset: user_id → muddati (unix vaqt, heartbeat suradi)
+
+Qidirayotgan user uchun faqat mos keladigan bucket lar tekshiriladi
+(daraja mos, uning filtri partner jinsini qabul qiladi va partner filtri
+uning jinsini qabul qiladi) — bucket lar soni o'zgarmas, demak O(1).
+
+Juftlash Lua skriptida atomik: bir partnerni ikki process bir vaqtda ololmaydi.
+Skript ishlatadigan barcha kalitlar KEYS orqali beriladi va {mm} hash tag i bilan
+bitta slot da turadi (Redis Cluster / script key tekshiruvi).
+Socket disconnect siz o'lsa, muddat (heartbeat yangilamaydi) o'tadi — bucket dagi
+id keyingi pop da tashlab yuboriladi, entry esa keyingi join da tozalanadi.
+
+Redis bo'lmasa (local DEBUG) — process ichidagi dict, xuddi shu moslik qoidalari bilan.
+"""
+import json
+import logging
+import time
+
+from config.redis_client import get_async_redis, mark_down
+
+logger = logging.getLogger(__name__)
+
+ENTRY_TTL = 30                  # soniya — heartbeat har ENTRY_TTL/3 da yangilaydi
+HEARTBEAT_INTERVAL = ENTRY_TTL / 3
+BUCKET_TTL = ENTRY_TTL * 10
+
+LEVELS = ('beginner', 'intermediate', 'advanced', 'any')
+GENDERS = ('male', 'female', 'other', 'none')
+FILTERS = ('male', 'female', 'any')
+
+_ENTRIES_KEY = '{mm}:entries'
+_ALIVE_KEY = '{mm}:alive'
+_PURGE_BATCH = 100
+
+# KEYS: entries, alive, my_bucket, *candidate_buckets
+# ARGV: me, entry JSON, now, deadline, BUCKET_TTL, _PURGE_BATCH
+_POP_OR_PUSH = """
+local entries, alive, my_bucket = KEYS[1], KEYS[2], KEYS[3]
+local me, now = ARGV[1], tonumber(ARGV[3])
+for i = 4, #KEYS do
+    local bucket = KEYS[i]
+    while true do
+        local uid = redis.call('LPOP', bucket)
+        if not uid then break end
+        if uid ~= me then
+            local raw = redis.call('HGET', entries, uid)
+            local deadline = tonumber(redis.call('ZSCORE', alive, uid))
+            if raw and deadline and deadline > now and cjson.decode(raw)['bucket'] == bucket then
+                redis.call('HDEL', entries, uid, me)
+                redis.call('ZREM', alive, uid, me)
+                redis.call('LREM', my_bucket, 0, me)
+                return raw
+            end
+        end
+    end
+end
+for _, uid in ipairs(redis.call('ZRANGEBYSCORE', alive, '-inf', now, 'LIMIT', 0, ARGV[6])) do
+    redis.call('HDEL', entries, uid)
+    redis.call('ZREM', alive, uid)
+end
+redis.call('LREM', my_bucket, 0, me)
+redis.call('RPUSH', my_bucket, me)
+redis.call('HSET', entries, me, ARGV[2])
+redis.call('ZADD', alive, ARGV[4], me)
+for i = 1, 3 do
+    redis.call('EXPIRE', KEYS[i], ARGV[5])
+end
+return false
+"""
+
+# KEYS: alive; ARGV: me, now, deadline
+_HEARTBEAT = """
+local deadline = tonumber(redis.call('ZSCORE', KEYS[1], ARGV[1]))
+if not deadline or deadline <= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+_local_queue: dict = {}
+
+
+# ─── Moslik qoidalari ─────────────────────────────────────────────────────────
+
+def _norm(value, allowed, default):
+    return value if value in allowed else default
+
+
+def normalize(entry):
+    entry['level'] = _norm(entry.get('level'), LEVELS, 'any')
+    entry['gender'] = _norm(entry.get('gender'), GENDERS, 'none')
+    entry['gender_filter'] = _norm(entry.get('gender_filter'), FILTERS, 'any')
+    return entry
+
+
+def bucket_key(entry):
+    return f"{{mm}}:q:{entry['level']}:{entry['gender']}:{entry['gender_filter']}"
+
+
+def candidate_buckets(entry):
+    """Bu user bilan juftlasha oladigan user lar turadigan bucket lar (afzallik tartibida)"""
+    level = entry['level']
+    levels = (level, 'any') if level != 'any' else LEVELS
+    wanted = entry['gender_filter']
+    genders = (wanted,) if wanted != 'any' else GENDERS
+    # Partner filtri meni qabul qilishi kerak
+    filters = ('any', entry['gender']) if entry['gender'] in ('male', 'female') else ('any',)
+    return [f"{{mm}}:q:{lv}:{g}:{f}" for lv in levels for g in genders for f in filters]
+
+
+def _compatible(a, b):
+    if a['level'] != 'any' and b['level'] != 'any' and a['level'] != b['level']:
+        return False
+    if a['gender_filter'] != 'any' and b['gender'] != a['gender_filter']:
+        return False
+    if b['gender_filter'] != 'any' and a['gender'] != b['gender_filter']:
+        return False
+    return True
+
+
+# ─── API ──────────────────────────────────────────────────────────────────────
+
+async def join(entry):
+    """
+    Navbatga qo'shilish yoki darhol partner topish.
+    entry: user_id, channel_name, name, username, level, gender, gender_filter
+    Qaytaradi: partner entry (dict) yoki None (navbatga qo'yildi)
+    """
+    entry = normalize(dict(entry))
+    entry['bucket'] = bucket_key(entry)
+    r = get_async_redis()
+    if r is not None:
+        try:
+            keys = [_ENTRIES_KEY, _ALIVE_KEY, entry['bucket'], *candidate_buckets(entry)]
+            now = time.time()
+            raw = await r.eval(
+                _POP_OR_PUSH, len(keys), *keys,
+                entry['user_id'], json.dumps(entry), now, now + ENTRY_TTL, BUCKET_TTL, _PURGE_BATCH,
+            )
+            return json.loads(raw) if raw else None
+        except Exception as e:
+            logger.warning(f"[matchmaking] redis join error: {e}")
+            mark_down()
+    return _local_join(entry)
+
+
+async def leave(user_id):
+    """Navbatdan chiqish (cancel / disconnect / match)"""
+    _local_queue.pop(user_id, None)
+    r = get_async_redis()
+    if r is None:
+        return
+    try:
+        pipe = r.pipeline(transaction=True)
+        pipe.hget(_ENTRIES_KEY, user_id)
+        pipe.hdel(_ENTRIES_KEY, user_id)
+        pipe.zrem(_ALIVE_KEY, user_id)
+        raw, *_ = await pipe.execute()
+        if raw:
+            await r.lrem(json.loads(raw)['bucket'], 0, user_id)
+    except Exception as e:
+        logger.warning(f"[matchmaking] redis leave error: {e}")
+        mark_down()
+
+
+async def heartbeat(user_id):
+    """Navbatdagi entry TTL ini yangilash; entry yo'q bo'lsa False (match bo'lgan yoki eskirgan)"""
+    if user_id in _local_queue:
+        return True
+    r = get_async_redis()
+    if r is None:
+        return False
+    try:
+        now = time.time()
+        return bool(await r.eval(_HEARTBEAT, 1, _ALIVE_KEY, user_id, now, now + ENTRY_TTL))
+    except Exception as e:
+        logger.warning(f"[matchmaking] redis heartbeat error: {e}")
+        mark_down()
+        return False
+
+
+def _local_join(entry):
+    for uid, info in list(_local_queue.items()):
+        if uid == entry['user_id']:
+            continue
+        if _compatible(entry, info):
+            _local_queue.pop(uid, None)
+            _local_queue.pop(entry['user_id'], None)
+            return info
+    _local_queue[entry['user_id']] = entry
+    return None
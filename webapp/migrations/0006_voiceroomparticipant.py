@@ -0,0 +1,82 @@
+# Generated by Django 5.2.11 on 2026-10-17 03:39
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_participants(apps, schema_editor):
+    """Mavjud xonalar uchun ishtirokchilar (user1 va user2)"""
+    VoiceRoom = apps.get_model('webapp', 'VoiceRoom')
+    VoiceRoomParticipant = apps.get_model('webapp', 'VoiceRoomParticipant')
+
+    rooms = VoiceRoom.objects.values_list(
+        'id', 'user1_id', 'user2_id', 'partner_type', 'status', 'started_at', 'ended_at',
+    ).iterator(chunk_size=2000)
+    batch = []
+    for room_id, user1_id, user2_id, partner_type, status, started_at, ended_at in rooms:
+        for user_id in {user1_id, user2_id} - {None}:
+            batch.append(VoiceRoomParticipant(
+                room_id=room_id, user_id=user_id, partner_type=partner_type,
+                status=status, started_at=started_at, ended_at=ended_at,
+            ))
+        if len(batch) >= 2000:
+            VoiceRoomParticipant.objects.bulk_create(batch)
+            batch = []
+    VoiceRoomParticipant.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('webapp', '0005_useractivityday'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoiceRoomParticipant',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('partner_type', models.CharField(choices=[('human', 'Inson'), ('ai', 'AI')], max_length=10)),
+                ('status', models.CharField(choices=[('searching', 'Qidirilmoqda'), ('active', 'Faol'), ('ended', 'Tugadi')], max_length=15)),
+                ('started_at', models.DateTimeField()),
+                ('ended_at', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'verbose_name': 'Suhbat ishtirokchisi',
+                'verbose_name_plural': 'Suhbat ishtirokchilari',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='voiceroom',
+            index=models.Index(fields=['status', 'ended_at'], name='voiceroom_status_ended_idx'),
+        ),
+        migrations.AddField(
+            model_name='voiceroomparticipant',
+            name='room',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='participants', to='webapp.voiceroom'),
+        ),
+        migrations.AddField(
+            model_name='voiceroomparticipant',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='voice_participations', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='voiceroomparticipant',
+            index=models.Index(fields=['user', 'status', '-ended_at'], name='vrp_user_status_ended_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voiceroomparticipant',
+            index=models.Index(fields=['user', '-started_at'], name='vrp_user_started_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='voiceroomparticipant',
+            index=models.Index(fields=['user', 'partner_type', 'status'], name='vrp_user_type_status_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='voiceroomparticipant',
+            unique_together={('room', 'user')},
+        ),
+        migrations.RunPython(fill_participants, migrations.RunPython.noop),
+    ]
@@ -88,8 +88,9 @@ class AppSettings(models.Model):
 
     @classmethod
     def get(cls):
-        obj, _ = cls.objects.get_or_create(pk=1)
-        return obj
+        """Process cache dan nusxa (config.config_cache) — admin saqlaganda yangilanadi"""
+        from config import config_cache
+        return config_cache.app_settings()
 
     def save(self, *args, **kwargs):
         self.pk = 1
@@ -204,6 +205,10 @@ class VoiceRoom(models.Model):
         verbose_name = "Ovozli Suhbat Xonasi"
         verbose_name_plural = "Ovozli Suhbat Xonalari"
         ordering = ['-started_at']
+        indexes = [
+            # bot_api_stats: status='ended' AND ended_at oralig'i
+            models.Index(fields=['status', 'ended_at'], name='voiceroom_status_ended_idx'),
+        ]
 
     def __str__(self):
         if self.partner_type == 'ai':
@@ -217,6 +222,38 @@ class VoiceRoom(models.Model):
         return self.user1
 
 
+class VoiceRoomParticipant(models.Model):
+    """
+    VoiceRoom ishtirokchisi — har bir (room, user) uchun bitta qator.
+    Q(user1=user) | Q(user2=user) o'rniga user bo'yicha indeksli so'rov (webapp.participants).
+    VoiceRoom saqlanganda sinxronlanadi (post_save).
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name='voice_participations'
+    )
+    room = models.ForeignKey(VoiceRoom, on_delete=models.CASCADE, related_name='participants')
+    partner_type = models.CharField(max_length=10, choices=VoiceRoom.PARTNER_TYPE_CHOICES)
+    status = models.CharField(max_length=15, choices=VoiceRoom.STATUS_CHOICES)
+    started_at = models.DateTimeField()
+    ended_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        unique_together = ('room', 'user')
+        indexes = [
+            # home / speaking_history / progress: tugagan suhbatlar, oxirgisi birinchi
+            models.Index(fields=['user', 'status', '-ended_at'], name='vrp_user_status_ended_idx'),
+            # speaking: barcha suhbatlar, started_at bo'yicha
+            models.Index(fields=['user', '-started_at'], name='vrp_user_started_idx'),
+            # quotas (speaking / ai_call): tugagan suhbatlar soni
+            models.Index(fields=['user', 'partner_type', 'status'], name='vrp_user_type_status_idx'),
+        ]
+        verbose_name = "Suhbat ishtirokchisi"
+        verbose_name_plural = "Suhbat ishtirokchilari"
+
+    def __str__(self):
+        return f"{self.user_id} @ room {self.room_id} ({self.status})"
+
+
 class AIMessage(models.Model):
     """AI suhbat xonasidagi har bir xabarni saqlaydi"""
     ROLE_CHOICES = [('user', 'User'), ('assistant', 'Assistant')]
@@ -259,3 +296,27 @@ class VoiceRating(models.Model):
 
     def __str__(self):
         return f"{self.rater} → {self.rated_user or 'AI'}: {self.rating}/5"
+
+
+class UserActivityDay(models.Model):
+    """
+    Foydalanuvchining faol kunlari kalendari — har bir (user, kun) uchun 1 ta qator.
+    streak = shu kun bilan tugaydigan ketma-ket faol kunlar soni,
+    shuning uchun home sahifasi hafta va streak ni 1 ta so'rov bilan oladi.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+        related_name='activity_days'
+    )
+    date = models.DateField()
+    streak = models.PositiveIntegerField(default=1)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Faol kun"
+        verbose_name_plural = "Faol kunlar"
+        unique_together = ('user', 'date')
+        ordering = ['-date']
+
+    def __str__(self):
+        return f"{self.user} | {self.date} (streak {self.streak})"
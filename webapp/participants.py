@@ -0,0 +1,98 @@
+"""
+VoiceRoom ishtirokchilari — VoiceRoomParticipant (user, room, status, ended_at, partner_type).
+
+Q(user1=user) | Q(user2=user) ikki FK bo'yicha OR — bitta indeks bilan o'qib bo'lmaydi.
+Ishtirokchi jadvalida har bir user uchun alohida qator, shuning uchun har bir sahifa
+(user, ...) kompozit indeksidan o'qiydi:
+
+    ended(user)          — home, speaking_history: tugagan suhbatlar, oxirgisi birinchi
+    recent(user)         — speaking: barcha suhbatlar, started_at bo'yicha
+    ended_count(user_id) — home, progress, quotas (speaking / ai_call)
+
+Sinxronlash: VoiceRoom post_save → sync(room) (WebappConfig.ready da ulanadi).
+Sana filtrlari — day_range(): `ended_at__date=` o'rniga [00:00, ertasi 00:00) oralig'i,
+shunda ustun funksiyaga o'ralmaydi va indeks ishlaydi.
+
+Rejalarni tekshirish: python manage.py explain_voice_rooms
+"""
+import logging
+from datetime import datetime, time, timedelta
+
+from django.db.models.signals import post_save
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+SYNC_FIELDS = ['partner_type', 'status', 'started_at', 'ended_at']
+
+
+def day_range(day=None):
+    """Local kun → (boshi, ertasi boshi) aware datetime lar"""
+    day = day or timezone.localdate()
+    start = timezone.make_aware(datetime.combine(day, time.min))
+    return start, start + timedelta(days=1)
+
+
+# ─── Yozish ───────────────────────────────────────────────────────────────────
+
+def sync(room):
+    from .models import VoiceRoomParticipant
+
+    user_ids = {room.user1_id, room.user2_id} - {None}
+    VoiceRoomParticipant.objects.filter(room_id=room.id).exclude(user_id__in=user_ids).delete()
+    if not user_ids:
+        return
+    VoiceRoomParticipant.objects.bulk_create(
+        [
+            VoiceRoomParticipant(
+                room_id=room.id, user_id=user_id, partner_type=room.partner_type,
+                status=room.status, started_at=room.started_at, ended_at=room.ended_at,
+            )
+            for user_id in user_ids
+        ],
+        update_conflicts=True,
+        unique_fields=['room', 'user'],
+        update_fields=SYNC_FIELDS,
+    )
+
+
+def _on_room_saved(sender, instance, **kwargs):
+    try:
+        sync(instance)
+    except Exception as e:
+        logger.error(f"[participants] room #{instance.id} sync error: {e}")
+
+
+def connect_signals():
+    """WebappConfig.ready() dan chaqiriladi"""
+    post_save.connect(_on_room_saved, sender='webapp.VoiceRoom', dispatch_uid='voice_participants_sync')
+
+
+# ─── O'qish ───────────────────────────────────────────────────────────────────
+
+def _rooms(participants):
+    return participants.select_related('room__user1', 'room__user2')
+
+
+def ended(user):
+    """Tugagan suhbatlar (VoiceRoomParticipant, .room bilan), oxirgisi birinchi"""
+    from .models import VoiceRoomParticipant
+    return _rooms(VoiceRoomParticipant.objects.filter(user=user, status='ended').order_by('-ended_at'))
+
+
+def recent(user):
+    """Barcha suhbatlar, oxirgi boshlangani birinchi"""
+    from .models import VoiceRoomParticipant
+    return _rooms(VoiceRoomParticipant.objects.filter(user=user).order_by('-started_at'))
+
+
+def ended_filter(user_id, partner_type=None):
+    from .models import VoiceRoomParticipant
+    qs = VoiceRoomParticipant.objects.filter(user_id=user_id, status='ended')
+    if partner_type:
+        qs = qs.filter(partner_type=partner_type)
+    return qs
+
+
+def ended_count(user_id, partner_type=None):
+    return ended_filter(user_id, partner_type).count()
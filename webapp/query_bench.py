@@ -0,0 +1,427 @@
+"""
+So'rovlar soni bo'yicha regressiya benchmarki — webapp.urls va barcha DRF marshrutlari.
+
+    python manage.py bench_queries [--users N] [--heavy N] [--report bench.json] [--strict]
+
+1. Vaqtinchalik test DB (SQLite: xotirada, PostgreSQL: test_<NAME>) — migratsiyalar bilan
+2. Factory — realistik ma'lumot: minglab userlar, ovozli suhbatlar, baholar, IELTS / CEFR /
+   practice sessiyalari, SessionScore, zamonlar statistikasi, so'zlar.
+   Ikki o'lchov useri: light (har turdan LIGHT_ROWS ta) va heavy (har turdan --heavy ta)
+3. endpoints() — config.urls dagi webapp/ va api/ marshrutlari (URL resolver dan, qo'lda ro'yxat yo'q)
+4. Har bir endpoint ikkala user uchun GET: bir marta isitiladi, keyin --repeat marta o'lchanadi —
+   so'rovlar soni, SQL vaqti (ms), javob vaqti (ms, mediana)
+5. Byudjet: queries <= BUDGETS.get(route, DEFAULT_BUDGET) va heavy - light <= SCALE_TOLERANCE
+   (ma'lumot ko'payganda so'rovlar soni o'smasligi kerak — N+1 belgisi); 5xx ham xato.
+   GET ga 405 qaytargan (yozish) endpointlar va SKIP dagilar hisobotda 'skipped' — o'lchanmagan,
+   byudjetdan o'tgan deb sanalmaydi
+
+webapp/tests.py shu run() ni kichik seed bilan `manage.py test` ichida ishlatadi — regressiya
+testni yiqitadi.
+
+Redis o'chirilgan holda o'lchanadi (DB fallback — eng ko'p so'rovli yo'l, prod Redis ga seed
+ma'lumot yozilmaydi), Django cache — LocMem.
+"""
+import logging
+import random
+import statistics
+import time
+from datetime import timedelta
+from unittest import mock
+
+from django.utils import timezone
+
+DEFAULT_BUDGET = 10
+BUDGETS = {
+    'webapp/progress/': 15,
+}
+SCALE_TOLERANCE = 2
+LIGHT_ROWS = 3
+PREFIXES = ('webapp/', 'api/')
+
+# AI ni chaqiradigan GET lar — tashqi so'rovsiz o'lchab bo'lmaydi
+SKIP = {
+    'webapp/progress/problems/': 'OpenAI',
+    'api/auth/my-analysis/': 'OpenAI',
+}
+
+IELTS_SUB = {
+    'fluency': 6.5, 'lexical': 6.0, 'grammar': 6.0, 'pronunciation': 6.5,
+    'part1_band': 6.5, 'part2_band': 6.0, 'part3_band': 6.0,
+}
+CEFR_FEEDBACK = {
+    'fluency': 50, 'accuracy': 48, 'range': 52, 'interaction': 55, 'coherence': 50,
+    'part_scores': {'part1': 50, 'part2': 48, 'part3': 52, 'part4': 51},
+}
+TENSES = ('Present Simple', 'Past Simple', 'Present Perfect', 'Future Simple', 'Past Continuous')
+
+
+# ─── Ma'lumot generatori ──────────────────────────────────────────────────────
+
+class Factory:
+    """bulk_create bilan seed; signallar ishlamaydi, shuning uchun bog'liq jadvallar shu yerda to'ldiriladi"""
+
+    def __init__(self, seed=1, now=None):
+        self.rng = random.Random(seed)
+        self.now = now or timezone.now()
+        self.counts = {}
+
+    def _bulk(self, model, objs, backdate=None):
+        objs = model.objects.bulk_create(objs, batch_size=500)
+        if backdate:
+            # auto_now_add bulk_create da ham "hozir" qo'yadi — tarixiy sanalar alohida yoziladi
+            for obj, value in zip(objs, backdate):
+                setattr(obj, 'started_at', value)
+            model.objects.bulk_update(objs, ['started_at'], batch_size=500)
+        self.counts[model._meta.label] = self.counts.get(model._meta.label, 0) + len(objs)
+        return objs
+
+    def _ago(self, days=60):
+        return self.now - timedelta(days=self.rng.random() * days)
+
+    def users(self, n, start=0, **overrides):
+        from users.models import User
+        return self._bulk(User, [
+            User(
+                username=f'bench_{i}', first_name=f'Bench{i}', password='!',
+                telegram_id=9_000_000_000 + i, referral_code=f'B{i:07d}',
+                chat_count=self.rng.randint(0, 50), practice_count=self.rng.randint(0, 30),
+                ielts_count=self.rng.randint(0, 10), cefr_count=self.rng.randint(0, 10),
+                gender=self.rng.choice(['male', 'female', '']),
+                **overrides,
+            )
+            for i in range(start, start + n)
+        ])
+
+    def catalog(self):
+        """Practice ssenariylari, savollar, tariflar, so'zlar — barcha userlar uchun umumiy"""
+        from ielts_mock.models import IELTSQuestion
+        from practice.models import PracticeCategory, PracticeScenario
+        from premium.models import PremiumPlan
+        from vocabulary.models import Word, normalize_word
+
+        categories = self._bulk(PracticeCategory, [
+            PracticeCategory(name=name, category_type=kind)
+            for name, kind in (('Daily', 'real_life'), ('Campus', 'academic'))
+        ])
+        scenarios = self._bulk(PracticeScenario, [
+            PracticeScenario(
+                category=categories[i % 2], title=f'Scenario {i}', description='...',
+                ai_prompt='...', what_to_expect='...', difficulty='medium',
+            )
+            for i in range(6)
+        ])
+        questions = self._bulk(IELTSQuestion, [
+            IELTSQuestion(part=1 + i % 3, question=f'Question {i}?') for i in range(30)
+        ])
+        plans = self._bulk(PremiumPlan, [
+            PremiumPlan(name=f'{days} kun', duration_days=days, description='...', features=[])
+            for days in (30, 90)
+        ])
+        words = self._bulk(Word, [
+            Word(
+                word=f'word{i}', key=normalize_word(f'word{i}'), level=level,
+                definition='...', examples=['...'],
+            )
+            for i, level in enumerate(l for l in ('A1', 'A2', 'B1', 'B2', 'C1', 'C2') for _ in range(50))
+        ])
+        return {'scenarios': scenarios, 'questions': questions, 'plans': plans, 'words': words}
+
+    def history(self, user, partners, n, catalog):
+        """Bitta user uchun n ta suhbat / baho / sessiya / so'z + tense va faollik kunlari"""
+        from chat.models import AIChat, ChatRating, ChatRoom
+        from cefr_mock.models import CEFRSession
+        from ielts_mock.models import IELTSSession
+        from practice.models import PracticeSession
+        from users import scores
+        from users.models import BotActivity, SessionScore
+        from vocabulary.models import UserWord
+        from webapp.models import VoiceRating, VoiceRoom, VoiceRoomParticipant
+
+        rng = self.rng
+        pool = [p for p in partners if p.id != user.id]
+        others = [rng.choice(pool) for _ in range(n)]
+
+        starts = [self._ago() for _ in range(n)]
+        rooms = self._bulk(VoiceRoom, [
+            VoiceRoom(
+                user1=user, user2=None if i % 4 == 0 else partner,
+                partner_type='ai' if i % 4 == 0 else 'human', status='ended',
+                duration_seconds=rng.randint(30, 900),
+            )
+            for i, partner in enumerate(others)
+        ], backdate=starts)
+        for room in rooms:
+            room.ended_at = room.started_at + timedelta(seconds=room.duration_seconds)
+        VoiceRoom.objects.bulk_update(rooms, ['ended_at'], batch_size=500)
+        self._bulk(VoiceRoomParticipant, [
+            VoiceRoomParticipant(
+                room=room, user_id=user_id, partner_type=room.partner_type, status=room.status,
+                started_at=room.started_at, ended_at=room.ended_at,
+            )
+            for room in rooms for user_id in {room.user1_id, room.user2_id} - {None}
+        ])
+        human = [room for room in rooms if room.user2_id]
+        self._bulk(VoiceRating, [
+            VoiceRating(room=room, rater=rater, rated_user=rated, rating=rng.randint(1, 5))
+            for room in human
+            for rater, rated in ((room.user1, room.user2), (room.user2, room.user1))
+        ])
+
+        chats = self._bulk(ChatRoom, [
+            ChatRoom(user1=user, user2=partner, status='ended') for partner in others
+        ])
+        self._bulk(ChatRating, [
+            ChatRating(room=room, rater=room.user2, rated_user=user, rating=rng.randint(1, 5))
+            for room in chats
+        ])
+        self._bulk(AIChat, [AIChat(user=user, coach='alex', message_count=rng.randint(2, 30)) for _ in range(n)])
+
+        ielts = self._bulk(IELTSSession, [
+            IELTSSession(
+                user=user, is_completed=True, overall_band=rng.choice([5.5, 6.0, 6.5, 7.0]),
+                sub_scores=IELTS_SUB, grading_status='done',
+            )
+            for _ in range(n)
+        ], backdate=[self._ago() for _ in range(n)])
+        cefr = self._bulk(CEFRSession, [
+            CEFRSession(
+                user=user, is_completed=True, score=rng.randint(30, 70), level='B2',
+                feedback=CEFR_FEEDBACK, grading_status='done',
+            )
+            for _ in range(n)
+        ], backdate=[self._ago() for _ in range(n)])
+        practice = self._bulk(PracticeSession, [
+            PracticeSession(
+                user=user, scenario=rng.choice(catalog['scenarios']), is_completed=True,
+                analysis_done=True, overall_score=rng.randint(40, 95), grammar_score=70,
+                vocab_score=65, fluency_score=72, duration_seconds=rng.randint(60, 900),
+            )
+            for _ in range(n)
+        ], backdate=[self._ago() for _ in range(n)])
+
+        rows = []
+        for kind, sessions, values in (
+            (SessionScore.IELTS, ielts, lambda s: scores.ielts_values(s.overall_band, s.sub_scores)),
+            (SessionScore.CEFR, cefr, lambda s: scores.cefr_values(s.score, s.feedback)),
+            (SessionScore.PRACTICE, practice, lambda s: {
+                name: getattr(s, field) for name, field in scores.PRACTICE_SCORES.items()
+            }),
+        ):
+            for session in sessions:
+                rows += [
+                    SessionScore(
+                        user=user, telegram_id=user.telegram_id, kind=kind, source=SessionScore.WEB,
+                        session_id=session.id, criterion=criterion, value=value,
+                        level=getattr(session, 'level', '') or '', started_at=session.started_at,
+                    )
+                    for criterion, value in values(session).items() if value
+                ]
+        self._bulk(SessionScore, rows)
+
+        self._bulk(BotActivity, [
+            BotActivity(
+                telegram_id=user.telegram_id, full_name=user.first_name,
+                activity_type='ielts_mock', data={'band': 6.5},
+            )
+            for _ in range(n)
+        ])
+        self._bulk(UserWord, [UserWord(user=user, word=word) for word in rng.sample(catalog['words'], min(n, len(catalog['words'])))])
+        self.tenses(user.telegram_id, days=min(n, 60))
+        self.activity_days(user, days=min(n, 30))
+
+    def tenses(self, telegram_id, days):
+        from users import tense_stats
+        today = self.now.date()
+        for back in range(days):
+            tense_stats.ingest(telegram_id, {
+                name: {'usage': 10, 'correct': self.rng.randint(3, 10)} for name in TENSES
+            }, day=today - timedelta(days=back))
+
+    def activity_days(self, user, days):
+        from webapp.models import UserActivityDay
+        today = timezone.localdate(self.now)
+        self._bulk(UserActivityDay, [
+            UserActivityDay(user=user, date=today - timedelta(days=back), streak=days - back)
+            for back in range(days)
+        ])
+
+
+def seed(users=2000, heavy=200, seed=1):
+    """Ma'lumot → (light_user, heavy_user, ids, counts)"""
+    factory = Factory(seed)
+    catalog = factory.catalog()
+    premium = {'is_premium': True, 'premium_expires': factory.now + timedelta(days=30)}
+
+    crowd = factory.users(users)
+    light, big = factory.users(2, start=users, **premium)
+    for user in crowd[:users // 4]:
+        factory.history(user, crowd, factory.rng.randint(1, 5), catalog)
+    factory.history(light, crowd, LIGHT_ROWS, catalog)
+    factory.history(big, crowd, heavy, catalog)
+    return light, big, catalog, factory.counts
+
+
+# ─── Endpointlar ──────────────────────────────────────────────────────────────
+
+def endpoints():
+    """[(route, view_label)] — config.urls dagi webapp/ va api/ marshrutlari"""
+    from django.urls import URLResolver, get_resolver
+
+    def walk(patterns, prefix=''):
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                yield from walk(pattern.url_patterns, prefix + str(pattern.pattern))
+                continue
+            view = getattr(pattern.callback, 'cls', None) or pattern.callback
+            yield prefix + str(pattern.pattern), f'{view.__module__}.{view.__qualname__}'
+
+    return [(route, view) for route, view in walk(get_resolver().url_patterns) if route.startswith(PREFIXES)]
+
+
+def _object_ids(user):
+    """URL dagi <int:...> lar uchun shu userga tegishli obyektlar"""
+    from chat.models import AIChat, ChatRoom
+    from cefr_mock.models import CEFRSession
+    from ielts_mock.models import IELTSSession
+    from practice.models import PracticeSession
+    from webapp.models import VoiceRoomParticipant
+
+    return {
+        'room': VoiceRoomParticipant.objects.filter(user=user).values_list('room_id', flat=True).first(),
+        'chat_room': ChatRoom.objects.filter(user1=user).values_list('id', flat=True).first(),
+        'ai_chat': AIChat.objects.filter(user=user).values_list('id', flat=True).first(),
+        'ielts_mock': IELTSSession.objects.filter(user=user).values_list('id', flat=True).first(),
+        'cefr_mock': CEFRSession.objects.filter(user=user).values_list('id', flat=True).first(),
+        'practice': PracticeSession.objects.filter(user=user).values_list('id', flat=True).first(),
+    }
+
+
+def _path(route, view, ids, catalog):
+    app = view.split('.')[0]
+    values = {
+        'scenario_id': catalog['scenarios'][0].id,
+        'plan_id': catalog['plans'][0].id,
+        'word_id': catalog['words'][0].id,
+        'question_id': catalog['questions'][0].id,
+        'session_id': ids.get(app) or ids['practice'],
+        'room_id': ids['chat_room'] if app == 'chat' else ids['room'],
+        'pk': ids['chat_room'],
+        'chat_id': ids['ai_chat'],
+    }
+    path = route
+    for name, value in values.items():
+        path = path.replace(f'<int:{name}>', str(value))
+    return '/' + path
+
+
+# ─── O'lchash ─────────────────────────────────────────────────────────────────
+
+def _request(client, user, path, repeat):
+    from django.db import connection
+
+    params = {'telegram_id': user.telegram_id}
+    headers = {'X-Bot-Secret': _bot_secret()}
+    runs = []
+    for _ in range(1 + repeat):
+        client.force_login(user)  # logout kabi endpointlardan keyin ham sessiya qolsin
+        timings = []
+
+        def timed(execute, sql, params, many, context):
+            started = time.perf_counter()
+            try:
+                return execute(sql, params, many, context)
+            finally:
+                timings.append(time.perf_counter() - started)
+
+        with connection.execute_wrapper(timed):
+            started = time.perf_counter()
+            response = client.get(path, params, headers=headers)
+            elapsed = time.perf_counter() - started
+        runs.append({
+            'status': response.status_code,
+            'queries': len(timings),
+            'sql_ms': sum(timings) * 1000,
+            'response_ms': elapsed * 1000,
+        })
+
+    cold, warm = runs[0], runs[1:]
+    return {
+        'status': warm[-1]['status'],
+        'queries': max(r['queries'] for r in warm),
+        'cold_queries': cold['queries'],
+        'sql_ms': round(statistics.median(r['sql_ms'] for r in warm), 2),
+        'response_ms': round(statistics.median(r['response_ms'] for r in warm), 2),
+    }
+
+
+def _bot_secret():
+    from django.conf import settings
+    return getattr(settings, 'BOT_SECRET', '')
+
+
+def _problems(route, profiles):
+    budget = BUDGETS.get(route, DEFAULT_BUDGET)
+    problems = []
+    for name, result in profiles.items():
+        if result['status'] >= 500:
+            problems.append(f"{name}: HTTP {result['status']}")
+        if result['queries'] > budget:
+            problems.append(f"{name}: {result['queries']} so'rov > byudjet {budget}")
+    growth = profiles['heavy']['queries'] - profiles['light']['queries']
+    if growth > SCALE_TOLERANCE:
+        problems.append(f"heavy - light = {growth} so'rov (N+1?)")
+    return budget, problems
+
+
+def run(users=2000, heavy=200, repeat=3, only=None, seed_value=1, stdout=None):
+    """Joriy (test) DB ga seed + barcha endpointlarni o'lchash → report dict"""
+    from django.db import connection
+    from django.test import Client, override_settings
+
+    from config import redis_client
+
+    started = time.perf_counter()
+    # 405 / 404 lar uchun django.request warning lari hisobotni ko'mib yubormasin
+    request_logger = logging.getLogger('django.request')
+    with mock.patch.object(redis_client, '_down_until', float('inf')), \
+            mock.patch.object(request_logger, 'level', logging.ERROR), override_settings(CACHES={
+        'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'query-bench'},
+    }):
+        light, big, catalog, counts = seed(users, heavy, seed_value)
+        seeded_s = time.perf_counter() - started
+        ids = {'light': _object_ids(light), 'heavy': _object_ids(big)}
+
+        client = Client(raise_request_exception=False)
+        results = []
+        for route, view in endpoints():
+            if only and only not in route:
+                continue
+            entry = {'route': route, 'view': view}
+            if route in SKIP:
+                entry['skipped'] = SKIP[route]
+                results.append(entry)
+                if stdout:
+                    stdout(entry)
+                continue
+            profiles = {
+                name: _request(client, user, _path(route, view, ids[name], catalog), repeat)
+                for name, user in (('light', light), ('heavy', big))
+            }
+            if any(result['status'] == 405 for result in profiles.values()):
+                # Faqat POST / PUT / DELETE — GET bilan o'lchanmaydi, "byudjetda" deb sanalmasin
+                entry['skipped'] = 'GET 405'
+            else:
+                entry['budget'], entry['problems'] = _problems(route, profiles)
+                entry.update(profiles)
+            results.append(entry)
+            if stdout:
+                stdout(entry)
+
+    return {
+        'vendor': connection.vendor,
+        'generated_at': timezone.now().isoformat(),
+        'seed': {'users': users, 'heavy': heavy, 'rows': counts, 'seconds': round(seeded_s, 1)},
+        'budgets': {'default': DEFAULT_BUDGET, 'routes': BUDGETS, 'scale_tolerance': SCALE_TOLERANCE},
+        'failed': sum(bool(e.get('problems')) for e in results),
+        'endpoints': results,
+    }
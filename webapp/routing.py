@@ -6,5 +6,6 @@ websocket_urlpatterns = [
     re_path(r'ws/voice-match/$', consumers.VoiceMatchmakingConsumer.as_asgi()),
     re_path(r'ws/voice-call/(?P<room_id>\d+)/$', consumers.VoiceCallConsumer.as_asgi()),
     re_path(r'ws/ai-call/$', consumers.AICallConsumer.as_asgi()),
+    re_path(r'ws/grading/$', consumers.GradingConsumer.as_asgi()),
     re_path(r'ws/practice/(?P<session_id>\d+)/$', PracticeSessionConsumer.as_asgi()),  # ← O'ZGARTIR
 ]
\ No newline at end of file
@@ -31,8 +31,7 @@ def analyze_ai_conversation(self, room_id: int, user_id: int):
     Natija VoiceRoom.ai_feedback ga saqlanadi (agar field bo'lsa)
     """
     try:
-        import openai
-        from django.conf import settings
+        from config.ai_clients import openai_client
         from .models import AIMessage, VoiceRoom
 
         room = VoiceRoom.objects.get(id=room_id)
@@ -58,8 +57,7 @@ def analyze_ai_conversation(self, room_id: int, user_id: int):
             "- overall_comment (1-2 jumlada umumiy baho)"
         )
 
-        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        resp = client.chat.completions.create(
+        resp = openai_client().chat.completions.create(
             model='gpt-4o-mini',
             messages=[{'role': 'user', 'content': prompt}],
             response_format={'type': 'json_object'},
@@ -87,18 +85,12 @@ def _notify_user_feedback(user_id: int, feedback: dict):
     """Foydalanuvchiga Telegram orqali suhbat tahlilini yuborish"""
     try:
         from users.models import User
-        from django.conf import settings
-        import urllib.request as urlreq
-        import urllib.parse as urlparse
+        from notifications import telegram
 
         user = User.objects.get(id=user_id)
         if not user.telegram_id:
             return
 
-        bot_token = settings.TELEGRAM_BOT_TOKEN
-        if not bot_token:
-            return
-
         score = feedback.get('score', 0)
         strengths = feedback.get('strengths', [])
         improvements = feedback.get('improvements', [])
@@ -114,17 +106,7 @@ def _notify_user_feedback(user_id: int, feedback: dict):
             f"📈 <b>Yaxshilash kerak:</b>\n{improvements_text}\n\n"
             f"💬 {comment}"
         )
-
-        data = urlparse.urlencode({
-            'chat_id': user.telegram_id,
-            'text': text,
-            'parse_mode': 'HTML',
-        }).encode()
-        req = urlreq.Request(
-            f'https://api.telegram.org/bot{bot_token}/sendMessage',
-            data=data,
-        )
-        urlreq.urlopen(req, timeout=5)
+        telegram.enqueue(user.telegram_id, text, kind='feedback')
     except Exception as e:
         logger.warning(f"[_notify_user_feedback] {e}")
 
@@ -137,8 +119,7 @@ def analyze_practice_session(self, session_id: int):
     """
     try:
         import json
-        import openai
-        from django.conf import settings
+        from config.ai_clients import openai_client
         from practice.models import PracticeSession, PracticeMessage
 
         session = PracticeSession.objects.select_related('scenario', 'user').get(
@@ -172,8 +153,7 @@ def analyze_practice_session(self, session_id: int):
             '"critical_thinking": "advice on deeper analytical responses"}'
         )
 
-        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        resp = client.chat.completions.create(
+        resp = openai_client().chat.completions.create(
             model='gpt-4o-mini',
             messages=[{'role': 'user', 'content': prompt}],
             response_format={'type': 'json_object'},
@@ -192,6 +172,8 @@ def analyze_practice_session(self, session_id: int):
             'overall_score', 'grammar_score', 'vocab_score', 'fluency_score',
             'tense_stats', 'ai_feedback', 'analysis_done'
         ])
+        from users import scores
+        scores.record_practice(session)
 
         logger.info(f"[analyze_practice_session] session={session_id} score={feedback.get('score')}")
         return {'status': 'ok', 'score': feedback.get('score')}
@@ -247,8 +229,7 @@ def analyze_ielts_session_deep(self, session_id: int, qa_pairs: list):
     """
     try:
         import json
-        import openai
-        from django.conf import settings
+        from config.ai_clients import openai_client
         from ielts_mock.models import IELTSSession
 
         session = IELTSSession.objects.get(id=session_id)
@@ -296,8 +277,7 @@ def analyze_ielts_session_deep(self, session_id: int, qa_pairs: list):
             "Be brutally honest."
         )
 
-        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        resp = client.chat.completions.create(
+        resp = openai_client().chat.completions.create(
             model='gpt-4o-mini',
             messages=[{'role': 'user', 'content': prompt}],
             response_format={'type': 'json_object'},
@@ -330,6 +310,8 @@ def analyze_ielts_session_deep(self, session_id: int, qa_pairs: list):
             'overall_band', 'sub_scores', 'strengths', 'improvements',
             'mistakes', 'recommendations'
         ])
+        from users import scores
+        scores.record_ielts(session)
 
         logger.info(f"[analyze_ielts_session_deep] session={session_id} band={overall}")
         return {'status': 'ok', 'band': overall}
@@ -351,8 +333,7 @@ def analyze_cefr_session_deep(self, session_id: int, qa_pairs: list):
     """
     try:
         import json
-        import openai
-        from django.conf import settings
+        from config.ai_clients import openai_client
         from cefr_mock.models import CEFRSession
 
         session = CEFRSession.objects.get(id=session_id)
@@ -394,8 +375,7 @@ def analyze_cefr_session_deep(self, session_id: int, qa_pairs: list):
             "Score 70+ = near native. Most learners score 30-55."
         )
 
-        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        resp = client.chat.completions.create(
+        resp = openai_client().chat.completions.create(
             model='gpt-4o-mini',
             messages=[{'role': 'user', 'content': prompt}],
             response_format={'type': 'json_object'},
@@ -432,6 +412,8 @@ def analyze_cefr_session_deep(self, session_id: int, qa_pairs: list):
         session.level = level
         session.feedback = existing_feedback
         session.save(update_fields=['score', 'level', 'feedback'])
+        from users import scores
+        scores.record_cefr(session)
 
         logger.info(f"[analyze_cefr_session_deep] session={session_id} score={score} level={level}")
         return {'status': 'ok', 'score': score, 'level': level}
@@ -450,199 +432,7 @@ def send_daily_progress_reports():
     """
     Har kuni 22:00 da barcha active userlarga Telegram progress xabari yuborish.
     Oxirgi 7 kun taqqoslanadi: o'sish yoki kamayish ko'rsatiladi.
+    Hisob-kitob notifications/reports.py da — chunk lab, guruhlangan so'rovlar bilan.
     """
-    import json
-    import urllib.request as urlreq
-    import urllib.parse as urlparse
-    from django.conf import settings
-    from django.utils import timezone
-    from datetime import timedelta
-    from users.models import User
-    from ielts_mock.models import IELTSSession
-    from cefr_mock.models import CEFRSession
-    from practice.models import PracticeSession
-
-    bot_token = settings.TELEGRAM_BOT_TOKEN
-    if not bot_token:
-        logger.warning("[daily_report] No bot token")
-        return {'status': 'no_token'}
-
-    now = timezone.now()
-    week_ago = now - timedelta(days=7)
-    two_weeks_ago = now - timedelta(days=14)
-
-    # Active userlar: oxirgi 7 kunda biror narsa qilgan
-    active_users = User.objects.filter(
-        telegram_id__isnull=False,
-        updated_at__gte=week_ago
-    ).exclude(telegram_id=None)[:200]
-
-    sent = 0
-    total = 0
-    for user in active_users:
-        total += 1
-        try:
-            text = _build_daily_report(user, now, week_ago, two_weeks_ago)
-            if not text:
-                continue
-
-            payload = urlparse.urlencode({
-                'chat_id': user.telegram_id,
-                'text': text,
-                'parse_mode': 'HTML',
-            }).encode()
-            req = urlreq.Request(
-                f'https://api.telegram.org/bot{bot_token}/sendMessage',
-                data=payload,
-            )
-            urlreq.urlopen(req, timeout=5)
-            sent += 1
-        except Exception as e:
-            logger.warning(f"[daily_report] user={user.telegram_id} error: {e}")
-
-    logger.info(f"[daily_report] sent={sent}/{total}")
-    return {'status': 'ok', 'sent': sent}
-
-
-def _build_daily_report(user, now, week_ago, two_weeks_ago) -> str:
-    """Bir user uchun haftalik progress xabarini qurish"""
-    from ielts_mock.models import IELTSSession
-    from cefr_mock.models import CEFRSession
-    from practice.models import PracticeSession
-    from users.models import UserTenseStats
-    from datetime import timedelta
-
-    lines = [f"📊 <b>{user.first_name or 'Salom'}, bugungi progress:</b>\n"]
-    has_data = False
-
-    # ── IELTS ─────────────────────────────────────────────────────────────────
-    ielts_this = IELTSSession.objects.filter(
-        user=user, is_completed=True, started_at__gte=week_ago
-    ).order_by('-started_at')
-    ielts_prev = IELTSSession.objects.filter(
-        user=user, is_completed=True,
-        started_at__gte=two_weeks_ago, started_at__lt=week_ago
-    ).order_by('-started_at')
-
-    if ielts_this.exists():
-        has_data = True
-        latest_ielts = ielts_this.first()
-        band = latest_ielts.overall_band or 0
-        lines.append(f"📝 <b>IELTS:</b> Band <b>{band}/9.0</b>")
-        if ielts_prev.exists():
-            prev_band = ielts_prev.first().overall_band or 0
-            diff = round(band - prev_band, 1)
-            if diff > 0:
-                lines.append(f"   ↑ +{diff} o'sdi 🎉")
-            elif diff < 0:
-                lines.append(f"   ↓ {diff} kamaydi 📉")
-            else:
-                lines.append(f"   = O'zgarmadi ➡️")
-
-        # Sub-scores
-        sub = latest_ielts.sub_scores or {}
-        if sub:
-            p1 = sub.get('part1_band', '')
-            p2 = sub.get('part2_band', '')
-            p3 = sub.get('part3_band', '')
-            if p1 or p2 or p3:
-                parts_text = ' | '.join(filter(None, [
-                    f"P1:{p1}" if p1 else '',
-                    f"P2:{p2}" if p2 else '',
-                    f"P3:{p3}" if p3 else '',
-                ]))
-                lines.append(f"   {parts_text}")
-        lines.append("")
-
-    # ── CEFR ──────────────────────────────────────────────────────────────────
-    cefr_this = CEFRSession.objects.filter(
-        user=user, is_completed=True, started_at__gte=week_ago
-    ).order_by('-started_at')
-    cefr_prev = CEFRSession.objects.filter(
-        user=user, is_completed=True,
-        started_at__gte=two_weeks_ago, started_at__lt=week_ago
-    ).order_by('-started_at')
-
-    if cefr_this.exists():
-        has_data = True
-        latest_cefr = cefr_this.first()
-        score = latest_cefr.score or 0
-        level = latest_cefr.level or '?'
-        lines.append(f"🎓 <b>CEFR:</b> <b>{score}/75</b> ({level})")
-        if cefr_prev.exists():
-            prev_score = cefr_prev.first().score or 0
-            diff = score - prev_score
-            if diff > 0:
-                lines.append(f"   ↑ +{diff} ball o'sdi 🎉")
-            elif diff < 0:
-                lines.append(f"   ↓ {diff} ball kamaydi 📉")
-            else:
-                lines.append(f"   = O'zgarmadi ➡️")
-        lines.append("")
-
-    # ── Practice ──────────────────────────────────────────────────────────────
-    practice_this = PracticeSession.objects.filter(
-        user=user, is_completed=True, started_at__gte=week_ago
-    ).order_by('-started_at')
-
-    if practice_this.exists():
-        has_data = True
-        count = practice_this.count()
-        scores = [s for s in practice_this.values_list('overall_score', flat=True) if s]
-        avg = round(sum(scores) / len(scores)) if scores else 0
-        lines.append(f"🎤 <b>Practice:</b> {count} ta sessiya, o'rtacha <b>{avg}/100</b>")
-
-        # Trend
-        practice_prev = PracticeSession.objects.filter(
-            user=user, is_completed=True,
-            started_at__gte=two_weeks_ago, started_at__lt=week_ago
-        )
-        if practice_prev.exists():
-            prev_scores = [s for s in practice_prev.values_list('overall_score', flat=True) if s]
-            if prev_scores:
-                prev_avg = round(sum(prev_scores) / len(prev_scores))
-                diff = avg - prev_avg
-                if diff > 0:
-                    lines.append(f"   ↑ +{diff} ball o'sdi 🎉")
-                elif diff < 0:
-                    lines.append(f"   ↓ {diff} ball kamaydi 📉")
-        lines.append("")
-
-    # ── Tense statistikasi (oxirgi 7 kun) ────────────────────────────────────
-    if user.telegram_id and user.has_premium_active:
-        today = now.date()
-        week_start = today - timedelta(days=7)
-        tense_qs = UserTenseStats.objects.filter(
-            telegram_id=user.telegram_id,
-            date__gte=week_start,
-        )
-        tense_summary = {}
-        for ts in tense_qs:
-            if ts.tense_name not in tense_summary:
-                tense_summary[ts.tense_name] = {'usage': 0, 'correct': 0}
-            tense_summary[ts.tense_name]['usage'] += ts.usage_count
-            tense_summary[ts.tense_name]['correct'] += ts.correct_count
-
-        weak_tenses = []
-        for tense, v in tense_summary.items():
-            if v['usage'] > 0:
-                pct = round(v['correct'] / v['usage'] * 100)
-                if pct < 70:
-                    emoji = '⚠️' if pct >= 50 else '❌'
-                    weak_tenses.append((pct, f"{emoji} {tense}: {pct}%"))
-
-        if weak_tenses:
-            has_data = True
-            weak_tenses.sort(key=lambda x: x[0])
-            lines.append("⏰ <b>Zaif zamonlar (bu hafta):</b>")
-            for _, t in weak_tenses[:4]:
-                lines.append(f"   {t}")
-            lines.append("")
-
-    if not has_data:
-        return ""  # Hech qanday faollik yo'q — xabar yubormaymiz
-
-    lines.append("💪 Har kuni mashq qiling — muvaffaqiyat sizniki!")
-    lines.append("📱 <b>My Progress:</b> /progress buyrug'ini yuboring")
-
-    return "\n".join(lines)
+    from notifications import reports
+    return reports.send_daily_reports()
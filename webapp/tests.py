@@ -0,0 +1,19 @@
+from django.test import TestCase
+
+from webapp import query_bench
+
+
+class QueryBudgetTests(TestCase):
+    """webapp.query_bench — kichik seed bilan; to'liq o'lchov: manage.py bench_queries"""
+
+    def test_endpoints_within_query_budget(self):
+        report = query_bench.run(users=60, heavy=20, repeat=1)
+
+        measured = [e for e in report['endpoints'] if 'skipped' not in e]
+        self.assertTrue(measured)
+        failures = [f"{e['route']}: {'; '.join(e['problems'])}" for e in measured if e['problems']]
+        self.assertEqual(failures, [])
+        self.assertEqual(report['failed'], 0)
+        for entry in measured:
+            for profile in ('light', 'heavy'):
+                self.assertNotEqual(entry[profile]['status'], 405, entry['route'])
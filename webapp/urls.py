@@ -52,6 +52,7 @@ urlpatterns = [
     path('bot-api/save-chat/', views.bot_api_save_chat, name='bot_api_save_chat'),
     path('bot-api/save-phone/', views.bot_api_save_phone, name='bot_api_save_phone'),
     path('bot-api/check-limit/', views.bot_api_check_limit, name='bot_api_check_limit'),
+    path('bot-api/check-limits/', views.bot_api_check_limits, name='bot_api_check_limits'),
 
     # Vocabulary chat
     path('api/vocab-chat/', views.vocab_chat, name='vocab_chat'),
@@ -14,8 +14,13 @@ from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.views.decorators.http import require_POST
 
+from config import config_cache
+from leaderboard import engine as leaderboard_engine
+from users import entitlements, quotas, scores
+from . import participants
+from .activity import week_and_streak, record_activity
 from .auth import verify_telegram_webapp, get_or_create_webapp_user
-from .models import AppSettings, PaymentCard, RequiredChannel, VoiceRoom, VoiceRating
+from .models import AppSettings, RequiredChannel, VoiceRoom, VoiceRating
 
 
 # ─── Auth Decorator ───────────────────────────────────────────────────────────
@@ -149,48 +154,15 @@ def home(request):
     user = request.user
     today = timezone.localdate()
 
-    # Week days (Mon to Sun of current week)
-    monday = today - timedelta(days=today.weekday())
-    week_days = []
-    for i in range(7):
-        day = monday + timedelta(days=i)
-        has_activity = VoiceRoom.objects.filter(
-            Q(user1=user) | Q(user2=user),
-            started_at__date=day,
-            status='ended'
-        ).exists()
-        week_days.append({
-            'date': day,
-            'label': ['Du', 'Se', 'Ch', 'Pa', 'Ju', 'Sh', 'Ya'][i],
-            'is_today': day == today,
-            'has_activity': has_activity,
-        })
-
-    # Streak calculation
-    streak = 0
-    check_day = today
-    while True:
-        has = VoiceRoom.objects.filter(
-            Q(user1=user) | Q(user2=user),
-            started_at__date=check_day,
-            status='ended'
-        ).exists()
-        if not has:
-            break
-        streak += 1
-        check_day -= timedelta(days=1)
+    # Week days (Mon to Sun) + streak — faollik kalendaridan 1 ta so'rov
+    week_days, streak = week_and_streak(user, today)
 
     # Stats
     total_messages = 0  # voice messages count
-    voice_rooms = VoiceRoom.objects.filter(
-        Q(user1=user) | Q(user2=user)
-    ).count()
+    voice_rooms = participants.recent(user).count()
 
     # Recent conversations (for home page)
-    recent_convos = VoiceRoom.objects.filter(
-        Q(user1=user) | Q(user2=user),
-        status='ended'
-    ).select_related('user1', 'user2').order_by('-ended_at')[:10]
+    recent_convos = [p.room for p in participants.ended(user)[:10]]
 
     convos_data = []
     for room in recent_convos:
@@ -269,16 +241,15 @@ def speaking(request):
     settings_obj = AppSettings.get()
 
     # Free calls remaining
-    free_calls_used = VoiceRoom.objects.filter(
-        user1=user, partner_type='human', status='ended'
-    ).count()
+    free_calls_used = quotas.used('speaking', user.id)
     free_calls_left = max(0, settings_obj.free_calls_limit - free_calls_used)
-    can_call = user.has_premium_active or free_calls_left > 0
+    can_call = entitlements.for_user(user).premium or free_calls_left > 0
 
     # Recent conversations
-    recent_rooms = VoiceRoom.objects.filter(
-        Q(user1=user) | Q(user2=user)
-    ).select_related('user1', 'user2').order_by('-started_at')[:20]
+    recent_rooms = [p.room for p in participants.recent(user)[:20]]
+    rated_ids = set(VoiceRating.objects.filter(
+        rater=user, room_id__in=[room.id for room in recent_rooms]
+    ).values_list('room_id', flat=True))
 
     convos = []
     for room in recent_rooms:
@@ -301,7 +272,7 @@ def speaking(request):
             'duration': f"{m}:{s:02d}",
             'date': room.started_at,
             'status': room.status,
-            'has_rated': VoiceRating.objects.filter(room=room, rater=user).exists(),
+            'has_rated': room.id in rated_ids,
         })
 
     return render(request, 'webapp/speaking-1.html', {
@@ -354,10 +325,7 @@ def speaking_history(request):
     if not request.user.is_authenticated:
         return JsonResponse({'error': 'Unauthorized'}, status=401)
     user = request.user
-    rooms = VoiceRoom.objects.filter(
-        Q(user1=user) | Q(user2=user),
-        status='ended'
-    ).select_related('user1', 'user2').order_by('-ended_at')[:20]
+    rooms = [p.room for p in participants.ended(user)[:20]]
 
     result = []
     for room in rooms:
@@ -442,33 +410,28 @@ def practice_session(request, session_id):
 def leaderboard(request):
     from users.models import User
 
+    period = request.GET.get('period', 'alltime')
+    if period not in leaderboard_engine.PERIODS:
+        period = 'alltime'
+
     # Top 20 by total voice rooms (ended)
-    top_users = User.objects.annotate(
-        cnt_u1=Count(
-            'voice_rooms_as_user1',
-            filter=Q(voice_rooms_as_user1__status='ended')
-        ),
-        cnt_u2=Count(
-            'voice_rooms_as_user2',
-            filter=Q(voice_rooms_as_user2__status='ended')
-        ),
+    top = leaderboard_engine.top('voice_rooms', 20, period)
+    users = User.objects.filter(id__in=[uid for uid, _ in top]).annotate(
         avg_rating=Avg('received_voice_ratings__rating'),
         rating_count=Count('received_voice_ratings', distinct=True),
-    ).annotate(
-        total_voice_rooms=ExpressionWrapper(
-            F('cnt_u1') + F('cnt_u2'),
-            output_field=IntegerField()
-        )
-    ).order_by('-total_voice_rooms')[:20]
+    ).in_bulk()
 
     board = []
-    for i, u in enumerate(top_users, 1):
+    for uid, total_rooms in top:
+        u = users.get(uid)
+        if not u:
+            continue
         avg = round(u.avg_rating or 0, 1)
         board.append({
-            'rank': i,
+            'rank': len(board) + 1,
             'name': u.get_full_name() or u.username,
             'username': u.username,
-            'total_rooms': u.total_voice_rooms,
+            'total_rooms': total_rooms,
             'avg_rating': avg,
             'rating_count': u.rating_count,
             'is_me': u == request.user,
@@ -476,12 +439,14 @@ def leaderboard(request):
         })
 
     # My rank
-    my_rank = next((b['rank'] for b in board if b['is_me']), None)
+    ranked = leaderboard_engine.rank('voice_rooms', request.user.id, period)
+    my_rank = ranked[0] if ranked else None
 
     return render(request, 'webapp/leaderboard.html', {
         'user': request.user,
         'board': board,
         'my_rank': my_rank,
+        'period': period,
     })
 
 
@@ -489,10 +454,9 @@ def leaderboard(request):
 
 @webapp_login_required
 def premium(request):
-    from premium.models import PremiumPlan
     settings_obj = AppSettings.get()
-    plans = PremiumPlan.objects.filter(is_active=True).order_by('order')
-    card = PaymentCard.objects.filter(is_active=True).first()
+    plans = config_cache.premium_plans()
+    card = config_cache.payment_card()
 
     user = request.user
     referral_count = user.referrals.filter(
@@ -518,7 +482,7 @@ def premium(request):
         'Do\'st bilan ustuvor juftlash',
     ]
 
-    first_plan = plans.first()
+    first_plan = plans[0] if plans else None
     plan_price_uzs = first_plan.price_uzs if first_plan else 49000
 
     return render(request, 'webapp/premium.html', {
@@ -546,7 +510,7 @@ def buy_premium(request, plan_id):
     plan = get_object_or_404(PremiumPlan, id=plan_id, is_active=True)
     user = request.user
 
-    card = PaymentCard.objects.filter(is_active=True).first()
+    card = config_cache.payment_card()
 
     # Bot deep link (user botga o'tib chek yuboradi)
     bot_username = getattr(settings, 'BOT_USERNAME', '')
@@ -571,12 +535,10 @@ def buy_premium(request, plan_id):
 def _notify_admin_premium_request(user, plan, purchase_id):
     """Telegram orqali adminga premium so'rov xabari yuborish"""
     try:
-        import urllib.request as urlreq
-        import urllib.parse as urlparse
+        from notifications import telegram
 
-        bot_token = getattr(settings, 'TELEGRAM_BOT_TOKEN', '')
         admin_ids_str = getattr(settings, 'ADMIN_CHAT_IDS', '')
-        if not bot_token or not admin_ids_str:
+        if not admin_ids_str:
             return
 
         username = f"@{user.username}" if user.username else str(user.telegram_id)
@@ -591,23 +553,8 @@ def _notify_admin_premium_request(user, plan, purchase_id):
             f"✅ Tasdiqlash: /grant_{user.telegram_id}_1"
         )
 
-        for admin_id in admin_ids_str.split(','):
-            admin_id = admin_id.strip()
-            if not admin_id:
-                continue
-            try:
-                data = urlparse.urlencode({
-                    'chat_id': admin_id,
-                    'text': text,
-                    'parse_mode': 'HTML',
-                }).encode()
-                req = urlreq.Request(
-                    f'https://api.telegram.org/bot{bot_token}/sendMessage',
-                    data=data,
-                )
-                urlreq.urlopen(req, timeout=5)
-            except Exception:
-                pass
+        admin_ids = [a.strip() for a in admin_ids_str.split(',') if a.strip()]
+        telegram.enqueue_many(((admin_id, text) for admin_id in admin_ids), kind='admin_premium_request')
     except Exception:
         pass
 
@@ -624,6 +571,7 @@ def progress(request):
     from ielts_mock.models import IELTSSession
     from cefr_mock.models import CEFRSession
     from practice.models import PracticeSession
+    from users.models import SessionScore
 
     user = request.user
 
@@ -632,17 +580,6 @@ def progress(request):
         return redirect('/webapp/premium/')
 
 
-    ielts_sessions = list(IELTSSession.objects.filter(
-        user=user, is_completed=True
-    ).order_by('started_at').values(
-        'overall_band', 'sub_scores', 'started_at',
-        'strengths', 'improvements', 'mistakes', 'recommendations'
-    ))
-
-    cefr_sessions = list(CEFRSession.objects.filter(
-        user=user, is_completed=True
-    ).order_by('started_at').values('score', 'level', 'feedback', 'started_at'))
-
     practice_sessions_qs = PracticeSession.objects.filter(
         user=user, is_completed=True
     ).order_by('started_at')
@@ -652,9 +589,7 @@ def progress(request):
         'started_at', 'scenario__title'
     ))
 
-    voice_rooms = VoiceRoom.objects.filter(
-        Q(user1=user) | Q(user2=user), status='ended'
-    ).count()
+    voice_rooms = participants.ended_count(user.id)
 
     # AI chat sessiyalar
     from chat.models import AIChat
@@ -673,47 +608,64 @@ def progress(request):
             'date':          s['created_at'].strftime('%d/%m/%Y') if s.get('created_at') else '',
         })
 
-    # Format dates for JS charts
-    ielts_data = []
-    for s in ielts_sessions:
-        if not s['overall_band']:
-            continue
-        sub = s.get('sub_scores') or {}
-        ielts_data.append({
-            'band':    float(s['overall_band']),
-            'fluency': float(sub.get('fluency') or 0),
-            'lexical': float(sub.get('lexical') or 0),
-            'grammar': float(sub.get('grammar') or 0),
-            'pronunciation': float(sub.get('pronunciation') or 0),
-            'p1':   float(sub.get('part1_band') or 0),
-            'p2':   float(sub.get('part2_band') or 0),
-            'p3':   float(sub.get('part3_band') or 0),
-            'date': s['started_at'].strftime('%d/%m/%Y'),
-            'strengths':       (s.get('strengths') or [])[:3],
-            'improvements':    (s.get('improvements') or [])[:3],
-            'recommendations': (s.get('recommendations') or [])[:3],
-        })
+    # Grafiklar — SessionScore (JSON sub_scores / feedback o'rniga bitta so'rov)
+    ielts_data = [
+        {
+            'band':    h['overall'],
+            'fluency': h['fluency'],
+            'lexical': h['lexical'],
+            'grammar': h['grammar'],
+            'pronunciation': h['pronunciation'],
+            'p1':   h['part1'],
+            'p2':   h['part2'],
+            'p3':   h['part3'],
+            'date': h['started_at'].strftime('%d/%m/%Y'),
+            'session_id': h['session_id'],
+        }
+        for h in scores.series(
+            SessionScore.IELTS, (*scores.IELTS_SUBS, *scores.IELTS_PARTS),
+            user=user, source=SessionScore.WEB,
+        )
+    ]
+    cefr_data = [
+        {
+            'score':    int(h['overall']),
+            'level':    h['level'],
+            'fluency':  h['fluency'],
+            'accuracy': h['accuracy'],
+            'p1': int(h['part1']),
+            'p2': int(h['part2']),
+            'p3': int(h['part3']),
+            'p4': int(h['part4']),
+            'date': h['started_at'].strftime('%d/%m/%Y'),
+            'session_id': h['session_id'],
+        }
+        for h in scores.series(
+            SessionScore.CEFR, ('fluency', 'accuracy', *scores.CEFR_PARTS),
+            user=user, source=SessionScore.WEB,
+        )
+    ]
 
-    cefr_data = []
-    for s in cefr_sessions:
-        if not s['score']:
-            continue
-        fb          = s.get('feedback') or {}
-        part_scores = fb.get('part_scores') or {}
-        cefr_data.append({
-            'score':    s['score'],
-            'level':    s['level'] or '',
-            'fluency':  float(fb.get('fluency') or 0),
-            'accuracy': float(fb.get('accuracy') or 0),
-            'p1': int(part_scores.get('part1') or 0),
-            'p2': int(part_scores.get('part2') or 0),
-            'p3': int(part_scores.get('part3') or 0),
-            'p4': int(part_scores.get('part4') or 0),
-            'date':         s['started_at'].strftime('%d/%m/%Y'),
+    # Matnli fikrlar — faqat oxirgi sessiya uchun
+    if ielts_data:
+        last = IELTSSession.objects.filter(id=ielts_data[-1]['session_id']).values(
+            'strengths', 'improvements', 'recommendations'
+        ).first() or {}
+        ielts_data[-1].update({
+            'strengths':       (last.get('strengths') or [])[:3],
+            'improvements':    (last.get('improvements') or [])[:3],
+            'recommendations': (last.get('recommendations') or [])[:3],
+        })
+    if cefr_data:
+        fb = CEFRSession.objects.filter(id=cefr_data[-1]['session_id']).values_list(
+            'feedback', flat=True
+        ).first() or {}
+        cefr_data[-1].update({
             'strengths':    (fb.get('strengths') or [])[:3],
             'improvements': (fb.get('improvements') or [])[:3],
             'summary':      fb.get('summary', ''),
         })
+
     practice_data = [
         {
             'score': s['overall_score'] or 0,
@@ -821,8 +773,9 @@ def my_problems_ai(request):
     from ielts_mock.models import IELTSSession
     from cefr_mock.models import CEFRSession
     from practice.models import PracticeSession
-    from users.models import AIAdviceHistory, UserTenseStats
-    import openai
+    from users import tense_stats
+    from users.models import AIAdviceHistory
+    from config.ai_clients import openai_client
 
     # Redis cache tekshirish (5 daqiqa)
     cache_key = f'ai_advice_{user.id}'
@@ -853,21 +806,9 @@ def my_problems_ai(request):
     )[:10].values('rating', 'comment'))
 
     # ── Tense statistikasi (oxirgi 30 kun) ───────────────────────────────────
-    from datetime import timedelta
-    month_start = timezone.now().date() - timedelta(days=30)
-    tense_qs = UserTenseStats.objects.filter(
-        telegram_id=str(user.telegram_id), date__gte=month_start
-    )
-    tense_summary = {}
-    for s in tense_qs:
-        t = s.tense_name
-        if t not in tense_summary:
-            tense_summary[t] = {'usage': 0, 'correct': 0}
-        tense_summary[t]['usage'] += s.usage_count
-        tense_summary[t]['correct'] += s.correct_count
-    tense_accuracy = {}
-    for t, d in tense_summary.items():
-        tense_accuracy[t] = round(d['correct'] / d['usage'] * 100) if d['usage'] > 0 else 0
+    tense_accuracy = {
+        t: d['accuracy'] for t, d in tense_stats.summary(user.telegram_id, days=30).items()
+    }
 
     weak_tenses = {t: f"{pct}%" for t, pct in tense_accuracy.items() if pct < 70}
     strong_tenses = {t: f"{pct}%" for t, pct in tense_accuracy.items() if pct >= 80}
@@ -912,8 +853,7 @@ Return ONLY valid JSON:
 }}"""
 
     try:
-        client = openai.OpenAI(api_key=settings.OPENAI_API_KEY)
-        response = client.chat.completions.create(
+        response = openai_client().chat.completions.create(
             model='gpt-4o',
             messages=[
                 {'role': 'system', 'content': 'You are an expert English language coach. Always give fresh, personalized advice based on the learner\'s actual data.'},
@@ -947,10 +887,14 @@ def bot_api_channels(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
 
     if request.method == 'GET':
-        channels = list(RequiredChannel.objects.values(
-            'id', 'channel_title', 'channel_username', 'channel_link',
-            'is_active', 'is_bot_admin'
-        ))
+        channels = [
+            {
+                'id': c.id, 'channel_title': c.channel_title,
+                'channel_username': c.channel_username, 'channel_link': c.channel_link,
+                'is_active': c.is_active, 'is_bot_admin': c.is_bot_admin,
+            }
+            for c in config_cache.required_channels()
+        ]
         return JsonResponse({'channels': channels})
 
     if request.method == 'POST':
@@ -975,12 +919,14 @@ def bot_api_channels(request):
         if action == 'remove':
             username = data.get('channel_username', '').lstrip('@')
             RequiredChannel.objects.filter(channel_username=username).update(is_active=False)
+            config_cache.invalidate('required_channels')
             return JsonResponse({'ok': True})
 
         if action == 'set_bot_admin':
             username = data.get('channel_username', '').lstrip('@')
             is_admin = data.get('is_bot_admin', False)
             RequiredChannel.objects.filter(channel_username=username).update(is_bot_admin=is_admin)
+            config_cache.invalidate('required_channels')
             return JsonResponse({'ok': True})
 
     return JsonResponse({'error': 'Method not allowed'}, status=405)
@@ -997,10 +943,13 @@ def bot_api_stats(request):
 
     today = timezone.localdate()
     total = User.objects.count()
-    premium = User.objects.filter(is_premium=True).count()
-    today_active = User.objects.filter(last_seen__date=today).count()
+    premium = User.objects.filter(entitlements.premium_q()).count()
+    day_start, day_end = participants.day_range(today)
+    today_active = User.objects.filter(last_seen__gte=day_start, last_seen__lt=day_end).count()
     total_calls = VoiceRoom.objects.filter(status='ended').count()
-    today_calls = VoiceRoom.objects.filter(status='ended', ended_at__date=today).count()
+    today_calls = VoiceRoom.objects.filter(
+        status='ended', ended_at__gte=day_start, ended_at__lt=day_end,
+    ).count()
 
     settings_obj = AppSettings.get()
 
@@ -1141,10 +1090,8 @@ def bot_api_payment_card(request):
     if not _check_bot_secret(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
 
-    from premium.models import PremiumPlan
-
-    card = PaymentCard.objects.filter(is_active=True).first()
-    plan = PremiumPlan.objects.filter(is_active=True, duration_days=30).order_by('order').first()
+    card = config_cache.payment_card()
+    plan = config_cache.premium_plan(duration_days=30)
 
     return JsonResponse({
         'card': {
@@ -1169,7 +1116,7 @@ def bot_api_premium_request(request):
     if request.method != 'POST':
         return JsonResponse({'error': 'POST required'}, status=405)
 
-    from premium.models import PremiumPlan, PremiumPurchase
+    from premium.models import PremiumPurchase
     from users.models import User
 
     data = json.loads(request.body)
@@ -1184,9 +1131,9 @@ def bot_api_premium_request(request):
 
     # Plan olish
     if plan_id:
-        plan = PremiumPlan.objects.filter(id=plan_id, is_active=True).first()
+        plan = config_cache.premium_plan(plan_id=plan_id)
     else:
-        plan = PremiumPlan.objects.filter(is_active=True, duration_days=30).order_by('order').first()
+        plan = config_cache.premium_plan(duration_days=30)
     if not plan:
         return JsonResponse({'error': 'No active plan found'}, status=404)
 
@@ -1236,7 +1183,6 @@ def bot_api_leaderboard(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
 
     from users.models import User
-    from django.db.models import Avg, Count, Q, F, ExpressionWrapper, IntegerField
 
     sort_by = request.GET.get('sort_by', request.GET.get('sort', 'chat_count'))
     limit = min(int(request.GET.get('limit', 30)), 50)
@@ -1244,16 +1190,16 @@ def bot_api_leaderboard(request):
     ALLOWED = ['chat_count', 'practice_count', 'ielts_count', 'cefr_count']
     if sort_by not in ALLOWED:
         sort_by = 'chat_count'
+    period = request.GET.get('period', 'alltime')
+    if period not in leaderboard_engine.PERIODS:
+        period = 'alltime'
 
-    # Barcha userlarni sort qilib olish
-    qs = User.objects.filter(
-        is_active=True,
-        **{f'{sort_by}__gt': 0}
-    ).annotate(
-        avg_voice_rating=Avg('received_voice_ratings__rating'),
-    ).order_by(f'-{sort_by}')
-
-    all_ranked = list(qs)
+    def with_rating(ids):
+        return {
+            u.id: u for u in User.objects.filter(id__in=ids, is_active=True).annotate(
+                avg_voice_rating=Avg('received_voice_ratings__rating'),
+            )
+        }
 
     def user_to_dict(u, rank):
         avg = round(u.avg_voice_rating, 1) if u.avg_voice_rating else None
@@ -1272,21 +1218,29 @@ def bot_api_leaderboard(request):
             'avg_rating': avg,
         }
 
-    leaders_list = [user_to_dict(u, i + 1) for i, u in enumerate(all_ranked[:limit])]
+    # Top-N — faqat shu userlar DB dan olinadi (ZSET tartibida)
+    top_ids = [uid for uid, _ in leaderboard_engine.top(sort_by, limit, period)]
+    users = with_rating(top_ids)
+    leaders_list = [
+        user_to_dict(users[uid], i + 1)
+        for i, uid in enumerate(top_ids) if uid in users
+    ]
 
-    # My rank (faqat login user uchun)
+    # My rank (faqat login user uchun) — ZREVRANK
     my_rank = None
     if request.user.is_authenticated:
-        for i, u in enumerate(all_ranked):
-            if u.id == request.user.id:
-                my_rank = user_to_dict(u, i + 1)
-                break
+        ranked = leaderboard_engine.rank(sort_by, request.user.id, period)
+        if ranked:
+            me = users.get(request.user.id) or with_rating([request.user.id]).get(request.user.id)
+            if me:
+                my_rank = user_to_dict(me, ranked[0])
 
     return JsonResponse({
         'leaders': leaders_list,
         'leaderboard': leaders_list,  # bot eski formatni kutsa ham ishlaydi
         'my_rank': my_rank,
         'sort_by': sort_by,
+        'period': period,
         'total': len(leaders_list),
     })
 
@@ -1361,9 +1315,13 @@ def bot_api_save_ielts(request):
     session.mistakes = feedback.get('mistakes', [])
     session.recommendations = feedback.get('recommendations', [])
     session.save(update_fields=['strengths', 'improvements', 'mistakes', 'recommendations'])
+    scores.record_ielts(session)
 
     user.ielts_count = (user.ielts_count or 0) + 1
     user.save(update_fields=['ielts_count'])
+    record_activity(user.id)
+    leaderboard_engine.incr('ielts_count', user.id)
+    quotas.incr('ielts', user.id)
 
     # Agar Q&A pairs bo'lsa — Celery orqali per-part deep analysis qilish
     if answers:
@@ -1415,8 +1373,12 @@ def bot_api_save_cefr(request):
         is_completed=True,
         ended_at=timezone.now(),
     )
+    scores.record_cefr(session)
     user.cefr_count = (user.cefr_count or 0) + 1
     user.save(update_fields=['cefr_count'])
+    record_activity(user.id)
+    leaderboard_engine.incr('cefr_count', user.id)
+    quotas.incr('cefr', user.id)
 
     # Per-part deep analysis (agar Q&A pairs bo'lsa)
     if answers:
@@ -1494,6 +1456,7 @@ def bot_api_save_chat(request):
 
 @csrf_exempt
 def bot_api_check_limit(request):
+    """?telegram_id=&type=speaking|ai_call|practice|ielts|cefr → {allowed, used, total}"""
     if not _check_bot_secret(request):
         return JsonResponse({'error': 'Unauthorized'}, status=401)
 
@@ -1510,50 +1473,44 @@ def bot_api_check_limit(request):
     except User.DoesNotExist:
         return JsonResponse({'allowed': True, 'used': 0, 'total': 999})
 
-    if user.has_premium_active:
-        return JsonResponse({'allowed': True, 'used': 0, 'total': 999, 'is_premium': True})
+    if limit_type not in quotas.FEATURES:
+        return JsonResponse({'allowed': True, 'used': 0, 'total': 999})
 
-    s = AppSettings.get()
+    result = quotas.check(user, [limit_type])[limit_type]
+    result['is_premium'] = entitlements.for_user(user).premium
+    return JsonResponse(result)
 
-    if limit_type == 'speaking':
-        from django.db.models import Q
-        used = VoiceRoom.objects.filter(
-            Q(user1=user) | Q(user2=user),
-            partner_type='human', status='ended'
-        ).count()
-        total = s.free_calls_limit
-
-    elif limit_type == 'ai_call':
-        from django.db.models import Q
-        used = VoiceRoom.objects.filter(
-            Q(user1=user) | Q(user2=user),
-            partner_type='ai', status='ended'
-        ).count()
-        total = s.free_ai_calls_limit
-
-    elif limit_type == 'practice':
-        from practice.models import PracticeSession
-        used = PracticeSession.objects.filter(user=user, is_completed=True).count()
-        total = s.free_practice_limit
 
-    elif limit_type == 'ielts':
-        from ielts_mock.models import IELTSSession
-        used = IELTSSession.objects.filter(user=user, is_completed=True).count()
-        total = s.free_ielts_limit
+@csrf_exempt
+def bot_api_check_limits(request):
+    """
+    Bir nechta limit bitta so'rovda:
+    ?telegram_id=&types=speaking,practice,ielts → {is_premium, limits: {type: {allowed, used, total}}}
+    types berilmasa — barchasi.
+    """
+    if not _check_bot_secret(request):
+        return JsonResponse({'error': 'Unauthorized'}, status=401)
 
-    elif limit_type == 'cefr':
-        from cefr_mock.models import CEFRSession
-        used = CEFRSession.objects.filter(user=user, is_completed=True).count()
-        total = s.free_cefr_limit
+    from users.models import User
 
-    else:
-        return JsonResponse({'allowed': True, 'used': 0, 'total': 999})
+    telegram_id = request.GET.get('telegram_id')
+    if not telegram_id:
+        return JsonResponse({'error': 'telegram_id required'}, status=400)
+
+    types = [t.strip() for t in request.GET.get('types', '').split(',') if t.strip()]
+    types = [t for t in types if t in quotas.FEATURES] or list(quotas.FEATURES)
+
+    try:
+        user = User.objects.get(telegram_id=telegram_id)
+    except User.DoesNotExist:
+        return JsonResponse({
+            'is_premium': False,
+            'limits': {t: dict(quotas.PREMIUM_RESULT) for t in types},
+        })
 
     return JsonResponse({
-        'allowed': used < total,
-        'used': used,
-        'total': total,
-        'is_premium': False,
+        'is_premium': entitlements.for_user(user).premium,
+        'limits': quotas.check(user, types),
     })
 
 # ─── Vocabulary Chat API (webapp) ─────────────────────────────────────────────
@@ -1568,10 +1525,8 @@ def vocab_chat(request):
     user = request.user
 
     # Limit tekshirish
-    if not user.has_premium_active:
-        s = AppSettings.get()
-        if (user.ai_message_count or 0) >= s.free_ai_message_limit:
-            return JsonResponse({'error': 'limit_reached'}, status=403)
+    if entitlements.for_user(user).exhausted('free_ai_message_limit', user.ai_message_count):
+        return JsonResponse({'error': 'limit_reached'}, status=403)
 
     data = json.loads(request.body or '{}')
     word = data.get('word', '').strip()
@@ -1581,9 +1536,9 @@ def vocab_chat(request):
     if not word or not message:
         return JsonResponse({'error': 'word and message required'}, status=400)
 
-    from openai import OpenAI
     import base64
-    client = OpenAI(api_key=settings.OPENAI_API_KEY)
+    from config.ai_clients import openai_client
+    client = openai_client()
 
     # Build conversation
     system_prompt = (
@@ -1607,13 +1562,8 @@ def vocab_chat(request):
     # TTS audio
     audio_b64 = None
     try:
-        tts = client.audio.speech.create(
-            model='tts-1',
-            voice='nova',
-            input=ai_text,
-            response_format='mp3',
-        )
-        audio_b64 = base64.b64encode(tts.content).decode()
+        from config.tts_cache import synthesize
+        audio_b64 = base64.b64encode(synthesize(ai_text, voice='nova')).decode()
     except Exception:
         pass
 